@@ -1,3 +1,4 @@
+import secrets
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -6,7 +7,8 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from config import settings
 from database import users_collection
-from models import TokenData, UserInDB
+from models import CurrentUser, UserInDB
+from services.token_epoch_service import token_epoch_service
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
@@ -27,6 +29,40 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
+def create_user_token(user: dict) -> str:
+    """
+    Access token carrying the id, role and token epoch of the user, so route
+    dependencies can authorize without reading the user back
+    """
+    return create_access_token(
+        data={
+            "sub": user['email'],
+            "uid": user['id'],
+            "username": user['username'],
+            "role": user['role'],
+            "tep": token_epoch_service.current(user['id'])
+        },
+        expires_delta=timedelta(minutes=settings.access_token_expire_minutes)
+    )
+
+def decode_access_token(token: str) -> Optional[CurrentUser]:
+    """The user a token was issued to, or None if it is invalid, expired or revoked"""
+    try:
+        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        user = CurrentUser(
+            id=payload["uid"],
+            email=payload["sub"],
+            username=payload["username"],
+            role=payload["role"]
+        )
+        epoch = int(payload["tep"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        # Tokens issued before the claims were added fail here and need a new login
+        return None
+    if not token_epoch_service.is_current(user.id, epoch):
+        return None
+    return user
+
 def get_user_by_email(email: str):
     user = users_collection.find_one({"email": email})
     if user:
@@ -34,29 +70,25 @@ def get_user_by_email(email: str):
     return None
 
 async def get_current_user(token: str = Depends(oauth2_scheme)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = TokenData(email=email)
-    except JWTError:
-        raise credentials_exception
-    
-    user = get_user_by_email(email=token_data.email)
+    user = decode_access_token(token)
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
-async def get_current_admin_user(current_user: UserInDB = Depends(get_current_user)):
+async def get_current_admin_user(current_user: CurrentUser = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions. Admin access required."
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+async def get_metrics_reader(token: str = Depends(oauth2_scheme)):
+    """Scrapers authenticate with METRICS_TOKEN; admins can also use their access token"""
+    if settings.metrics_token and secrets.compare_digest(token.encode(), settings.metrics_token.encode()):
+        return
+    await get_current_admin_user(await get_current_user(token))
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Adaptive selection latency benchmark
+Builds the in-memory item index from a synthetic bank and measures how long
+select() takes per quiz (no database required).
+
+Usage (from backend/):
+    python benchmarks/adaptive_benchmark.py --questions 100000 --quizzes 10000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.adaptive_service import AdaptiveService
+
+CATEGORIES = ['OOP Concepts', 'Collections', 'Exceptions', 'Multithreading', 'Streams', 'JVM', 'Generics', 'Basics']
+DIFFICULTIES = ['easy', 'medium', 'hard']
+
+
+def synthetic_bank(n_questions: int, rng: random.Random):
+    for i in range(n_questions):
+        attempts = rng.randint(0, 500)
+        yield {
+            'id': f"q{i}",
+            'category': rng.choice(CATEGORIES),
+            'difficulty': rng.choice(DIFFICULTIES),
+            'stats': {'attempts': attempts, 'correct': rng.randint(0, attempts)}
+        }
+
+
+def run(n_questions: int, n_quizzes: int, limit: int, seed: int):
+    rng = random.Random(seed)
+    service = AdaptiveService()
+    
+    start = time.perf_counter()
+    service.build(synthetic_bank(n_questions, rng))
+    print(f"Indexed {n_questions:,} questions in {time.perf_counter() - start:.2f}s")
+    
+    latencies = []
+    for _ in range(n_quizzes):
+        category = rng.choice(CATEGORIES + [None])
+        rollup = {'questions_answered': rng.randint(0, 500)}
+        rollup['correct_answers'] = rng.randint(0, rollup['questions_answered'])
+        
+        start = time.perf_counter()
+        ability = service.ability(rollup, category)
+        service.select(ability, category, limit, rng)
+        latencies.append((time.perf_counter() - start) * 1000)
+    
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(len(latencies) * q))]
+    print(f"select() for {limit} questions over {n_quizzes:,} quizzes:")
+    print(f"  p50={p(0.50):.3f}ms  p99={p(0.99):.3f}ms  max={latencies[-1]:.3f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark adaptive question selection")
+    parser.add_argument('--questions', type=int, default=100000)
+    parser.add_argument('--quizzes', type=int, default=10000)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    
+    run(args.questions, args.quizzes, args.limit, args.seed)
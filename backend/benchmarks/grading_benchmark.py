@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Grading throughput benchmark
+Measures submissions/second for single-submission grading versus batch grading
+against a synthetic in-memory answer map (no database required).
+
+Usage (from backend/):
+    python benchmarks/grading_benchmark.py --questions 100000 --submissions 5000 --length 20
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.grading_service import GradingService
+
+
+def build_workload(n_questions: int, n_submissions: int, length: int, seed: int):
+    """Synthetic answer map plus submissions that are ~60% correct"""
+    rng = random.Random(seed)
+    answers = {f"q{i}": f"option-{rng.randrange(4)}" for i in range(n_questions)}
+    ids = list(answers)
+    
+    submissions = []
+    for _ in range(n_submissions):
+        picked = rng.sample(ids, length)
+        given = [
+            answers[qid] if rng.random() < 0.6 else f"option-{rng.randrange(4)}"
+            for qid in picked
+        ]
+        submissions.append({'question_ids': picked, 'answers': given})
+    return answers, submissions
+
+
+def run(n_questions: int, n_submissions: int, length: int, repeat: int, seed: int):
+    answers, submissions = build_workload(n_questions, n_submissions, length, seed)
+    service = GradingService()
+    service.load(answers)
+    
+    best_single = float('inf')
+    best_batch = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        single = [service.grade(s['question_ids'], s['answers']) for s in submissions]
+        best_single = min(best_single, time.perf_counter() - start)
+        
+        start = time.perf_counter()
+        batch = service.grade_batch(submissions)
+        best_batch = min(best_batch, time.perf_counter() - start)
+    
+    assert [r['score'] for r in single] == [r['score'] for r in batch]
+    
+    print(f"Questions in bank: {n_questions}")
+    print(f"Submissions:       {n_submissions} x {length} answers")
+    print(f"grade() loop:      {best_single * 1000:8.1f} ms  ({n_submissions / best_single:,.0f} submissions/s)")
+    print(f"grade_batch():     {best_batch * 1000:8.1f} ms  ({n_submissions / best_batch:,.0f} submissions/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark quiz grading throughput")
+    parser.add_argument('--questions', type=int, default=100000)
+    parser.add_argument('--submissions', type=int, default=5000)
+    parser.add_argument('--length', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    
+    run(args.questions, args.submissions, args.length, args.repeat, args.seed)
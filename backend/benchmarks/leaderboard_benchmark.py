@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Leaderboard load test
+Builds an in-process board with synthetic users and measures point updates,
+top-N pages and "my rank" lookups (no database required).
+
+Usage (from backend/):
+    python benchmarks/leaderboard_benchmark.py --users 1000000 --ops 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.leaderboard_service import RankedBoard
+
+
+def timed(fn, samples):
+    """Per-call latencies in microseconds"""
+    latencies = []
+    for arg in samples:
+        start = time.perf_counter()
+        fn(arg)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return latencies
+
+
+def report(name, latencies):
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(len(latencies) * q))]
+    print(f"{name:<16} n={len(latencies):>8}  mean={statistics.fmean(latencies):7.1f}us  "
+          f"p50={p(0.50):7.1f}us  p99={p(0.99):7.1f}us")
+
+
+def run(n_users: int, n_ops: int, seed: int):
+    rng = random.Random(seed)
+    user_ids = [f"user-{i}" for i in range(n_users)]
+    
+    start = time.perf_counter()
+    board = RankedBoard({uid: rng.randint(0, 5000) for uid in user_ids})
+    print(f"Built board with {len(board):,} users in {time.perf_counter() - start:.2f}s")
+    
+    targets = [rng.choice(user_ids) for _ in range(n_ops)]
+    report("add points", timed(lambda uid: board.add(uid, rng.randint(0, 20)), targets))
+    report("my rank", timed(board.rank, targets))
+    report("top 10", timed(lambda _: board.top(10), range(n_ops // 10)))
+    report("page 1000", timed(lambda _: board.top(50, 1000 * 50), range(n_ops // 10)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the in-process leaderboard")
+    parser.add_argument('--users', type=int, default=1000000)
+    parser.add_argument('--ops', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    
+    run(args.users, args.ops, args.seed)
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Async load harness for the quiz API
+Seeds a synthetic question bank and users into a local mongod (through
+generate_data.py), then drives a weighted mix of scenarios at a target
+request rate (open loop: requests are issued on schedule whether or not
+earlier ones have finished) and writes p50/p95/p99 latency and throughput
+per endpoint as JSON.
+
+Latency is measured from each request's scheduled start, so time spent
+queued behind a saturated server counts against it.
+
+Usage (from backend/, with mongod running locally):
+    python benchmarks/load_benchmark.py --spawn --mix default --rps 200 --duration 60 \\
+        --questions 20000 --users 2000 --output load-results.json
+
+--spawn starts uvicorn, or gunicorn with --workers N, with rate limiting off.
+Without --spawn the API at --base-url must already use the --db database and
+run with RATE_LIMIT_ENABLED=false: every simulated user shares one IP, so
+prepare() alone would exhaust the login budget.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from pymongo import MongoClient
+
+from auth import get_password_hash
+from generate_data import CATEGORIES, DIFFICULTIES, PASSWORD, generate, user_email
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ADMIN_EMAIL = "load-admin@example.com"
+
+# Scenario weights per mix; each scenario issues one or more requests
+MIXES = {
+    'default': {'quiz_start': 40, 'quiz_questions': 20, 'bookmark_toggle': 25, 'categories': 10, 'login': 4, 'admin_import': 1},
+    'login_burst': {'login': 85, 'categories': 15},
+    # Same session renewals as login_burst, through refresh tokens instead of bcrypt
+    'refresh_burst': {'refresh': 85, 'categories': 15},
+    'exam': {'quiz_start': 70, 'quiz_questions': 20, 'categories': 10},
+    'admin': {'admin_import': 30, 'admin_list': 40, 'categories': 30},
+}
+
+
+def seed(mongo_url: str, db_name: str, n_questions: int, n_users: int, seed_value: int):
+    """Replace the load database with a synthetic bank, users and one admin"""
+    db = MongoClient(mongo_url)[db_name]
+    for name in ('progress', 'leaderboard', 'reviews', 'quizzes', 'quiz_pool', 'versions'):
+        db[name].drop()
+
+    generate(argparse.Namespace(
+        questions=n_questions, users=n_users, bookmarks=0, results=0, days=90, seed=seed_value,
+        workers=os.cpu_count() or 4, batch_size=5000, mongo_url=mongo_url, db=db_name, drop=True
+    ))
+    db.users.insert_one({
+        'id': str(uuid.uuid4()), 'email': ADMIN_EMAIL, 'username': 'load-admin',
+        'full_name': 'Load Admin', 'hashed_password': get_password_hash(PASSWORD), 'role': 'admin',
+        'created_at': datetime.utcnow()
+    })
+    print(f"Seeded {db_name}: {n_questions} questions, {n_users} users (+1 admin)")
+
+
+def spawn_server(db_name: str, port: int, workers: Optional[int] = None) -> subprocess.Popen:
+    """uvicorn, or the production gunicorn setup when a worker count is given"""
+    # Every simulated user shares one IP, which the rate limiter would throttle
+    env = {**os.environ, 'DATABASE_NAME': db_name, 'RATE_LIMIT_ENABLED': 'false'}
+    if workers:
+        env.update(WEB_CONCURRENCY=str(workers), BIND=f"127.0.0.1:{port}")
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'server:app']
+    else:
+        command = [sys.executable, '-m', 'uvicorn', 'server:app', '--host', '127.0.0.1', '--port', str(port)]
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+
+
+async def wait_until_healthy(client: httpx.AsyncClient, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if (await client.get('/api/health')).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError("API did not become healthy")
+        await asyncio.sleep(0.25)
+
+
+class LoadRun:
+    """Issues scenarios on schedule and records latencies per endpoint"""
+
+    def __init__(self, client: httpx.AsyncClient, rng: random.Random, n_users: int, question_ids: List[str]):
+        self.client = client
+        self.rng = rng
+        self.n_users = n_users
+        self.question_ids = question_ids
+        self.user_tokens: List[str] = []
+        self.admin_token: Optional[str] = None
+        # Each refresh token is spent once; its successor goes back in the pool
+        self.refresh_tokens: List[str] = []
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    async def login(self, email: str) -> Optional[str]:
+        response = await self.client.post('/api/auth/login', data={'username': email, 'password': PASSWORD})
+        if response.status_code != 200:
+            return None
+        self.refresh_tokens.append(response.json()['refresh_token'])
+        return response.json()['access_token']
+
+    async def prepare(self, token_pool: int):
+        """Log in a pool of users (and the admin) before the timed run"""
+        self.admin_token = await self.login(ADMIN_EMAIL)
+        picks = self.rng.sample(range(self.n_users), min(token_pool, self.n_users))
+        tokens = await asyncio.gather(*(self.login(user_email(i)) for i in picks))
+        self.user_tokens = [t for t in tokens if t]
+        if not self.admin_token or not self.user_tokens:
+            raise RuntimeError("Could not log in seeded users; is the API using the seeded database?")
+
+    async def request(self, endpoint: str, scheduled: float, method: str, url: str, token: Optional[str] = None, **kwargs):
+        headers = {'Authorization': f"Bearer {token}"} if token else None
+        try:
+            response = await self.client.request(method, url, headers=headers, **kwargs)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            response, ok = None, False
+        self.latencies.setdefault(endpoint, []).append(time.perf_counter() - scheduled)
+        if not ok:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+        return response if ok else None
+
+    # Scenarios ---------------------------------------------------------
+
+    async def scenario_login(self, scheduled: float):
+        data = {'username': user_email(self.rng.randrange(self.n_users)), 'password': PASSWORD}
+        await self.request('POST /api/auth/login', scheduled, 'POST', '/api/auth/login', data=data)
+
+    async def scenario_refresh(self, scheduled: float):
+        if not self.refresh_tokens:
+            return
+        token = self.refresh_tokens.pop(self.rng.randrange(len(self.refresh_tokens)))
+        response = await self.request('POST /api/auth/refresh', scheduled, 'POST', '/api/auth/refresh',
+                                      json={'refresh_token': token})
+        if response is not None:
+            self.refresh_tokens.append(response.json()['refresh_token'])
+
+    async def scenario_categories(self, scheduled: float):
+        await self.request('GET /api/user/categories', scheduled, 'GET', '/api/user/categories', self.rng.choice(self.user_tokens))
+
+    async def scenario_quiz_start(self, scheduled: float):
+        body = {'category': self.rng.choice(CATEGORIES), 'limit': 10}
+        await self.request('POST /api/user/quiz/start', scheduled, 'POST', '/api/user/quiz/start', self.rng.choice(self.user_tokens), json=body)
+
+    async def scenario_quiz_questions(self, scheduled: float):
+        params = {'category': self.rng.choice(CATEGORIES), 'limit': 10}
+        await self.request('GET /api/user/questions', scheduled, 'GET', '/api/user/questions', self.rng.choice(self.user_tokens), params=params)
+
+    async def scenario_bookmark_toggle(self, scheduled: float):
+        token = self.rng.choice(self.user_tokens)
+        question_id = self.rng.choice(self.question_ids)
+        await self.request('POST /api/user/bookmarks/add', scheduled, 'POST', '/api/user/bookmarks/add', token,
+                           json={'question_id': question_id})
+        await self.request('DELETE /api/user/bookmarks/remove/{id}', time.perf_counter(), 'DELETE',
+                           f'/api/user/bookmarks/remove/{question_id}', token)
+
+    async def scenario_admin_import(self, scheduled: float):
+        questions = [
+            {
+                'question': f"Imported question {uuid.uuid4().hex[:8]}?",
+                'options': ["A", "B", "C", "D"],
+                'answer': "A",
+                'category': self.rng.choice(CATEGORIES),
+                'difficulty': self.rng.choice(DIFFICULTIES)
+            }
+            for _ in range(50)
+        ]
+        files = {'file': ('import.json', json.dumps(questions), 'application/json')}
+        await self.request('POST /api/admin/questions/bulk_upload', scheduled, 'POST',
+                           '/api/admin/questions/bulk_upload', self.admin_token, files=files)
+
+    async def scenario_admin_list(self, scheduled: float):
+        params = {'category': self.rng.choice(CATEGORIES)}
+        await self.request('GET /api/admin/questions/get_all', scheduled, 'GET',
+                           '/api/admin/questions/get_all', self.admin_token, params=params)
+
+    async def drive(self, mix: Dict[str, int], rps: float, duration: float, max_in_flight: int) -> float:
+        """Start scenarios with exponential inter-arrival times; returns the measured wall time"""
+        scenarios: List[Callable] = [getattr(self, f"scenario_{name}") for name in mix]
+        weights = list(mix.values())
+        limit = asyncio.Semaphore(max_in_flight)
+        tasks = []
+
+        async def run_one(scenario, scheduled):
+            async with limit:
+                await scenario(scheduled)
+
+        start = time.perf_counter()
+        next_at = start
+        while next_at - start < duration:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            scenario = self.rng.choices(scenarios, weights)[0]
+            tasks.append(asyncio.create_task(run_one(scenario, next_at)))
+            next_at += self.rng.expovariate(rps)
+
+        await asyncio.gather(*tasks)
+        return time.perf_counter() - start
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: Dict[str, List[float]], errors: Dict[str, int], elapsed: float) -> Dict[str, Dict[str, float]]:
+    summary = {}
+    for endpoint, values in sorted(latencies.items()):
+        values = sorted(values)
+        summary[endpoint] = {
+            'requests': len(values),
+            'errors': errors.get(endpoint, 0),
+            'throughput_rps': round(len(values) / elapsed, 2),
+            'p50_ms': round(percentile(values, 50) * 1000, 2),
+            'p95_ms': round(percentile(values, 95) * 1000, 2),
+            'p99_ms': round(percentile(values, 99) * 1000, 2),
+            'max_ms': round(values[-1] * 1000, 2)
+        }
+    return summary
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=BACKEND_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args):
+    if args.mix not in MIXES:
+        raise SystemExit(f"Unknown mix {args.mix!r}; choose from {', '.join(MIXES)}")
+
+    if not args.no_seed:
+        seed(args.mongo_url, args.db, args.questions, args.users, args.seed)
+    question_ids = [q['id'] for q in MongoClient(args.mongo_url)[args.db].questions.find({}, {'_id': 0, 'id': 1})]
+    n_users = MongoClient(args.mongo_url)[args.db].users.count_documents({'role': 'user'})
+
+    server = spawn_server(args.db, args.port, args.workers) if args.spawn else None
+    base_url = f"http://127.0.0.1:{args.port}" if args.spawn else args.base_url
+    try:
+        limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+            await wait_until_healthy(client)
+            run = LoadRun(client, random.Random(args.seed), n_users, question_ids)
+            await run.prepare(args.token_pool)
+            elapsed = await run.drive(MIXES[args.mix], args.rps, args.duration, args.max_in_flight)
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    endpoints = summarize(run.latencies, run.errors, elapsed)
+    total = sum(e['requests'] for e in endpoints.values())
+    report = {
+        'commit': git_commit(),
+        'started_at': datetime.utcnow().isoformat(),
+        'config': {
+            'mix': args.mix, 'target_rps': args.rps, 'duration_s': args.duration, 'workers': args.workers,
+            'questions': len(question_ids), 'users': n_users, 'seed': args.seed
+        },
+        'total': {
+            'requests': total,
+            'errors': sum(e['errors'] for e in endpoints.values()),
+            'throughput_rps': round(total / elapsed, 2)
+        },
+        'endpoints': endpoints
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drive a realistic request mix against the quiz API")
+    parser.add_argument('--mix', default='default', help=f"one of: {', '.join(MIXES)}")
+    parser.add_argument('--rps', type=float, default=100, help="target scenario starts per second")
+    parser.add_argument('--duration', type=float, default=30, help="seconds of load")
+    parser.add_argument('--questions', type=int, default=10000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-seed', action='store_true', help="reuse the data already in --db")
+    parser.add_argument('--mongo-url', default='mongodb://localhost:27017/')
+    parser.add_argument('--db', default='java_quiz_load', help="database to seed (never the app database)")
+    parser.add_argument('--spawn', action='store_true', help="start uvicorn against --db for the run")
+    parser.add_argument('--port', type=int, default=8011, help="port for --spawn")
+    parser.add_argument('--workers', type=int, help="with --spawn, run gunicorn with this many workers instead of uvicorn")
+    parser.add_argument('--base-url', default='http://localhost:8001')
+    parser.add_argument('--token-pool', type=int, default=200, help="users logged in before the run")
+    parser.add_argument('--max-in-flight', type=int, default=256)
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--output', help="write the JSON report here as well")
+    args = parser.parse_args()
+
+    from config import settings
+    if args.db == settings.database_name and not args.no_seed:
+        raise SystemExit(f"Refusing to seed the app database {args.db!r}; pass a different --db")
+
+    asyncio.run(main(args))
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Instrumentation overhead of the metrics middleware and Mongo command listener
+Drives a small FastAPI app in-process over raw ASGI (no server, no database)
+with and without MetricsMiddleware, and times the listener callback that runs
+once per Mongo command.
+
+Usage (from backend/):
+    python benchmarks/metrics_benchmark.py --requests 20000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+
+from metrics import MetricsMiddleware, MongoCommandMetrics, record_cache
+
+
+def build_app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/user/bookmarks/check/{question_id}")
+    async def check(question_id: str):
+        record_cache('etag', 1)
+        return {"is_bookmarked": False}
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def drive(app, n: int) -> float:
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': '/api/user/bookmarks/check/q1',
+        'raw_path': b'/api/user/bookmarks/check/q1', 'query_string': b'',
+        'headers': [], 'client': ('127.0.0.1', 1), 'server': ('127.0.0.1', 8001)
+    }
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(n):
+        await app(dict(scope), receive, send)
+    return time.perf_counter() - start
+
+
+def listener_cost(n: int) -> float:
+    listener = MongoCommandMetrics()
+    event = SimpleNamespace(command_name='find', duration_micros=850)
+    start = time.perf_counter()
+    for _ in range(n):
+        listener.succeeded(event)
+    return (time.perf_counter() - start) / n
+
+
+def run(n_requests: int, repeat: int, typical_ms: float):
+    apps = {"plain": build_app(False), "instrumented": build_app(True)}
+    best = {label: float('inf') for label in apps}
+    # Interleaved so machine noise hits both variants alike
+    for _ in range(repeat):
+        for label, app in apps.items():
+            best[label] = min(best[label], asyncio.run(drive(app, n_requests)))
+
+    results = {}
+    for label in apps:
+        results[label] = best[label] / n_requests * 1e6
+        print(f"{label:<14} {results[label]:8.2f} us/request")
+
+    overhead = results['instrumented'] - results['plain']
+    print(f"middleware     {overhead:8.2f} us/request ({overhead / results['plain'] * 100:.1f}% of a no-op route, "
+          f"{overhead / (typical_ms * 1000) * 100:.2f}% of a {typical_ms:g} ms request)")
+
+    per_command = min(listener_cost(n_requests) for _ in range(repeat)) * 1e6
+    print(f"mongo listener {per_command:8.2f} us/command")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark metrics instrumentation overhead")
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--typical-ms', type=float, default=2.0, help="latency of a typical Mongo-backed request")
+    args = parser.parse_args()
+
+    run(args.requests, args.repeat, args.typical_ms)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Admin search latency benchmark
+Runs search_service.search() against a bank made by generate_data.py and
+reports per-query latency for a term found in every synthetic question, a
+category name, the same term within one category, and rare terms (a
+question number, found in a single question).
+
+Usage (from backend/, with mongod running locally):
+    python generate_data.py --db java_quiz_scale --questions 1000000 --users 0
+    DATABASE_NAME=java_quiz_scale python benchmarks/search_benchmark.py --queries 200
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import db, questions_collection
+from generate_data import CATEGORIES
+from indexes import ensure_indexes
+from services.search_service import search_service
+
+
+def timed(search, n_queries):
+    """Per-call latencies in milliseconds"""
+    latencies = []
+    for _ in range(n_queries):
+        start = time.perf_counter()
+        search()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(name, latencies):
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(len(latencies) * q))]
+    print(f"{name:<28} n={len(latencies):>5}  mean={statistics.fmean(latencies):7.2f}ms  "
+          f"p50={p(0.50):7.2f}ms  p95={p(0.95):7.2f}ms  p99={p(0.99):7.2f}ms")
+
+
+def run(n_queries: int, seed: int):
+    rng = random.Random(seed)
+    count = questions_collection.estimated_document_count()
+    if not count:
+        raise SystemExit(f"No questions in {db.name}; run generate_data.py first")
+
+    start = time.perf_counter()
+    ensure_indexes(db)
+    print(f"{count:,} questions in {db.name}; indexes ready in {time.perf_counter() - start:.1f}s")
+
+    # Warm the text index into the cache so the first rows are not cold reads
+    search_service.search('synthetic')
+
+    report("every question, page 1", timed(lambda: search_service.search('synthetic'), n_queries))
+    report("every question, page 10", timed(lambda: search_service.search('synthetic', page=10), n_queries))
+    report("category name", timed(lambda: search_service.search(rng.choice(CATEGORIES).split()[0]), n_queries))
+    report("every question, 1 category", timed(
+        lambda: search_service.search('synthetic', category=rng.choice(CATEGORIES)), n_queries
+    ))
+    report("rare term", timed(lambda: search_service.search(str(rng.randrange(count))), n_queries))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark admin full-text search")
+    parser.add_argument('--queries', type=int, default=200, help="searches per query kind")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    run(args.queries, args.seed)
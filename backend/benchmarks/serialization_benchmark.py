@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Per-row serialization cost of list responses
+Compares the old path (QuestionResponse(**q) per row, then FastAPI validating
+and encoding against response_model) with pydantic TypeAdapter bulk dumping
+and plain orjson on projected documents (no database required).
+
+Usage (from backend/):
+    python benchmarks/serialization_benchmark.py --rows 10000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from models import QuestionResponse
+
+
+def synthetic_rows(n: int):
+    return [
+        {
+            'id': str(uuid.uuid4()),
+            'question': f"Which statement about Java topic {i} is correct?",
+            'options': ["Option A", "Option B", "Option C", "Option D"],
+            'answer': "Option B",
+            'category': "OOP Concepts",
+            'difficulty': "medium",
+            'explanation': "Because of how the JVM resolves this at runtime.",
+            'created_by': "admin",
+            'created_at': datetime.utcnow()
+        }
+        for i in range(n)
+    ]
+
+
+def old_path(rows, adapter):
+    # Handler builds a model per row...
+    models = [QuestionResponse(**q) for q in rows]
+    # ...then FastAPI validates against response_model and encodes again
+    validated = adapter.validate_python(models)
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def type_adapter_path(rows, adapter):
+    return adapter.dump_json(adapter.validate_python(rows))
+
+
+def orjson_path(rows, adapter):
+    return orjson.dumps(rows)
+
+
+def run(n_rows: int, repeat: int):
+    rows = synthetic_rows(n_rows)
+    adapter = TypeAdapter(List[QuestionResponse])
+    
+    baseline = None
+    for name, fn in [
+        ("model per row + response_model", old_path),
+        ("TypeAdapter bulk dump", type_adapter_path),
+        ("orjson on projected docs", orjson_path),
+    ]:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn(rows, adapter)
+            best = min(best, time.perf_counter() - start)
+        per_row = best / n_rows * 1e6
+        baseline = baseline or per_row
+        print(f"{name:<32} {per_row:8.2f} us/row  ({baseline / per_row:5.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark list response serialization")
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    run(args.rows, args.repeat)
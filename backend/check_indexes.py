@@ -0,0 +1,117 @@
+"""
+Script to verify that every query shape used by the routes is served by an index
+
+Applies the index registry, runs explain() on each shape below and exits
+with status 1 if any winning plan contains a COLLSCAN. Values are
+placeholders; only the shape (fields, operators, sort) matters to the planner.
+Shapes that services build in code (quiz pool, sessions, facets) come from
+the same filter functions the services call, so the two cannot drift apart.
+
+Full loads of small in-memory tables (token epochs) are scans by design and
+are not listed.
+"""
+import sys
+from datetime import datetime
+
+from database import db
+from indexes import ensure_indexes
+from services.quiz_session_service import pool_filter, in_progress_filter
+from services.search_service import search_service
+
+NOW = datetime.utcnow()
+
+
+def _facets(**filters):
+    """Faceted browse filter as search_service builds it"""
+    return search_service.facet_filter(
+        filters.get('categories'),
+        filters.get('difficulties'),
+        filters.get('generated_by_ai'),
+        filters.get('source_types'),
+        filters.get('creators')
+    )
+
+
+# (description, collection, filter, sort)
+QUERY_SHAPES = [
+    ("login / register by email", 'users', {'email': 'x'}, None),
+    ("login / register by username", 'users', {'username': 'x'}, None),
+    ("batch submit usernames", 'users', {'id': {'$in': ['x']}}, None),
+    ("question by id", 'questions', {'id': 'x'}, None),
+    ("questions by id list", 'questions', {'id': {'$in': ['x']}}, None),
+    ("questions by category", 'questions', {'category': 'x'}, [('category', 1)]),
+    ("questions by difficulty", 'questions', {'difficulty': 'x'}, None),
+    ("questions by category and difficulty", 'questions', {'category': 'x', 'difficulty': 'x'}, None),
+    ("admin question search", 'questions', {'$text': {'$search': 'x'}}, None),
+    ("admin question search in a category", 'questions', {'$text': {'$search': 'x'}, 'category': 'x'}, None),
+    ("PDF export of every category", 'questions', {}, [('category', 1)]),
+    ("faceted browse, newest first", 'questions', _facets(), [('created_at', -1)]),
+    ("faceted browse by category", 'questions', _facets(categories=['x']), [('created_at', -1)]),
+    ("faceted browse by difficulty", 'questions', _facets(difficulties=['easy']), [('created_at', -1)]),
+    ("faceted browse by default difficulty", 'questions', _facets(difficulties=['medium']), [('created_at', -1)]),
+    ("faceted browse, AI generated", 'questions', _facets(generated_by_ai=True), [('created_at', -1)]),
+    ("faceted browse, not AI generated", 'questions', _facets(generated_by_ai=False), [('created_at', -1)]),
+    ("faceted browse by creator", 'questions', _facets(creators=['x']), [('created_at', -1)]),
+    ("faceted browse by source type", 'questions', _facets(source_types=['x']), [('created_at', -1)]),
+    ("bookmark lookup", 'bookmarks', {'user_id': 'x', 'question_id': 'x'}, None),
+    ("bookmarks of a user", 'bookmarks', {'user_id': 'x'}, None),
+    ("result by id", 'results', {'id': 'x', 'user_id': 'x'}, None),
+    ("results of a user", 'results', {'user_id': 'x'}, [('submitted_at', -1)]),
+    ("progress rollup", 'progress', {'user_id': 'x'}, None),
+    ("leaderboard load", 'leaderboard', {'board': 'x'}, None),
+    ("leaderboard entry", 'leaderboard', {'board': 'x', 'user_id': 'x'}, None),
+    ("review card", 'reviews', {'user_id': 'x', 'question_id': 'x'}, None),
+    ("reviews due", 'reviews', {'user_id': 'x', 'due_at': {'$lte': NOW}}, [('due_at', 1)]),
+    ("quiz session", 'quizzes', {'id': 'x', 'user_id': 'x'}, None),
+    ("active quiz session", 'quizzes', {'user_id': 'x', 'status': 'in_progress'}, [('started_at', -1)]),
+    ("questions of unfinished sessions", 'quizzes', in_progress_filter('x', ['x']), None),
+    ("quiz pool claim", 'quiz_pool', pool_filter('x', 1), None),
+    ("quiz pool stale versions", 'quiz_pool', {'template': 'x', 'version': {'$ne': 1}}, None),
+    ("quiz pool refill marker", 'quiz_pool', {'_id': 'x', 'expires_at': {'$lte': NOW}}, None),
+    ("refresh token rotation", 'refresh_tokens', {'_id': 'x', 'used_at': None, 'expires_at': {'$gt': NOW}}, None),
+    ("refresh token family", 'refresh_tokens', {'family': 'x'}, None),
+    ("refresh tokens of a user", 'refresh_tokens', {'user_id': 'x'}, None),
+    ("token epoch", 'token_epochs', {'_id': 'x'}, None),
+    ("rate limit bucket", 'rate_limits', {'_id': 'x'}, None),
+    ("version counter", 'versions', {'_id': 'x'}, None)
+]
+
+
+def _stages(plan):
+    """Every stage name in an explain plan tree"""
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            yield plan['stage']
+        for value in plan.values():
+            yield from _stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _stages(item)
+
+
+def check_indexes():
+    """Returns the number of query shapes that need a collection scan"""
+    print("Applying index registry...")
+    ensure_indexes(db)
+
+    failures = 0
+    for description, collection, query, sort in QUERY_SHAPES:
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        stages = set(_stages(cursor.explain()['queryPlanner']['winningPlan']))
+
+        if 'COLLSCAN' in stages:
+            failures += 1
+            print(f"❌ {description} ({collection} {sorted(query)}): COLLSCAN")
+        else:
+            print(f"✅ {description}: {', '.join(sorted(stages))}")
+
+    return failures
+
+if __name__ == "__main__":
+    failed = check_indexes()
+    if failed:
+        print(f"\n{failed} query shape(s) are not covered by an index")
+        sys.exit(1)
+    print("\nAll query shapes use an index")
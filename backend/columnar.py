@@ -0,0 +1,153 @@
+"""
+Columnar export and import of the question bank (Parquet and Arrow IPC)
+
+Export reads questions in pages of EXPORT_BATCH_ROWS ordered by _id and
+writes each page as one Parquet row group or Arrow record batch, handing the
+bytes to the response as soon as the page is written, so memory stays flat
+for any bank size. Each page is its own short query, so a long export never
+runs into the client-wide operation timeout.
+
+Import reads a file back batch by batch, validates each row as a
+QuestionCreate and inserts the batch with one insert_many.
+
+pyarrow is imported on first use; it is too heavy to load at startup.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from database import questions_collection
+
+EXPORT_BATCH_ROWS = 50_000
+IMPORT_BATCH_ROWS = 10_000
+
+FORMATS = {
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.file', 'arrow'),
+}
+
+_EXPORT_PROJECTION = {
+    'id': 1, 'question': 1, 'options': 1, 'answer': 1, 'category': 1, 'difficulty': 1,
+    'explanation': 1, 'created_by': 1, 'created_at': 1, 'generatedByAI': 1, 'sourceType': 1
+}
+
+
+def question_schema():
+    import pyarrow as pa
+    return pa.schema([
+        ('id', pa.string()),
+        ('question', pa.string()),
+        ('options', pa.list_(pa.string())),
+        ('answer', pa.string()),
+        ('category', pa.string()),
+        ('difficulty', pa.string()),
+        ('explanation', pa.string()),
+        ('created_by', pa.string()),
+        ('created_at', pa.timestamp('ms')),
+        ('generatedByAI', pa.bool_()),
+        ('sourceType', pa.string()),
+    ])
+
+
+class _ChunkSink:
+    """Write-only file object whose contents are drained after each row group"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _pages(query: Dict[str, Any], batch_rows: int) -> Iterator[List[dict]]:
+    """Questions in _id order, one bounded query per page"""
+    last_id = None
+    while True:
+        page_query = query if last_id is None else {**query, '_id': {'$gt': last_id}}
+        page = list(questions_collection.find(page_query, _EXPORT_PROJECTION).sort('_id', 1).limit(batch_rows))
+        if not page:
+            return
+        last_id = page[-1]['_id']
+        yield page
+        if len(page) < batch_rows:
+            return
+
+
+def _columns(page: List[dict]) -> Dict[str, list]:
+    return {
+        'id': [q['id'] for q in page],
+        'question': [q['question'] for q in page],
+        'options': [q['options'] for q in page],
+        'answer': [q['answer'] for q in page],
+        'category': [q['category'] for q in page],
+        'difficulty': [q.get('difficulty') or 'medium' for q in page],
+        'explanation': [q.get('explanation') for q in page],
+        'created_by': [q.get('created_by') for q in page],
+        'created_at': [q.get('created_at') for q in page],
+        'generatedByAI': [q.get('generatedByAI') for q in page],
+        'sourceType': [q.get('sourceType') for q in page],
+    }
+
+
+def export_questions(fmt: str, query: Optional[Dict[str, Any]] = None, batch_rows: int = EXPORT_BATCH_ROWS) -> Iterator[bytes]:
+    """Encoded file, yielded one row group at a time"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = question_schema()
+    sink = _ChunkSink()
+    if fmt == 'parquet':
+        writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    else:
+        writer = pa.ipc.new_file(sink, schema, options=pa.ipc.IpcWriteOptions(compression='zstd'))
+
+    for page in _pages(query or {}, batch_rows):
+        batch = pa.RecordBatch.from_pydict(_columns(page), schema=schema)
+        if fmt == 'parquet':
+            writer.write_batch(batch, row_group_size=len(page))
+        else:
+            writer.write_batch(batch)
+        yield sink.drain()
+
+    writer.close()
+    yield sink.drain()
+
+
+def read_batches(fileobj, filename: str, batch_rows: int = IMPORT_BATCH_ROWS) -> Iterator[List[dict]]:
+    """Rows of a Parquet or Arrow IPC file as lists of dicts, one batch at a time"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if filename.endswith('.parquet'):
+        for batch in pq.ParquetFile(fileobj).iter_batches(batch_size=batch_rows):
+            yield batch.to_pylist()
+    elif filename.endswith(('.arrow', '.feather')):
+        reader = pa.ipc.open_file(fileobj)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i).to_pylist()
+    else:
+        raise ValueError("File must be Parquet (.parquet) or Arrow IPC (.arrow, .feather)")
+
+
+def export_filename(fmt: str) -> str:
+    return f"questions_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{FORMATS[fmt][1]}"
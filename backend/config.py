@@ -7,8 +7,29 @@ load_dotenv()
 class Settings(BaseSettings):
     mongo_url: str = os.environ.get('MONGO_URL', 'mongodb://localhost:27017/')
     database_name: str = os.environ.get('DATABASE_NAME', 'java_quiz_db')
+    mongo_max_pool_size: int = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+    mongo_min_pool_size: int = int(os.environ.get('MONGO_MIN_POOL_SIZE', '0'))
+    mongo_connect_timeout_ms: int = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '5000'))
+    mongo_server_selection_timeout_ms: int = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+    # Default time limit for every operation (0 disables it, e.g. for long maintenance scripts)
+    mongo_max_time_ms: int = int(os.environ.get('MONGO_MAX_TIME_MS', '10000'))
     secret_key: str = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production-2024')
     algorithm: str = os.environ.get('ALGORITHM', 'HS256')
     access_token_expire_minutes: int = int(os.environ.get('ACCESS_TOKEN_EXPIRE_MINUTES', '30'))
+    refresh_token_expire_days: int = int(os.environ.get('REFRESH_TOKEN_EXPIRE_DAYS', '14'))
+    # Load grading answers, the adaptive index and the global leaderboard at worker start
+    warm_caches: bool = os.environ.get('WARM_CACHES', 'true').lower() == 'true'
+    rate_limit_enabled: bool = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    # 'local' (per worker) or 'mongo' (shared by all workers)
+    rate_limit_backend: str = os.environ.get('RATE_LIMIT_BACKEND', 'local')
+    # Overrides of the default budgets, "path=capacity/seconds;..."
+    rate_limits: str = os.environ.get('RATE_LIMITS', '')
+    # Share of requests profiled until an admin changes it at runtime (0 disables sampling)
+    profile_sample_rate: float = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+    profile_interval_ms: float = float(os.environ.get('PROFILE_INTERVAL_MS', '5'))
+    profile_dir: str = os.environ.get('PROFILE_DIR', '/tmp/quiz-profiles')
+    profile_max_files: int = int(os.environ.get('PROFILE_MAX_FILES', '200'))
+    # Bearer token for Prometheus scrapers of /api/metrics (admins' access tokens also work)
+    metrics_token: str = os.environ.get('METRICS_TOKEN', '')
 
 settings = Settings()
\ No newline at end of file
@@ -1,7 +1,20 @@
 from pymongo import MongoClient
 from config import settings
+from metrics import MongoCommandMetrics
 
-client = MongoClient(settings.mongo_url)
+# connect=False: nothing touches the network until the app lifespan calls
+# connect() or the first operation runs, so modules import without a server
+client = MongoClient(
+    settings.mongo_url,
+    maxPoolSize=settings.mongo_max_pool_size,
+    minPoolSize=settings.mongo_min_pool_size,
+    connectTimeoutMS=settings.mongo_connect_timeout_ms,
+    serverSelectionTimeoutMS=settings.mongo_server_selection_timeout_ms,
+    # Client-side operation timeout; also sent to the server as maxTimeMS
+    timeoutMS=settings.mongo_max_time_ms or None,
+    event_listeners=[MongoCommandMetrics()],
+    connect=False
+)
 db = client[settings.database_name]
 
 # Collections
@@ -10,10 +23,31 @@ questions_collection = db['questions']
 quizzes_collection = db['quizzes']
 results_collection = db['results']
 bookmarks_collection = db['bookmarks']
+progress_collection = db['progress']
+leaderboard_collection = db['leaderboard']
+reviews_collection = db['reviews']
+quiz_pool_collection = db['quiz_pool']
+versions_collection = db['versions']
+runtime_config_collection = db['runtime_config']
+token_epochs_collection = db['token_epochs']
+refresh_tokens_collection = db['refresh_tokens']
+rate_limits_collection = db['rate_limits']
 
-# Create indexes
-users_collection.create_index('email', unique=True)
-questions_collection.create_index('category')
-questions_collection.create_index('difficulty')
-bookmarks_collection.create_index([('user_id', 1), ('question_id', 1)], unique=True)
-bookmarks_collection.create_index('user_id')
\ No newline at end of file
+# Fields quiz takers may see; answer and explanation are never read for them
+PUBLIC_QUESTION_PROJECTION = {
+    '_id': 0,
+    'id': 1,
+    'question': 1,
+    'options': 1,
+    'category': 1,
+    'difficulty': 1
+}
+
+
+def connect():
+    """Open the connection pool and fail fast if the server is unreachable"""
+    client.admin.command('ping')
+
+
+def close():
+    client.close()
@@ -0,0 +1,292 @@
+"""
+Script to bulk-generate synthetic questions, users, bookmarks and results for scale testing
+
+Categories, difficulties, user activity and question popularity follow skewed
+(Zipf-like) distributions, like a real bank where a few topics and a few
+heavy users dominate. Documents are written with insert_many in batches by a
+pool of worker processes. The same --seed always produces the same data,
+regardless of the number of workers.
+
+Usage:
+    python generate_data.py --db java_quiz_scale --questions 1000000 --users 100000 --bookmarks 2000000 --results 500000
+    python generate_data.py --db java_quiz_scale --questions 50000 --drop --seed 7
+--db is required, and --drop refuses the app database (DATABASE_NAME).
+Run rebuild_progress.py against the same database afterwards to build
+progress rollups for the generated results.
+"""
+import argparse
+import multiprocessing
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from pymongo import MongoClient
+from pymongo.errors import BulkWriteError
+
+from auth import get_password_hash
+from config import settings
+from indexes import ensure_indexes
+
+CATEGORIES = [
+    "OOP Concepts", "Collections", "Exceptions", "Multithreading", "Generics",
+    "Streams", "JVM Internals", "Strings", "Design Patterns", "Java 17 Features",
+    "Lambdas", "File I/O", "JDBC", "Annotations", "Memory Management"
+]
+DIFFICULTIES = ["easy", "medium", "hard"]
+DIFFICULTY_WEIGHTS = [0.5, 0.35, 0.15]
+CORRECT_RATE = [0.8, 0.6, 0.4]
+
+PASSWORD = "Synthetic@123"
+QUIZ_LENGTH = 10
+
+# One namespace per kind keeps IDs stable across runs with the same seed
+_NAMESPACE = uuid.UUID('6f1c2d4e-8b1a-4c55-9a0e-3f7d2b9c1e55')
+
+# Filled in the parent before the pool forks, read by the workers
+_plan: Dict = {}
+_db = None
+
+
+def user_email(i: int) -> str:
+    return f"user{i}@synthetic.quiz"
+
+
+def synthetic_id(seed: int, kind: str, i: int) -> str:
+    return str(uuid.uuid5(_NAMESPACE, f"{seed}:{kind}:{i}"))
+
+
+def zipf_weights(n: int, exponent: float) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def build_plan(args) -> Dict:
+    """Per-question attributes, drawn once so every batch agrees on them"""
+    rng = np.random.default_rng(args.seed)
+    category = rng.choice(len(CATEGORIES), size=args.questions, p=zipf_weights(len(CATEGORIES), 1.1)).astype(np.int8)
+    difficulty = rng.choice(len(DIFFICULTIES), size=args.questions, p=DIFFICULTY_WEIGHTS).astype(np.int8)
+    answer = rng.integers(0, 4, size=args.questions, dtype=np.int8)
+    # Popularity rank of questions (for bookmarks) is a random permutation
+    popularity = rng.permutation(args.questions)
+    return {
+        'seed': args.seed,
+        'questions': args.questions,
+        'users': args.users,
+        'days': args.days,
+        'now': datetime.utcnow().replace(microsecond=0),
+        'hashed_password': get_password_hash(PASSWORD),
+        'category': category,
+        'difficulty': difficulty,
+        'answer': answer,
+        'popularity': popularity,
+        'by_category': [np.flatnonzero(category == c) for c in range(len(CATEGORIES))],
+        'mongo_url': args.mongo_url,
+        'db': args.db
+    }
+
+
+def _init_worker():
+    global _db
+    _db = MongoClient(_plan['mongo_url'])[_plan['db']]
+
+
+def _options(i: int) -> List[str]:
+    return [f"Option {letter} for question {i}" for letter in "ABCD"]
+
+
+def _questions(start: int, count: int, rng) -> List[dict]:
+    seed, now = _plan['seed'], _plan['now']
+    ages = rng.integers(0, _plan['days'] * 86400, size=count)
+    docs = []
+    for offset in range(count):
+        i = start + offset
+        options = _options(i)
+        category = CATEGORIES[_plan['category'][i]]
+        docs.append({
+            'id': synthetic_id(seed, 'question', i),
+            'question': f"[{category}] Synthetic question {i}: which of the following is true?",
+            'options': options,
+            'answer': options[_plan['answer'][i]],
+            'category': category,
+            'difficulty': DIFFICULTIES[_plan['difficulty'][i]],
+            'explanation': f"Option {'ABCD'[_plan['answer'][i]]} is correct for synthetic question {i}.",
+            'created_by': 'generator',
+            'created_at': now - timedelta(seconds=int(ages[offset]))
+        })
+    return docs
+
+
+def _users(start: int, count: int, rng) -> List[dict]:
+    seed, now, hashed = _plan['seed'], _plan['now'], _plan['hashed_password']
+    return [
+        {
+            'id': synthetic_id(seed, 'user', i),
+            'email': user_email(i),
+            'username': f"synthetic_user_{i}",
+            'full_name': f"Synthetic User {i}",
+            'hashed_password': hashed,
+            'role': 'user',
+            'created_at': now - timedelta(days=_plan['days'])
+        }
+        for i in range(start, start + count)
+    ]
+
+
+def _active_users(rng, count: int) -> np.ndarray:
+    # A few users do most of the activity
+    return rng.choice(_plan['users'], size=count, p=_user_weights())
+
+
+_cached_user_weights: Optional[np.ndarray] = None
+
+
+def _user_weights() -> np.ndarray:
+    global _cached_user_weights
+    if _cached_user_weights is None:
+        _cached_user_weights = zipf_weights(_plan['users'], 0.9)
+    return _cached_user_weights
+
+
+def _bookmarks(start: int, count: int, rng) -> List[dict]:
+    seed, now = _plan['seed'], _plan['now']
+    users = _active_users(rng, count)
+    ranks = np.minimum(rng.zipf(1.3, size=count) - 1, _plan['questions'] - 1)
+    questions = _plan['popularity'][ranks]
+    ages = rng.integers(0, _plan['days'] * 86400, size=count)
+    return [
+        {
+            'id': synthetic_id(seed, 'bookmark', start + k),
+            'user_id': synthetic_id(seed, 'user', int(users[k])),
+            'question_id': synthetic_id(seed, 'question', int(questions[k])),
+            'created_at': now - timedelta(seconds=int(ages[k]))
+        }
+        for k in range(count)
+    ]
+
+
+def _results(start: int, count: int, rng) -> List[dict]:
+    seed, now = _plan['seed'], _plan['now']
+    users = _active_users(rng, count)
+    categories = rng.choice(len(CATEGORIES), size=count, p=zipf_weights(len(CATEGORIES), 1.1))
+    ages = rng.integers(0, _plan['days'] * 86400, size=count)
+    docs = []
+    for k in range(count):
+        pool = _plan['by_category'][categories[k]]
+        if not len(pool):
+            continue
+        picked = rng.choice(pool, size=min(QUIZ_LENGTH, len(pool)), replace=False)
+        hits = rng.random(len(picked)) < np.take(CORRECT_RATE, _plan['difficulty'][picked])
+
+        answers, correct, groups = [], [], {}
+        for q, hit in zip(picked.tolist(), hits.tolist()):
+            options = _options(q)
+            right = int(_plan['answer'][q])
+            answers.append(options[right] if hit else options[(right + 1) % 4])
+            correct.append(hit)
+            key = (CATEGORIES[_plan['category'][q]], DIFFICULTIES[_plan['difficulty'][q]])
+            group = groups.setdefault(key, {'category': key[0], 'difficulty': key[1], 'answered': 0, 'correct': 0})
+            group['answered'] += 1
+            group['correct'] += hit
+
+        score = sum(correct)
+        docs.append({
+            'id': synthetic_id(seed, 'result', start + k),
+            'user_id': synthetic_id(seed, 'user', int(users[k])),
+            'question_ids': [synthetic_id(seed, 'question', q) for q in picked.tolist()],
+            'answers': answers,
+            'correct': correct,
+            'score': score,
+            'total': len(picked),
+            'percentage': round(score * 100 / len(picked)),
+            'category': CATEGORIES[categories[k]],
+            'difficulty': None,
+            'time_spent': int(rng.integers(60, 900)),
+            'submitted_at': now - timedelta(seconds=int(ages[k])),
+            'breakdown': list(groups.values())
+        })
+    return docs
+
+
+_BUILDERS = {
+    'questions': _questions,
+    'users': _users,
+    'bookmarks': _bookmarks,
+    'results': _results
+}
+
+
+def _write_batch(task: Tuple[str, int, int, int]) -> Tuple[str, int]:
+    kind, index, start, count = task
+    # Each batch has its own stream, so output does not depend on scheduling
+    rng = np.random.default_rng([_plan['seed'], list(_BUILDERS).index(kind), index])
+    docs = _BUILDERS[kind](start, count, rng)
+    if not docs:
+        return kind, 0
+    try:
+        inserted = len(_db[kind].insert_many(docs, ordered=False).inserted_ids)
+    except BulkWriteError as e:
+        # Duplicate (user, question) bookmarks are expected with skewed picks
+        inserted = e.details['nInserted']
+    return kind, inserted
+
+
+def _tasks(kind: str, total: int, batch_size: int):
+    for index, start in enumerate(range(0, total, batch_size)):
+        yield kind, index, start, min(batch_size, total - start)
+
+
+def generate(args) -> Dict[str, int]:
+    global _plan
+    db = MongoClient(args.mongo_url)[args.db]
+    if args.drop:
+        for kind in _BUILDERS:
+            db[kind].drop()
+    ensure_indexes(db)
+
+    _plan = build_plan(args)
+    counts = {'questions': args.questions, 'users': args.users, 'bookmarks': args.bookmarks, 'results': args.results}
+    written = dict.fromkeys(counts, 0)
+
+    context = multiprocessing.get_context('fork')
+    with context.Pool(args.workers, initializer=_init_worker) as pool:
+        for kind, total in counts.items():
+            if not total:
+                continue
+            start = time.perf_counter()
+            for _, inserted in pool.imap_unordered(_write_batch, _tasks(kind, total, args.batch_size)):
+                written[kind] += inserted
+            elapsed = time.perf_counter() - start
+            print(f"✅ {kind}: {written[kind]:,} written in {elapsed:.1f}s ({written[kind] / elapsed:,.0f}/s)")
+
+    # Running APIs drop their cached ETags and lists for the new bank
+    db['versions'].update_one({'_id': 'questions'}, {'$inc': {'version': 1}}, upsert=True)
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic quiz dataset")
+    parser.add_argument('--questions', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--bookmarks', type=int, default=0)
+    parser.add_argument('--results', type=int, default=0)
+    parser.add_argument('--days', type=int, default=90, help="spread created/submitted dates over this many days")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 4)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--mongo-url', default=settings.mongo_url)
+    parser.add_argument('--db', required=True, help="database to fill")
+    parser.add_argument('--drop', action='store_true', help="drop questions, users, bookmarks and results first")
+    args = parser.parse_args()
+
+    if args.drop and args.db == settings.database_name:
+        parser.error(f"refusing to drop collections of the app database {args.db!r}; pass a different --db")
+
+    if (args.bookmarks or args.results) and not (args.questions and args.users):
+        parser.error("bookmarks and results need --questions and --users")
+
+    print(f"Generating into {args.db} with seed {args.seed} on {args.workers} worker(s)...")
+    generate(args)
+    print(f"Synthetic users log in with password {PASSWORD}")
@@ -0,0 +1,41 @@
+"""
+Gunicorn settings for the production server
+
+    cd /app/backend
+    gunicorn -c gunicorn.conf.py server:app
+
+Graceful restart (new workers are started, old ones finish in-flight
+requests for up to GRACEFUL_TIMEOUT seconds):
+    kill -HUP <master pid>
+"""
+import multiprocessing
+import os
+import shutil
+
+bind = os.environ.get('BIND', '0.0.0.0:8001')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'workers.ProductionWorker'
+
+# AI generation requests can legitimately take tens of seconds
+timeout = int(os.environ.get('WORKER_TIMEOUT', '120'))
+graceful_timeout = int(os.environ.get('GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+
+# Recycle workers now and then to cap slow memory growth (0 disables it)
+max_requests = int(os.environ.get('MAX_REQUESTS', '0'))
+max_requests_jitter = max_requests // 10
+
+# Each worker keeps its own metrics; this directory lets /api/metrics
+# aggregate them. It must be set before any worker imports prometheus_client.
+metrics_dir = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/quiz-metrics')
+
+
+def on_starting(server):
+    # Samples left over from a previous master would be summed in
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,107 @@
+"""
+Index registry for Quiz Application
+Every index the routes and services rely on, declared in one place.
+Applying the registry is idempotent: create_indexes is a no-op for indexes
+that already exist with the same key and options.
+"""
+import logging
+import threading
+from typing import Dict, List
+
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.database import Database
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    'users': [
+        IndexModel('email', unique=True),
+        # Login accepts a username as well as an email
+        IndexModel('username', unique=True),
+        IndexModel('id', unique=True)
+    ],
+    'questions': [
+        IndexModel('id', unique=True),
+        # Faceted browsing filters on any of these and pages newest first;
+        # the category and difficulty prefixes also serve plain lookups
+        IndexModel([('category', ASCENDING), ('difficulty', ASCENDING), ('created_at', DESCENDING)]),
+        IndexModel([('difficulty', ASCENDING), ('created_at', DESCENDING)]),
+        IndexModel([('created_by', ASCENDING), ('created_at', DESCENDING)]),
+        IndexModel([('sourceType', ASCENDING), ('created_at', DESCENDING)]),
+        IndexModel([('generatedByAI', ASCENDING), ('created_at', DESCENDING)]),
+        IndexModel([('created_at', DESCENDING)]),
+        # Admin search; a collection can only have one text index
+        IndexModel(
+            [('question', TEXT), ('category', TEXT), ('options', TEXT), ('explanation', TEXT)],
+            weights={'question': 10, 'category': 5, 'options': 2, 'explanation': 1},
+            name='questions_text'
+        )
+    ],
+    'results': [
+        IndexModel('id', unique=True),
+        IndexModel([('user_id', ASCENDING), ('submitted_at', DESCENDING)])
+    ],
+    'bookmarks': [
+        IndexModel([('user_id', ASCENDING), ('question_id', ASCENDING)], unique=True),
+        IndexModel('user_id')
+    ],
+    'progress': [
+        IndexModel('user_id', unique=True)
+    ],
+    'leaderboard': [
+        IndexModel([('board', ASCENDING), ('user_id', ASCENDING)], unique=True),
+        IndexModel([('board', ASCENDING), ('score', DESCENDING)]),
+        IndexModel('expires_at', expireAfterSeconds=0)
+    ],
+    'reviews': [
+        IndexModel([('user_id', ASCENDING), ('question_id', ASCENDING)], unique=True),
+        IndexModel([('user_id', ASCENDING), ('due_at', ASCENDING)])
+    ],
+    'quizzes': [
+        IndexModel('id', unique=True),
+        IndexModel([('user_id', ASCENDING), ('status', ASCENDING), ('started_at', DESCENDING)]),
+        IndexModel('expires_at', expireAfterSeconds=0)
+    ],
+    # Refill markers are looked up by _id
+    'quiz_pool': [
+        IndexModel([('template', ASCENDING), ('version', ASCENDING)]),
+        IndexModel('expires_at', expireAfterSeconds=0)
+    ],
+    # Refresh tokens are looked up by _id (the token hash)
+    'refresh_tokens': [
+        IndexModel('user_id'),
+        IndexModel('family'),
+        IndexModel('expires_at', expireAfterSeconds=0)
+    ],
+    # Shared rate limit buckets (RATE_LIMIT_BACKEND=mongo), looked up by _id
+    'rate_limits': [
+        IndexModel('expires_at', expireAfterSeconds=0)
+    ]
+}
+
+
+def ensure_indexes(db: Database) -> Dict[str, List[str]]:
+    """
+    Create every registered index that does not exist yet
+
+    A collection whose indexes cannot be built (e.g. duplicate usernames
+    blocking the unique index) is logged and skipped; the rest still apply.
+
+    Returns:
+        Collection name -> index names as reported by the server
+    """
+    applied = {}
+    for name, models in INDEXES.items():
+        try:
+            applied[name] = db[name].create_indexes(models)
+        except PyMongoError as e:
+            logger.error("Could not apply indexes on %s: %s", name, e)
+    return applied
+
+
+def ensure_indexes_in_background(db: Database) -> threading.Thread:
+    """Apply the registry on a daemon thread so startup does not wait for index builds"""
+    thread = threading.Thread(target=ensure_indexes, args=(db,), name='ensure-indexes', daemon=True)
+    thread.start()
+    return thread
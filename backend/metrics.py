@@ -0,0 +1,180 @@
+"""
+Metrics for Quiz Application
+Prometheus collectors served at /api/metrics:
+- Per-route request latency, in-flight requests and status codes
+- Mongo command timings from a pymongo CommandListener
+- LLM call latency and token counts from AIService
+- Cache hit/miss counts (hit ratio = hits / (hits + misses))
+- Requests rejected by the rate limiter
+Instrumentation is kept to a few counter/histogram updates per request; the
+HTTP middleware is plain ASGI to avoid BaseHTTPMiddleware's extra task.
+"""
+import os
+import time
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    disable_created_metrics,
+    generate_latest,
+    multiprocess
+)
+from pymongo import monitoring
+
+# *_created series double the scrape size and are not used by our dashboards
+disable_created_metrics()
+
+# Request latencies are mostly single-digit milliseconds; AI calls take seconds
+HTTP_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MONGO_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0)
+LLM_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+
+# Requests that matched no route share one label, so bad paths cannot blow up cardinality
+UNMATCHED_ROUTE = 'unmatched'
+
+http_request_duration = Histogram(
+    'quiz_http_request_duration_seconds',
+    'HTTP request latency by route template',
+    ['method', 'route'],
+    buckets=HTTP_BUCKETS
+)
+http_requests = Counter(
+    'quiz_http_requests_total',
+    'HTTP responses by route template and status code',
+    ['method', 'route', 'status']
+)
+http_in_flight = Gauge(
+    'quiz_http_requests_in_flight',
+    'HTTP requests currently being served',
+    multiprocess_mode='livesum'
+)
+
+mongo_command_duration = Histogram(
+    'quiz_mongo_command_duration_seconds',
+    'Mongo command round trip time by command name',
+    ['command'],
+    buckets=MONGO_BUCKETS
+)
+mongo_command_failures = Counter(
+    'quiz_mongo_command_failures_total',
+    'Mongo commands that returned an error',
+    ['command']
+)
+
+llm_call_duration = Histogram(
+    'quiz_llm_call_duration_seconds',
+    'LLM call latency by AIService operation',
+    ['operation', 'model'],
+    buckets=LLM_BUCKETS
+)
+llm_tokens = Counter(
+    'quiz_llm_tokens_total',
+    'Estimated LLM tokens (about 4 characters per token) by direction',
+    ['operation', 'model', 'direction']
+)
+
+cache_requests = Counter(
+    'quiz_cache_requests_total',
+    'Cache lookups by cache and outcome',
+    ['cache', 'result']
+)
+
+rate_limited = Counter(
+    'quiz_rate_limited_total',
+    'Requests rejected with 429 by route budget',
+    ['budget']
+)
+
+
+def _child_cache(metric):
+    """
+    Memoized metric.labels(...): resolving labels takes a lock and builds a
+    key on every call, which costs more than the observation itself
+    """
+    children = {}
+
+    def child(*labels):
+        found = children.get(labels)
+        if found is None:
+            found = children[labels] = metric.labels(*labels)
+        return found
+    return child
+
+
+_cache_requests = _child_cache(cache_requests)
+_http_duration = _child_cache(http_request_duration)
+_http_requests = _child_cache(http_requests)
+_mongo_duration = _child_cache(mongo_command_duration)
+
+
+def render() -> bytes:
+    """Text exposition of every metric, summed across workers under gunicorn"""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def record_cache(cache: str, hits: int, misses: int = 0):
+    """Count lookups against an in-process cache (or a conditional GET)"""
+    if hits:
+        _cache_requests(cache, 'hit').inc(hits)
+    if misses:
+        _cache_requests(cache, 'miss').inc(misses)
+
+
+def estimate_tokens(text: str) -> int:
+    # The LLM SDK only returns text, so token counts are estimated
+    return (len(text) + 3) // 4
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Feeds the duration pymongo already measured into the command histogram"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        _mongo_duration(event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        _mongo_duration(event.command_name).observe(event.duration_micros / 1e6)
+        mongo_command_failures.labels(event.command_name).inc()
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request by its route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        http_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_in_flight.dec()
+            # The router stores the matched route on the scope
+            route = scope.get('route')
+            path = getattr(route, 'path', UNMATCHED_ROUTE)
+            method = scope['method']
+            _http_duration(method, path).observe(elapsed)
+            _http_requests(method, path, status_code).inc()
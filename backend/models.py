@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import List, Optional
+from pydantic import BaseModel, EmailStr, Field, model_validator
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 import uuid
 
@@ -26,9 +26,17 @@ class Token(BaseModel):
     token_type: str
     role: str
     username: str
+    refresh_token: Optional[str] = None
 
-class TokenData(BaseModel):
-    email: Optional[str] = None
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class CurrentUser(BaseModel):
+    """The caller, as read from access token claims"""
+    id: str
+    email: str
+    username: str
+    role: str
 
 class QuestionBase(BaseModel):
     question: str
@@ -54,6 +62,43 @@ class QuestionResponse(QuestionBase):
     created_by: str
     created_at: datetime
 
+class QuestionSearchHit(QuestionResponse):
+    score: float
+    # Field name -> HTML-escaped text with matches in <mark> tags
+    highlights: Dict[str, str] = {}
+
+class QuestionSearchResponse(BaseModel):
+    query: str
+    page: int
+    page_size: int
+    has_more: bool
+    results: List[QuestionSearchHit]
+
+class FacetCount(BaseModel):
+    value: Any
+    count: int
+
+class QuestionFacetResponse(BaseModel):
+    total: int
+    page: int
+    page_size: int
+    results: List[QuestionResponse]
+    # Facet name (category, difficulty, generatedByAI, sourceType, created_by) -> counts
+    facets: Dict[str, List[FacetCount]]
+
+class PublicQuestionResponse(BaseModel):
+    """Question as shown to quiz takers: no answer, no explanation"""
+    id: str
+    question: str
+    options: List[str]
+    category: str
+    difficulty: str = 'medium'
+
+class QuestionReveal(BaseModel):
+    question_id: str
+    answer: Optional[str] = None
+    explanation: Optional[str] = None
+
 class QuestionInDB(QuestionBase):
     id: str
     created_by: str
@@ -65,12 +110,190 @@ class BulkUploadResponse(BaseModel):
     total: int
     errors: List[str] = []
 
+class QuestionFilter(BaseModel):
+    """Same criteria as the facets endpoint; every given field must match"""
+    category: Optional[List[str]] = None
+    difficulty: Optional[List[str]] = None
+    generatedByAI: Optional[bool] = None
+    sourceType: Optional[List[str]] = None
+    created_by: Optional[List[str]] = None
+
+class QuestionSelection(BaseModel):
+    """Questions to act on: explicit IDs or a filter, not both"""
+    ids: Optional[List[str]] = None
+    filter: Optional[QuestionFilter] = None
+
+class QuestionBulkUpdate(QuestionSelection):
+    update: QuestionUpdate
+
+class BulkItemResult(BaseModel):
+    id: str
+    status: str  # updated, deleted, not_found or failed
+    error: Optional[str] = None
+
+class BulkOperationResponse(BaseModel):
+    matched: int
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
 class BookmarkCreate(BaseModel):
     question_id: str
 
+class BookmarkedQuestion(QuestionResponse):
+    # None while the question is part of the user's quiz in progress
+    answer: Optional[str] = None
+
 class BookmarkResponse(BaseModel):
     id: str
     user_id: str
     question_id: str
-    question: QuestionResponse
-    created_at: datetime
\ No newline at end of file
+    question: BookmarkedQuestion
+    created_at: datetime
+
+# Longest quiz /quiz/start hands out; submissions are held to the same size
+MAX_QUIZ_QUESTIONS = 100
+
+class QuizSubmission(BaseModel):
+    question_ids: List[str] = Field(..., max_length=MAX_QUIZ_QUESTIONS)
+    answers: List[Optional[str]] = Field(..., max_length=MAX_QUIZ_QUESTIONS)
+    category: Optional[str] = None
+    difficulty: Optional[str] = None
+    time_spent: int = 0  # seconds
+
+    @model_validator(mode='after')
+    def check_answers(self):
+        # Repeated IDs would count one known answer many times over
+        if len(set(self.question_ids)) != len(self.question_ids):
+            raise ValueError("question_ids must not repeat")
+        if len(self.answers) != len(self.question_ids):
+            raise ValueError("answers must have one entry per question")
+        return self
+
+class QuizResultResponse(BaseModel):
+    id: str
+    user_id: str
+    question_ids: List[str]
+    answers: List[Optional[str]]
+    correct: List[bool]
+    score: int
+    total: int
+    percentage: int
+    category: Optional[str] = None
+    difficulty: Optional[str] = None
+    time_spent: int = 0
+    submitted_at: datetime
+    reveal: Optional[List[QuestionReveal]] = None
+
+class ClassQuizSubmission(QuizSubmission):
+    user_id: str
+
+class BatchSubmitRequest(BaseModel):
+    submissions: List[ClassQuizSubmission]
+
+class BatchSubmitResponse(BaseModel):
+    graded: int
+    results: List[QuizResultResponse]
+
+class TopicProgress(BaseModel):
+    name: str
+    answered: int = 0
+    correct: int = 0
+    accuracy: int = 0  # percentage
+    quizzes: Optional[int] = None
+
+class RecentAttempt(BaseModel):
+    result_id: str
+    score: int
+    total: int
+    percentage: int
+    category: Optional[str] = None
+    difficulty: Optional[str] = None
+    submitted_at: datetime
+
+class ProgressResponse(BaseModel):
+    user_id: str
+    quizzes_taken: int = 0
+    questions_answered: int = 0
+    correct_answers: int = 0
+    accuracy: int = 0  # percentage
+    time_spent: int = 0
+    current_streak: int = 0
+    best_streak: int = 0
+    last_quiz_at: Optional[datetime] = None
+    by_category: List[TopicProgress] = []
+    by_difficulty: List[TopicProgress] = []
+    recent: List[RecentAttempt] = []
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    user_id: str
+    username: Optional[str] = None
+    score: int
+
+class LeaderboardResponse(BaseModel):
+    board: str
+    total_players: int
+    entries: List[LeaderboardEntry]
+    me: Optional[LeaderboardEntry] = None
+
+class ReviewItem(BaseModel):
+    question: PublicQuestionResponse
+    sources: List[str]  # 'bookmark', 'missed'
+    ease: float
+    interval_days: int
+    repetitions: int
+    due_at: datetime
+
+class ReviewBatchResponse(BaseModel):
+    due_count: int
+    items: List[ReviewItem]
+
+class ReviewAnswerRequest(BaseModel):
+    question_id: str
+    answer: str
+
+class ReviewAnswerResponse(BaseModel):
+    question_id: str
+    correct: bool
+    answer: Optional[str] = None
+    explanation: Optional[str] = None
+    interval_days: int
+    due_at: datetime
+
+class QuizStartRequest(BaseModel):
+    category: Optional[str] = None
+    difficulty: Optional[str] = None
+    limit: int = 10
+    mode: str = 'random'  # 'random' or 'adaptive'
+
+class QuizSessionResponse(BaseModel):
+    id: str
+    category: Optional[str] = None
+    difficulty: Optional[str] = None
+    mode: str
+    questions: List[PublicQuestionResponse]
+    answers: List[Optional[str]]
+    current_index: int = 0
+    status: str  # 'in_progress' or 'submitted'
+    result_id: Optional[str] = None
+    started_at: datetime
+    updated_at: datetime
+
+class QuizProgressUpdate(BaseModel):
+    answers: List[Optional[str]]
+    current_index: int = 0
+
+class QuizSessionSubmit(BaseModel):
+    answers: Optional[List[Optional[str]]] = None
+    time_spent: int = 0  # seconds
+
+
+class ProfilingSettings(BaseModel):
+    sample_rate: float = Field(..., ge=0, le=1)
+
+class ProfilingStatus(BaseModel):
+    sample_rate: float
+    interval_ms: float
+    profile_dir: str
+    recent_files: List[str]
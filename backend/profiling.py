@@ -0,0 +1,178 @@
+"""
+On-demand sampling profiler for live requests
+A request is profiled when it is picked by the sample rate, or when an admin
+sends the X-Profile header. While it runs, a helper thread samples the stack
+of the thread serving it (wall clock, every few milliseconds) and the counts
+are written as collapsed stacks ("frame;frame;frame count" per line), ready
+for flamegraph.pl or speedscope, into a directory that keeps only the newest
+files.
+
+The handlers are async and call pymongo, bcrypt, pydantic and reportlab
+synchronously, so the event loop thread is the one doing the work. Other
+requests interleaving on the loop at the same time also show up in samples.
+"""
+import logging
+import os
+import random
+import re
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+from pymongo.errors import PyMongoError
+
+from auth import decode_access_token
+from config import settings
+from database import runtime_config_collection
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b'x-profile'
+
+# Seconds before the shared sample rate is re-read, so a change made through
+# the admin endpoint reaches every worker without a restart
+REFRESH_INTERVAL = 30
+
+
+_STDLIB = sysconfig.get_paths()['stdlib'] + os.sep
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename.rsplit('site-packages' + os.sep, 1)[-1].removeprefix(_STDLIB)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Samples one thread's stack on a fixed interval until stopped"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+
+class Profiler:
+    """Decides which requests to profile and stores their collapsed stacks"""
+
+    def __init__(self):
+        self._sample_rate = settings.profile_sample_rate
+        self._loaded_at: Optional[float] = None
+
+    def sample_rate(self) -> float:
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > REFRESH_INTERVAL:
+            try:
+                doc = runtime_config_collection.find_one({'_id': 'profiling'})
+                self._sample_rate = doc['sample_rate'] if doc else settings.profile_sample_rate
+            except PyMongoError as e:
+                # Every request passes through here, /api/health included; an
+                # unreachable Mongo keeps the last rate until the next interval
+                logger.warning("Could not read the profiling sample rate: %s", e)
+            self._loaded_at = time.monotonic()
+        return self._sample_rate
+
+    def set_sample_rate(self, rate: float):
+        runtime_config_collection.update_one(
+            {'_id': 'profiling'},
+            {'$set': {'sample_rate': rate, 'updated_at': datetime.utcnow()}},
+            upsert=True
+        )
+        self._sample_rate = rate
+        self._loaded_at = time.monotonic()
+
+    def wants(self, scope) -> bool:
+        """Whether to profile this request"""
+        headers = scope['headers']
+        if any(key == PROFILE_HEADER for key, _ in headers):
+            authorization = next((value for key, value in headers if key == b'authorization'), b'')
+            return self._is_admin(authorization.decode('latin-1'))
+        rate = self.sample_rate()
+        return rate > 0 and random.random() < rate
+
+    @staticmethod
+    def _is_admin(authorization: str) -> bool:
+        scheme, _, token = authorization.partition(' ')
+        if scheme.lower() != 'bearer' or not token:
+            return False
+        user = decode_access_token(token)
+        return user is not None and user.role == 'admin'
+
+    def write(self, samples: Counter, method: str, route: str, elapsed: float) -> Optional[str]:
+        """Write one request's stacks and drop the oldest files beyond the limit"""
+        if not samples:
+            return None
+        os.makedirs(settings.profile_dir, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', route).strip('_') or 'root'
+        name = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}-{method}-{slug}-{elapsed * 1000:.0f}ms.folded"
+        path = os.path.join(settings.profile_dir, name)
+        with open(path, 'w') as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+        self._rotate()
+        return path
+
+    @staticmethod
+    def recent(limit: int = 20):
+        """Newest profile file names first"""
+        if not os.path.isdir(settings.profile_dir):
+            return []
+        files = sorted((f for f in os.listdir(settings.profile_dir) if f.endswith('.folded')), reverse=True)
+        return files[:limit]
+
+    @staticmethod
+    def _rotate():
+        files = sorted(f for f in os.listdir(settings.profile_dir) if f.endswith('.folded'))
+        for old in files[:-settings.profile_max_files]:
+            try:
+                os.remove(os.path.join(settings.profile_dir, old))
+            except FileNotFoundError:
+                pass
+
+
+profiler = Profiler()
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that samples the stacks of selected requests"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not profiler.wants(scope):
+            await self.app(scope, receive, send)
+            return
+
+        sampler = StackSampler(threading.get_ident(), settings.profile_interval_ms / 1000)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            samples = sampler.stop()
+            route = getattr(scope.get('route'), 'path', scope['path'])
+            profiler.write(samples, scope['method'], route, time.perf_counter() - start)
@@ -0,0 +1,271 @@
+"""
+Rate limiting for expensive routes
+Token buckets per route budget and caller: a bucket holds up to `capacity`
+requests and refills `capacity` every `seconds`. Callers are keyed by user id
+when the request carries a valid access token, by client IP otherwise (run
+behind a proxy with FORWARDED_ALLOW_IPS so the IP is the real client's).
+
+Budgets cover login, register, refresh and the AI routes, which spend bcrypt
+time or LLM budget. Other requests pass straight through after one dict
+lookup.
+
+Backends:
+- local: buckets in this process; each gunicorn worker has its own, so the
+  effective budget is multiplied by the number of workers
+- mongo: buckets shared by every worker through Mongo. Requests still spend
+  from the local bucket, so no request waits on Mongo; a background thread
+  writes the spent tokens back every FLUSH_INTERVAL seconds and adopts the
+  shared balance
+"""
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import orjson
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+
+from auth import decode_access_token
+from config import settings
+from database import rate_limits_collection
+from metrics import rate_limited
+
+logger = logging.getLogger(__name__)
+
+
+class Budget(NamedTuple):
+    capacity: int
+    seconds: float
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.seconds
+
+
+# Paths ending in '/' are prefixes. Anonymous budgets are per IP, and a
+# classroom behind one NAT logs in at once, so they allow generous bursts.
+DEFAULT_BUDGETS: Dict[str, Budget] = {
+    '/api/auth/login': Budget(60, 60),
+    '/api/auth/register': Budget(30, 600),
+    '/api/auth/refresh': Budget(120, 60),
+    '/api/ai/': Budget(30, 3600),
+}
+
+
+def parse_budgets(spec: str) -> Dict[str, Budget]:
+    """Read "path=capacity/seconds;..." (e.g. "/api/auth/login=5/60;/api/ai/=50/3600")"""
+    budgets = {}
+    for item in filter(None, (part.strip() for part in spec.split(';'))):
+        path, _, limit = item.partition('=')
+        capacity, _, seconds = limit.partition('/')
+        budgets[path.strip()] = Budget(int(capacity), float(seconds))
+    return budgets
+
+
+class RateLimitBackend(ABC):
+    """Stores token buckets; take() spends one token"""
+
+    @abstractmethod
+    def take(self, key: str, budget: Budget) -> float:
+        """0 if the request may proceed, otherwise seconds until a token is available"""
+
+
+class LocalBackend(RateLimitBackend):
+    """
+    Buckets in a dict of [tokens, updated_at, full_at]
+    Only the event loop thread touches it, so no lock is needed. Buckets that
+    have refilled completely are equivalent to missing ones and are pruned
+    once the table grows past MAX_KEYS.
+    """
+
+    MAX_KEYS = 100_000
+
+    def __init__(self):
+        self._buckets: Dict[str, List[float]] = {}
+        self._prune_at = self.MAX_KEYS
+
+    def take(self, key: str, budget: Budget) -> float:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self._prune_at:
+                self._prune(now)
+            bucket = self._buckets[key] = [float(budget.capacity), now, now]
+        else:
+            bucket[0] = min(budget.capacity, bucket[0] + (now - bucket[1]) * budget.rate)
+            bucket[1] = now
+
+        if bucket[0] < 1:
+            return (1 - bucket[0]) / budget.rate
+        bucket[0] -= 1
+        bucket[2] = now + (budget.capacity - bucket[0]) / budget.rate
+        return 0.0
+
+    def _prune(self, now: float):
+        self._buckets = {key: bucket for key, bucket in self._buckets.items() if bucket[2] > now}
+        # Under a flood of distinct keys, avoid rescanning on every insert
+        self._prune_at = max(self.MAX_KEYS, 2 * len(self._buckets))
+
+
+class MongoBackend(LocalBackend):
+    """
+    Buckets shared through the rate_limits collection
+    take() is LocalBackend.take() plus a count of the tokens spent per key.
+    Every FLUSH_INTERVAL seconds a daemon thread subtracts those counts from
+    the shared buckets (one pipeline update per key, refilled by elapsed time
+    first) and sets the local balance to the shared one, less whatever was
+    spent here meanwhile. Spending on other workers therefore shows up within
+    an interval; a burst can overshoot a budget by at most what the other
+    workers admit in that time, and the debt is paid back before the shared
+    bucket admits anything again.
+    """
+
+    FLUSH_INTERVAL = 1.0
+
+    def __init__(self):
+        super().__init__()
+        self._spent: Dict[str, List] = {}
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+
+    def take(self, key: str, budget: Budget) -> float:
+        wait = super().take(key, budget)
+        if not wait:
+            with self._lock:
+                self._spent.setdefault(key, [0, budget])[0] += 1
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_forever, name='rate-limit-flush', daemon=True)
+                self._flusher.start()
+        return wait
+
+    def _flush_forever(self):
+        while True:
+            time.sleep(self.FLUSH_INTERVAL)
+            self.flush()
+
+    def flush(self):
+        """Write the tokens spent since the last flush and adopt the shared balances"""
+        with self._lock:
+            spent, self._spent = self._spent, {}
+        for key, (count, budget) in spent.items():
+            try:
+                shared = self._spend_shared(key, count, budget)
+            except PyMongoError as e:
+                # Requests keep being limited by the local bucket alone
+                logger.warning("Could not sync rate limit bucket %s: %s", key, e)
+                continue
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                with self._lock:
+                    since = self._spent.get(key, [0])[0]
+                # Plain item stores: a take() racing with them is still sent
+                # to Mongo, it only drops out of the local balance until the
+                # next flush
+                now = time.monotonic()
+                bucket[0] = shared - since
+                bucket[1] = now
+                bucket[2] = now + (budget.capacity - bucket[0]) / budget.rate
+
+    @staticmethod
+    def _spend_shared(key: str, count: int, budget: Budget) -> float:
+        """Refill the shared bucket, take count tokens and return the balance (negative when in debt)"""
+        now = datetime.utcnow()
+        elapsed = {'$divide': [{'$subtract': [now, {'$ifNull': ['$updated_at', now]}]}, 1000]}
+        refilled = {'$min': [budget.capacity, {'$add': [{'$ifNull': ['$tokens', budget.capacity]},
+                                                        {'$multiply': [elapsed, budget.rate]}]}]}
+        doc = rate_limits_collection.find_one_and_update(
+            {'_id': key},
+            [
+                {'$set': {'tokens': refilled, 'updated_at': now}},
+                {'$set': {
+                    'tokens': {'$subtract': ['$tokens', count]},
+                    # A full bucket is the same as none, so it can expire
+                    'expires_at': now + timedelta(seconds=budget.seconds)
+                }}
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return doc['tokens']
+
+
+BACKENDS = {'local': LocalBackend, 'mongo': MongoBackend}
+
+
+class RateLimiter:
+    """Matches requests to budgets and callers to buckets"""
+
+    def __init__(self, budgets: Dict[str, Budget], backend: RateLimitBackend):
+        self.backend = backend
+        self._exact = {path: budget for path, budget in budgets.items() if not path.endswith('/')}
+        self._prefixes = [(path, budget) for path, budget in budgets.items() if path.endswith('/')]
+
+    def budget_for(self, path: str) -> Optional[Tuple[str, Budget]]:
+        budget = self._exact.get(path)
+        if budget is not None:
+            return path, budget
+        for prefix, budget in self._prefixes:
+            if path.startswith(prefix):
+                return prefix, budget
+        return None
+
+    @staticmethod
+    def caller(scope) -> str:
+        for key, value in scope['headers']:
+            if key == b'authorization':
+                scheme, _, token = value.decode('latin-1').partition(' ')
+                user = decode_access_token(token) if scheme.lower() == 'bearer' and token else None
+                if user is not None:
+                    return f"user:{user.id}"
+                break
+        client = scope.get('client')
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    def check(self, scope) -> Optional[Tuple[str, float]]:
+        """(budget path, seconds to wait) when the request is over budget, None otherwise"""
+        matched = self.budget_for(scope['path'])
+        if matched is None:
+            return None
+        path, budget = matched
+        wait = self.backend.take(f"{path}|{self.caller(scope)}", budget)
+        return (path, wait) if wait else None
+
+
+def build_rate_limiter() -> RateLimiter:
+    budgets = {**DEFAULT_BUDGETS, **parse_budgets(settings.rate_limits)}
+    return RateLimiter(budgets, BACKENDS[settings.rate_limit_backend]())
+
+
+class RateLimitMiddleware:
+    """ASGI middleware answering 429 with Retry-After for callers over budget"""
+
+    def __init__(self, app, limiter: Optional[RateLimiter] = None):
+        self.app = app
+        self.limiter = limiter or build_rate_limiter()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] == 'OPTIONS':
+            await self.app(scope, receive, send)
+            return
+
+        limited = self.limiter.check(scope)
+        if limited is None:
+            await self.app(scope, receive, send)
+            return
+
+        path, wait = limited
+        rate_limited.labels(path).inc()
+        body = orjson.dumps({'detail': 'Too many requests, please retry later'})
+        await send({
+            'type': 'http.response.start',
+            'status': 429,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+                (b'retry-after', str(max(1, round(wait))).encode())
+            ]
+        })
+        await send({'type': 'http.response.body', 'body': body})
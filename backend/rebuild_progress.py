@@ -0,0 +1,20 @@
+"""
+Script to recompute per-user progress rollups from stored quiz results
+"""
+import sys
+import pymongo
+from services.progress_service import progress_service
+
+def rebuild_progress(user_id=None):
+    """Rebuild rollups for one user, or for everyone if no user ID is given"""
+    target = f"user {user_id}" if user_id else "all users"
+    print(f"Rebuilding progress rollups for {target}...")
+    
+    # A full rebuild can outlast the per-operation time limit used for requests.
+    # 0 lifts the limit; None would inherit the client's timeoutMS.
+    with pymongo.timeout(0):
+        written = progress_service.rebuild(user_id)
+    print(f"✅ Rebuilt {written} rollup document(s)")
+
+if __name__ == "__main__":
+    rebuild_progress(sys.argv[1] if len(sys.argv) > 1 else None)
\ No newline at end of file
@@ -1,19 +1,17 @@
-from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File
-from fastapi.responses import FileResponse
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, Request, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
 import uuid
 import json
 import csv
 import io
 import os
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
-import pandas as pd
+
+from pymongo import DeleteOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from pydantic import ValidationError
 
 from auth import get_current_admin_user
 from models import (
@@ -21,16 +19,27 @@ from models import (
     QuestionResponse,
     QuestionUpdate,
     BulkUploadResponse,
-    UserInDB
+    QuestionSearchResponse,
+    QuestionFacetResponse,
+    QuestionSelection,
+    QuestionBulkUpdate,
+    BulkOperationResponse,
+    CurrentUser
 )
 from database import questions_collection
+import columnar
+import spreadsheet
+from serialization import fast_json, etag, not_modified, QUESTION_RESPONSE_PROJECTION
+from services.grading_service import grading_service
+from services.version_service import version_service
+from services.search_service import search_service, MAX_PAGE_SIZE, MAX_RESULTS
 
 router = APIRouter(prefix="/admin/questions", tags=["Admin - Questions"])
 
 @router.post("/add", response_model=QuestionResponse, status_code=status.HTTP_201_CREATED)
 async def add_question(
     question: QuestionCreate,
-    current_user: UserInDB = Depends(get_current_admin_user)
+    current_user: CurrentUser = Depends(get_current_admin_user)
 ):
     """Add a single question manually"""
     question_dict = question.model_dump()
@@ -39,53 +48,115 @@ async def add_question(
     question_dict['created_at'] = datetime.utcnow()
     
     questions_collection.insert_one(question_dict)
+    grading_service.sync_question(question_dict)
+    grading_service.advance(version_service.questions_changed())
     
     return QuestionResponse(**question_dict)
 
 @router.get("/get_all", response_model=List[QuestionResponse])
 async def get_all_questions(
+    request: Request,
     category: str = None,
     difficulty: str = None,
-    current_user: UserInDB = Depends(get_current_admin_user)
+    current_user: CurrentUser = Depends(get_current_admin_user)
 ):
     """Get all questions with optional filters"""
+    tag = etag('questions', version_service.question_bank())
+    cached = not_modified(request, tag)
+    if cached:
+        return cached
+    
     query = {}
     if category:
         query['category'] = category
     if difficulty:
         query['difficulty'] = difficulty
     
-    questions = list(questions_collection.find(query))
-    return [QuestionResponse(**q) for q in questions]
+    questions = questions_collection.aggregate([
+        {'$match': query},
+        {'$project': QUESTION_RESPONSE_PROJECTION}
+    ])
+    return fast_json(list(questions), tag=tag)
+
+@router.get("/search", response_model=QuestionSearchResponse)
+async def search_questions(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    category: str = None,
+    difficulty: str = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    current_user: CurrentUser = Depends(get_current_admin_user)
+):
+    """Full-text search over question, options, explanation and category, best matches first"""
+    if page * page_size > MAX_RESULTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Only the first {MAX_RESULTS} matches can be paged through; refine the search"
+        )
+
+    # Results only change with the bank; the query is part of the URL
+    tag = etag('questions', version_service.question_bank())
+    cached = not_modified(request, tag)
+    if cached:
+        return cached
+
+    return fast_json(search_service.search(q, category, difficulty, page, page_size), tag=tag)
+
+@router.get("/facets", response_model=QuestionFacetResponse)
+async def browse_questions(
+    request: Request,
+    category: Optional[List[str]] = Query(None),
+    difficulty: Optional[List[str]] = Query(None),
+    generatedByAI: Optional[bool] = None,
+    sourceType: Optional[List[str]] = Query(None),
+    created_by: Optional[List[str]] = Query(None),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    current_user: CurrentUser = Depends(get_current_admin_user)
+):
+    """Filtered page of questions with counts per category, difficulty, AI flag, source type and creator"""
+    tag = etag('questions', version_service.question_bank())
+    cached = not_modified(request, tag)
+    if cached:
+        return cached
+
+    return fast_json(
+        search_service.facets(category, difficulty, generatedByAI, sourceType, created_by, page, page_size),
+        tag=tag
+    )
 
 @router.put("/update/{question_id}", response_model=QuestionResponse)
 async def update_question(
     question_id: str,
     question_update: QuestionUpdate,
-    current_user: UserInDB = Depends(get_current_admin_user)
+    current_user: CurrentUser = Depends(get_current_admin_user)
 ):
     """Update a question"""
-    existing_question = questions_collection.find_one({"id": question_id})
-    if not existing_question:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Question not found"
-        )
-    
     update_data = question_update.model_dump(exclude_unset=True)
     if update_data:
-        questions_collection.update_one(
+        # One round trip: the update returns the edited document
+        updated_question = questions_collection.find_one_and_update(
             {"id": question_id},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
+        )
+    else:
+        updated_question = questions_collection.find_one({"id": question_id})
+    if not updated_question:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Question not found"
         )
     
-    updated_question = questions_collection.find_one({"id": question_id})
+    grading_service.sync_question(updated_question)
+    grading_service.advance(version_service.questions_changed())
     return QuestionResponse(**updated_question)
 
 @router.delete("/delete/{question_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_question(
     question_id: str,
-    current_user: UserInDB = Depends(get_current_admin_user)
+    current_user: CurrentUser = Depends(get_current_admin_user)
 ):
     """Delete a question"""
     result = questions_collection.delete_one({"id": question_id})
@@ -94,14 +165,121 @@ async def delete_question(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Question not found"
         )
+    grading_service.remove(question_id)
+    grading_service.advance(version_service.questions_changed())
     return None
 
+# Upper bound on the questions one bulk request may touch
+MAX_BULK_QUESTIONS = 10000
+
+def _select_questions(selection: QuestionSelection) -> Tuple[List[str], Dict[str, dict]]:
+    """
+    Requested IDs (in order) and the grading fields of those that exist,
+    read in one query
+    """
+    if (selection.ids is None) == (selection.filter is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide either ids or filter"
+        )
+    
+    if selection.ids is not None:
+        ids = list(dict.fromkeys(selection.ids))
+        query = {"id": {"$in": ids}}
+    else:
+        f = selection.filter
+        query = search_service.facet_filter(f.category, f.difficulty, f.generatedByAI, f.sourceType, f.created_by)
+        if not query:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="The filter must set at least one field"
+            )
+        ids = None
+    
+    found = {
+        q['id']: q
+        for q in questions_collection.find(query, {'_id': 0, 'id': 1, 'answer': 1, 'category': 1, 'difficulty': 1})
+        .limit(MAX_BULK_QUESTIONS + 1)
+    }
+    if len(found) > MAX_BULK_QUESTIONS or (ids and len(ids) > MAX_BULK_QUESTIONS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A bulk request can touch at most {MAX_BULK_QUESTIONS} questions"
+        )
+    return (ids if ids is not None else list(found)), found
+
+def _run_bulk(ids: List[str], found: Dict[str, dict], operation: Callable, done: str) -> BulkOperationResponse:
+    """Run one unordered bulk_write over the existing IDs and report every requested ID"""
+    targets = [question_id for question_id in ids if question_id in found]
+    errors = {}
+    if targets:
+        try:
+            questions_collection.bulk_write([operation(question_id) for question_id in targets], ordered=False)
+        except BulkWriteError as e:
+            errors = {targets[err['index']]: err.get('errmsg', 'write failed') for err in e.details['writeErrors']}
+    
+    results = []
+    for question_id in ids:
+        if question_id not in found:
+            results.append({"id": question_id, "status": "not_found"})
+        elif question_id in errors:
+            results.append({"id": question_id, "status": "failed", "error": errors[question_id]})
+        else:
+            results.append({"id": question_id, "status": done})
+    succeeded = len(targets) - len(errors)
+    return BulkOperationResponse(matched=len(targets), succeeded=succeeded, failed=len(errors), results=results)
+
+@router.post("/bulk_update", response_model=BulkOperationResponse)
+async def bulk_update_questions(
+    request: QuestionBulkUpdate,
+    current_user: CurrentUser = Depends(get_current_admin_user)
+):
+    """Apply the same change to a list of questions, or to every question matching a filter"""
+    update_data = request.update.model_dump(exclude_unset=True)
+    if not update_data:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Nothing to update"
+        )
+    
+    ids, found = _select_questions(request)
+    response = _run_bulk(ids, found, lambda question_id: UpdateOne({"id": question_id}, {"$set": update_data}), "updated")
+    
+    # The grading map is patched from the pre-read fields, without reading back
+    for item in response.results:
+        if item.status == "updated":
+            grading_service.sync_question({**found[item.id], **update_data})
+    if response.succeeded:
+        grading_service.advance(version_service.questions_changed())
+    return response
+
+@router.post("/bulk_delete", response_model=BulkOperationResponse)
+async def bulk_delete_questions(
+    request: QuestionSelection,
+    current_user: CurrentUser = Depends(get_current_admin_user)
+):
+    """Delete a list of questions, or every question matching a filter"""
+    ids, found = _select_questions(request)
+    response = _run_bulk(ids, found, lambda question_id: DeleteOne({"id": question_id}), "deleted")
+    
+    for item in response.results:
+        if item.status == "deleted":
+            grading_service.remove(item.id)
+    if response.succeeded:
+        grading_service.advance(version_service.questions_changed())
+    return response
+
 @router.post("/bulk_upload", response_model=BulkUploadResponse)
 async def bulk_upload_questions(
     file: UploadFile = File(...),
-    current_user: UserInDB = Depends(get_current_admin_user)
+    current_user: CurrentUser = Depends(get_current_admin_user)
 ):
-    """Bulk upload questions from JSON or CSV file"""
+    """Bulk upload questions from a JSON, CSV or Excel (.xlsx) file"""
+    if file.filename.endswith('.xlsx'):
+        # Workbooks can hold 100k rows, so they are streamed rather than read
+        # whole, on a worker thread so the event loop keeps serving requests
+        return await run_in_threadpool(_import_batches, spreadsheet.read_batches(file.file), current_user)
+    
     success_count = 0
     failed_count = 0
     errors = []
@@ -116,13 +294,14 @@ async def bulk_upload_questions(
                 questions_data = [questions_data]
         
         elif file.filename.endswith('.csv'):
+            import pandas as pd  # heavy; only loaded for CSV uploads
             df = pd.read_csv(io.BytesIO(content))
             questions_data = df.to_dict('records')
         
         else:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="File must be JSON or CSV format"
+                detail="File must be JSON, CSV or Excel (.xlsx) format"
             )
         
         # Process each question
@@ -137,12 +316,16 @@ async def bulk_upload_questions(
                 question_dict['created_at'] = datetime.utcnow()
                 
                 questions_collection.insert_one(question_dict)
+                grading_service.sync_question(question_dict)
                 success_count += 1
                 
             except Exception as e:
                 failed_count += 1
                 errors.append(f"Row {idx + 1}: {str(e)}")
         
+        if success_count:
+            grading_service.advance(version_service.questions_changed())
+        
         return BulkUploadResponse(
             success=success_count,
             failed=failed_count,
@@ -156,12 +339,125 @@ async def bulk_upload_questions(
             detail=f"Error processing file: {str(e)}"
         )
 
+@router.get("/export")
+async def export_questions(
+    format: str = Query("parquet", pattern="^(parquet|arrow)$"),
+    category: str = None,
+    current_user: CurrentUser = Depends(get_current_admin_user)
+):
+    """Download the question bank as Parquet or Arrow IPC, streamed one row group at a time"""
+    query = {'category': category} if category else {}
+    media_type, _ = columnar.FORMATS[format]
+    return StreamingResponse(
+        columnar.export_questions(format, query),
+        media_type=media_type,
+        headers={'Content-Disposition': f'attachment; filename="{columnar.export_filename(format)}"'}
+    )
+
+# Row errors beyond this are counted but not listed
+MAX_REPORTED_ERRORS = 100
+
+def _import_batches(batches: Iterable[List[Tuple[str, dict]]], current_user: CurrentUser) -> BulkUploadResponse:
+    """
+    Validate and insert (location, row) batches, one insert_many per batch
+    IDs, creators and dates present in the rows are kept; IDs that already
+    exist are reported and skipped.
+    """
+    success_count = 0
+    failed_count = 0
+    total = 0
+    errors = []
+    
+    def report(message: str):
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append(message)
+    
+    try:
+        for rows in batches:
+            docs = []
+            for where, row in rows:
+                total += 1
+                try:
+                    question = QuestionCreate(**{k: v for k, v in row.items() if v is not None})
+                except ValidationError as e:
+                    failed_count += 1
+                    report(f"{where}: {e.errors()[0]['loc'][0]}: {e.errors()[0]['msg']}")
+                    continue
+                
+                question_dict = question.model_dump()
+                question_dict['id'] = row.get('id') or str(uuid.uuid4())
+                question_dict['created_by'] = row.get('created_by') or current_user.username
+                question_dict['created_at'] = row.get('created_at') or datetime.utcnow()
+                for field in ('generatedByAI', 'sourceType'):
+                    if row.get(field) is not None:
+                        question_dict[field] = row[field]
+                docs.append(question_dict)
+            
+            if not docs:
+                continue
+            rejected = set()
+            try:
+                questions_collection.insert_many(docs, ordered=False)
+            except BulkWriteError as e:
+                for err in e.details['writeErrors']:
+                    rejected.add(err['index'])
+                    reason = "already exists" if err['code'] == 11000 else err.get('errmsg', 'write failed')
+                    report(f"Question {docs[err['index']]['id']}: {reason}")
+            
+            for i, question_dict in enumerate(docs):
+                if i not in rejected:
+                    grading_service.sync_question(question_dict)
+            success_count += len(docs) - len(rejected)
+            failed_count += len(rejected)
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error processing file: {str(e)}"
+        )
+    finally:
+        if success_count:
+            grading_service.advance(version_service.questions_changed())
+    
+    return BulkUploadResponse(
+        success=success_count,
+        failed=failed_count,
+        total=total,
+        errors=errors
+    )
+
+@router.post("/import", response_model=BulkUploadResponse)
+async def import_questions(
+    file: UploadFile = File(...),
+    current_user: CurrentUser = Depends(get_current_admin_user)
+):
+    """
+    Import questions from a Parquet or Arrow IPC file, such as one made by /export
+    IDs, creators and dates in the file are kept, so references to the
+    questions survive a migration; IDs that already exist are skipped.
+    """
+    def numbered(batches):
+        total = 0
+        for rows in batches:
+            yield [(f"Row {total + i}", row) for i, row in enumerate(rows, start=1)]
+            total += len(rows)
+    
+    # Parsing and inserts take seconds for a large file; keep them off the event loop
+    return await run_in_threadpool(_import_batches, numbered(columnar.read_batches(file.file, file.filename)), current_user)
+
 @router.get("/export_pdf")
 async def export_questions_pdf(
     category: str = None,
-    current_user: UserInDB = Depends(get_current_admin_user)
+    current_user: CurrentUser = Depends(get_current_admin_user)
 ):
     """Generate topic-wise question paper PDF (without answers)"""
+    # reportlab is only needed here, so it is not loaded at startup
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER, TA_LEFT
     
     # Query questions
     query = {}
@@ -287,7 +583,7 @@ async def export_questions_pdf(
 
 @router.get("/categories", response_model=List[str])
 async def get_categories(
-    current_user: UserInDB = Depends(get_current_admin_user)
+    current_user: CurrentUser = Depends(get_current_admin_user)
 ):
     """Get all unique categories"""
     categories = questions_collection.distinct('category')
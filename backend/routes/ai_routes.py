@@ -5,11 +5,14 @@ Handles question generation, difficulty analysis, and document parsing
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
 from pydantic import BaseModel, Field
 from typing import List, Optional
+from datetime import datetime
 import sys
 sys.path.append('..')
 
 from auth import get_current_admin_user
-from services.ai_service import ai_service
+from services.ai_service import get_ai_service
+from services.grading_service import grading_service
+from services.version_service import version_service
 from database import questions_collection
 import uuid
 
@@ -71,7 +74,7 @@ async def generate_questions(
     Returns list of generated questions with full metadata
     """
     try:
-        questions = await ai_service.generate_questions(
+        questions = await get_ai_service().generate_questions(
             topic=request.topic,
             count=request.count,
             difficulty=request.difficulty,
@@ -106,7 +109,7 @@ async def generate_and_save_questions(
     """
     try:
         # Generate questions
-        questions = await ai_service.generate_questions(
+        questions = await get_ai_service().generate_questions(
             topic=request.topic,
             count=request.count,
             difficulty=request.difficulty,
@@ -124,7 +127,8 @@ async def generate_and_save_questions(
                 "explanation": question_data.get("explanation", ""),
                 "category": question_data["category"],
                 "difficulty": question_data["difficulty"],
-                "created_by": current_user["username"],
+                "created_by": current_user.username,
+                "created_at": datetime.utcnow(),
                 "generatedByAI": True,
                 "sourceType": question_data.get("sourceType", "ai_generated"),
                 "aiMetadata": {
@@ -134,9 +138,13 @@ async def generate_and_save_questions(
                 }
             }
             
-            await questions_collection.insert_one(question_dict)
+            questions_collection.insert_one(question_dict)
+            grading_service.sync_question(question_dict)
             saved_count += 1
         
+        if saved_count:
+            grading_service.advance(version_service.questions_changed())
+        
         return {
             "success": True,
             "saved_count": saved_count,
@@ -166,7 +174,7 @@ async def analyze_difficulty(
     Returns difficulty level, confidence score, reasoning, and Bloom's taxonomy level
     """
     try:
-        analysis = await ai_service.analyze_difficulty(
+        analysis = await get_ai_service().analyze_difficulty(
             question=request.question,
             options=request.options
         )
@@ -195,7 +203,7 @@ async def parse_document(
     Returns list of extracted questions in standard format
     """
     try:
-        questions = await ai_service.parse_document(
+        questions = await get_ai_service().parse_document(
             document_text=request.document_text,
             max_questions=request.max_questions
         )
@@ -222,7 +230,7 @@ async def parse_document_and_save(
     """
     try:
         # Parse document
-        questions = await ai_service.parse_document(
+        questions = await get_ai_service().parse_document(
             document_text=request.document_text,
             max_questions=request.max_questions
         )
@@ -238,7 +246,8 @@ async def parse_document_and_save(
                 "explanation": question_data.get("explanation", ""),
                 "category": question_data["category"],
                 "difficulty": question_data["difficulty"],
-                "created_by": current_user["username"],
+                "created_by": current_user.username,
+                "created_at": datetime.utcnow(),
                 "generatedByAI": True,
                 "sourceType": question_data.get("sourceType", "ai_parsed"),
                 "aiMetadata": {
@@ -248,9 +257,13 @@ async def parse_document_and_save(
                 }
             }
             
-            await questions_collection.insert_one(question_dict)
+            questions_collection.insert_one(question_dict)
+            grading_service.sync_question(question_dict)
             saved_count += 1
         
+        if saved_count:
+            grading_service.advance(version_service.questions_changed())
+        
         return {
             "success": True,
             "saved_count": saved_count,
@@ -276,8 +289,8 @@ async def ai_health_check():
         return {
             "status": "healthy" if has_key else "misconfigured",
             "api_key_configured": has_key,
-            "provider": ai_service.provider,
-            "model": ai_service.model
+            "provider": get_ai_service().provider,
+            "model": get_ai_service().model
         }
     except Exception as e:
         return {
@@ -1,19 +1,30 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordRequestForm
-from datetime import timedelta, datetime
+from datetime import datetime
 import uuid
 from auth import (
     get_password_hash,
     verify_password,
-    create_access_token,
-    get_current_user
+    create_user_token,
+    get_current_user,
+    get_user_by_email
 )
-from models import UserCreate, UserResponse, Token, UserInDB
+from models import UserCreate, UserResponse, Token, CurrentUser, RefreshRequest
 from database import users_collection
-from config import settings
+from services.token_epoch_service import token_epoch_service
+from services.refresh_token_service import refresh_token_service
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+def _token_response(user: dict, refresh_token: str) -> Token:
+    return Token(
+        access_token=create_user_token(user),
+        token_type="bearer",
+        role=user['role'],
+        username=user['username'],
+        refresh_token=refresh_token
+    )
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(user: UserCreate):
     # Check if user already exists
@@ -56,19 +67,43 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Create access token
-    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-    access_token = create_access_token(
-        data={"sub": user['email']}, expires_delta=access_token_expires
-    )
-    
-    return Token(
-        access_token=access_token,
-        token_type="bearer",
-        role=user['role'],
-        username=user['username']
-    )
+    return _token_response(user, refresh_token_service.issue(user['id']))
+
+@router.post("/refresh", response_model=Token)
+async def refresh(request: RefreshRequest):
+    """Trade a refresh token for a new access token and a new refresh token"""
+    rotated = refresh_token_service.rotate(request.refresh_token)
+    # The user is re-read so a role change applies from the next refresh
+    user = users_collection.find_one({"id": rotated[0]}) if rotated else None
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return _token_response(user, rotated[1])
+
+@router.post("/logout")
+async def logout(request: RefreshRequest):
+    """End this session; its access token lapses on expiry"""
+    refresh_token_service.revoke(request.refresh_token)
+    return {"message": "Logged out"}
 
 @router.get("/me", response_model=UserResponse)
-async def get_me(current_user: UserInDB = Depends(get_current_user)):
-    return UserResponse(**current_user.model_dump())
\ No newline at end of file
+async def get_me(current_user: CurrentUser = Depends(get_current_user)):
+    # The token only carries what authorization needs; the profile is read here
+    user = get_user_by_email(current_user.email)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return UserResponse(**user.model_dump())
+
+@router.post("/logout-all")
+async def logout_all(current_user: CurrentUser = Depends(get_current_user)):
+    """Revoke every access token issued to the caller, on all devices"""
+    token_epoch_service.revoke(current_user.id)
+    refresh_token_service.revoke_user(current_user.id)
+    return {"message": "Logged out of all sessions"}
\ No newline at end of file
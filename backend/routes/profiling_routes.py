@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends
+
+from auth import get_current_admin_user
+from config import settings
+from models import ProfilingSettings, ProfilingStatus, CurrentUser
+from profiling import profiler
+
+router = APIRouter(prefix="/admin/profiling", tags=["Admin - Profiling"])
+
+def _status() -> ProfilingStatus:
+    return ProfilingStatus(
+        sample_rate=profiler.sample_rate(),
+        interval_ms=settings.profile_interval_ms,
+        profile_dir=settings.profile_dir,
+        recent_files=profiler.recent()
+    )
+
+@router.get("", response_model=ProfilingStatus)
+async def get_profiling_status(
+    current_user: CurrentUser = Depends(get_current_admin_user)
+):
+    """
+    Current sample rate and the newest collapsed-stack files
+    
+    A single request can also be profiled by sending it with an `X-Profile: 1`
+    header and an admin token.
+    """
+    return _status()
+
+@router.put("", response_model=ProfilingStatus)
+async def set_profiling_sample_rate(
+    update: ProfilingSettings,
+    current_user: CurrentUser = Depends(get_current_admin_user)
+):
+    """Set the share of requests profiled (0 to 1); every worker picks it up within 30 seconds"""
+    profiler.set_sample_rate(update.sample_rate)
+    return _status()
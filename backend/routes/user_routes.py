@@ -1,50 +1,109 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, BackgroundTasks, Request
 from typing import List
 from datetime import datetime
 import uuid
 import random
 
-from auth import get_current_user
-from models import QuestionResponse, UserInDB, BookmarkCreate, BookmarkResponse
-from database import questions_collection, quizzes_collection, results_collection, bookmarks_collection
+from auth import get_current_user, get_current_admin_user
+from models import (
+    PublicQuestionResponse,
+    CurrentUser,
+    BookmarkCreate,
+    BookmarkResponse,
+    QuizSubmission,
+    QuizResultResponse,
+    BatchSubmitRequest,
+    BatchSubmitResponse,
+    ProgressResponse,
+    LeaderboardResponse,
+    ReviewBatchResponse,
+    ReviewAnswerRequest,
+    ReviewAnswerResponse,
+    QuizStartRequest,
+    QuizSessionResponse,
+    QuizProgressUpdate,
+    QuizSessionSubmit,
+    MAX_QUIZ_QUESTIONS
+)
+from database import (
+    users_collection,
+    questions_collection,
+    quizzes_collection,
+    results_collection,
+    bookmarks_collection,
+    PUBLIC_QUESTION_PROJECTION
+)
+from services.grading_service import grading_service
+from services.progress_service import progress_service
+from services.adaptive_service import adaptive_service
+from services.review_service import review_service
+from services.quiz_session_service import quiz_session_service, template_key
+from services.version_service import version_service
+from serialization import fast_json, etag, not_modified, QUESTION_RESPONSE_PROJECTION
+from services.leaderboard_service import (
+    leaderboard_service,
+    GLOBAL_BOARD,
+    category_board,
+    weekly_board
+)
 
 router = APIRouter(prefix="/user", tags=["User"])
 
-@router.get("/questions", response_model=List[QuestionResponse])
+def _adaptive_questions(current_user: CurrentUser, category: str, limit: int) -> List[dict]:
+    adaptive_service.ensure_loaded(version_service.question_bank())
+    ability = adaptive_service.ability(progress_service.get(current_user.id), category)
+    ids = adaptive_service.select(ability, category, limit)
+    questions = list(questions_collection.find({'id': {'$in': ids}}, PUBLIC_QUESTION_PROJECTION))
+    random.shuffle(questions)
+    return questions
+
+@router.get("/questions", response_model=List[PublicQuestionResponse])
 async def get_questions_for_quiz(
     category: str = None,
     difficulty: str = None,
     limit: int = 10,
-    current_user: UserInDB = Depends(get_current_user)
+    mode: str = 'random',
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    """Get questions for quiz (without showing correct answers)"""
-    query = {}
-    if category:
-        query['category'] = category
-    if difficulty:
-        query['difficulty'] = difficulty
+    """
+    Get questions for a quiz (answers and explanations are never read)
     
-    questions = list(questions_collection.find(query))
+    - **mode**: `random` (default) samples uniformly; `adaptive` matches question
+      difficulty to the user's ability in the category and ignores `difficulty`
+    """
+    if limit <= 0:
+        return []
     
-    # Shuffle and limit
-    random.shuffle(questions)
-    questions = questions[:limit]
+    if mode == 'adaptive':
+        return fast_json(_adaptive_questions(current_user, category, limit))
+    
+    if mode != 'random':
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="mode must be one of: random, adaptive"
+        )
     
-    # Return questions (frontend should not display answers until submission)
-    return [QuestionResponse(**q) for q in questions]
+    # Sampled in Mongo; answer/explanation are projected away before documents leave the server
+    return fast_json(quiz_session_service.sample(category, difficulty, limit))
 
 @router.get("/categories", response_model=List[str])
 async def get_available_categories(
-    current_user: UserInDB = Depends(get_current_user)
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """Get all available quiz categories"""
+    tag = etag('categories', version_service.question_bank())
+    cached = not_modified(request, tag)
+    if cached:
+        return cached
+    
     categories = questions_collection.distinct('category')
-    return categories
+    return fast_json(categories, tag=tag)
 
 @router.post("/bookmarks/add", status_code=status.HTTP_201_CREATED)
 async def add_bookmark(
     bookmark_data: BookmarkCreate,
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """Add a question to user's bookmarks"""
     # Check if question exists
@@ -76,12 +135,14 @@ async def add_bookmark(
     }
     
     bookmarks_collection.insert_one(bookmark)
+    version_service.bookmarks_changed(current_user.id)
+    review_service.enroll(current_user.id, [bookmark_data.question_id], 'bookmark')
     return {"message": "Bookmark added successfully", "bookmark_id": bookmark['id']}
 
 @router.delete("/bookmarks/remove/{question_id}", status_code=status.HTTP_200_OK)
 async def remove_bookmark(
     question_id: str,
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """Remove a question from user's bookmarks"""
     result = bookmarks_collection.delete_one({
@@ -95,34 +156,56 @@ async def remove_bookmark(
             detail="Bookmark not found"
         )
     
+    version_service.bookmarks_changed(current_user.id)
+    review_service.drop_bookmark_card(current_user.id, question_id)
     return {"message": "Bookmark removed successfully"}
 
 @router.get("/bookmarks", response_model=List[BookmarkResponse])
 async def get_bookmarks(
-    current_user: UserInDB = Depends(get_current_user)
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """Get all bookmarked questions for the current user"""
-    bookmarks = list(bookmarks_collection.find({'user_id': current_user.id}))
-    
-    # Fetch question details for each bookmark
-    result = []
-    for bookmark in bookmarks:
-        question = questions_collection.find_one({'id': bookmark['question_id']})
-        if question:
-            result.append({
-                'id': bookmark['id'],
-                'user_id': bookmark['user_id'],
-                'question_id': bookmark['question_id'],
-                'question': QuestionResponse(**question),
-                'created_at': bookmark['created_at']
-            })
+    bookmarks = list(bookmarks_collection.find(
+        {'user_id': current_user.id},
+        {'_id': 0, 'id': 1, 'user_id': 1, 'question_id': 1, 'created_at': 1}
+    ))
     
-    return result
+    # Answers of questions in an unfinished quiz are blanked; that response
+    # depends on the session too, so it is sent without an ETag
+    hidden = quiz_session_service.in_progress_ids(current_user.id, [b['question_id'] for b in bookmarks])
+    tag = None
+    if not hidden:
+        # Bookmarked question bodies change with the bank, so both versions count
+        tag = etag('bookmarks', version_service.bookmarks(current_user.id), version_service.question_bank())
+        cached = not_modified(request, tag)
+        if cached:
+            return cached
+    
+    # Fetch all bookmarked questions in one query instead of a find_one per bookmark
+    questions = {
+        q['id']: q
+        for q in questions_collection.aggregate([
+            {'$match': {'id': {'$in': [b['question_id'] for b in bookmarks]}}},
+            {'$project': QUESTION_RESPONSE_PROJECTION}
+        ])
+    }
+    
+    for qid in hidden.intersection(questions):
+        questions[qid].update(answer=None, explanation=None)
+    
+    result = [
+        {**bookmark, 'question': questions[bookmark['question_id']]}
+        for bookmark in bookmarks
+        if bookmark['question_id'] in questions
+    ]
+    
+    return fast_json(result, tag=tag)
 
 @router.get("/bookmarks/check/{question_id}", response_model=dict)
 async def check_bookmark_status(
     question_id: str,
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """Check if a question is bookmarked by the current user"""
     bookmark = bookmarks_collection.find_one({
@@ -130,4 +213,389 @@ async def check_bookmark_status(
         'question_id': question_id
     })
     
-    return {"is_bookmarked": bookmark is not None}
\ No newline at end of file
+    return {"is_bookmarked": bookmark is not None}
+
+def _build_result_doc(user_id: str, submission: QuizSubmission, graded: dict, result_id: str = None) -> dict:
+    """Compact result document: question IDs and choices only, no question bodies"""
+    return {
+        'id': result_id or str(uuid.uuid4()),
+        'user_id': user_id,
+        'question_ids': submission.question_ids,
+        'answers': submission.answers,
+        'correct': graded['correct'],
+        'score': graded['score'],
+        'total': graded['total'],
+        'percentage': graded['percentage'],
+        'category': submission.category,
+        'difficulty': submission.difficulty,
+        'time_spent': submission.time_spent,
+        'breakdown': grading_service.breakdown(submission.question_ids, graded['correct']),
+        'submitted_at': datetime.utcnow()
+    }
+
+def _grade_and_record(current_user: CurrentUser, submission: QuizSubmission, result_id: str = None, ranked: bool = False) -> dict:
+    """
+    Grade one submission, store the result, fold it into rollups and reveal answers
+    Only ranked results (quiz sessions, whose question sets the server chose)
+    earn leaderboard points; a free-form submission's questions are picked
+    by the client, which could keep resubmitting answers it has seen revealed.
+    """
+    grading_service.ensure_loaded(questions_collection, version_service.question_bank())
+    try:
+        graded = grading_service.grade(
+            submission.question_ids,
+            submission.answers,
+            collection=questions_collection
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    result = _build_result_doc(current_user.id, submission, graded, result_id)
+    results_collection.insert_one(result)
+    progress_service.apply_result(result)
+    if ranked:
+        leaderboard_service.record_result(result, current_user.username)
+    adaptive_service.record(submission.question_ids, graded['correct'])
+    review_service.enroll_missed([result])
+    
+    # Answers are only revealed once the quiz has been submitted
+    result['reveal'] = grading_service.reveal(submission.question_ids, questions_collection)
+    return result
+
+def _refuse_in_progress(current_user: CurrentUser, question_ids: List[str]):
+    """
+    Grading reveals answers, so questions of an unfinished quiz session can
+    only be answered by submitting that session
+    """
+    if quiz_session_service.in_progress_ids(current_user.id, question_ids):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Some questions are part of your quiz in progress; submit that quiz first"
+        )
+
+def _hide_in_progress(current_user: CurrentUser, reveal: List[dict]) -> List[dict]:
+    """Blank the answer and explanation of questions in an unfinished quiz session"""
+    hidden = quiz_session_service.in_progress_ids(current_user.id, [r['question_id'] for r in reveal])
+    return [
+        {'question_id': r['question_id'], 'answer': None, 'explanation': None} if r['question_id'] in hidden else r
+        for r in reveal
+    ]
+
+@router.post("/quiz/submit", response_model=QuizResultResponse, status_code=status.HTTP_201_CREATED)
+async def submit_quiz(
+    submission: QuizSubmission,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Grade a quiz submission on the server and store the result (not ranked on leaderboards)"""
+    _refuse_in_progress(current_user, submission.question_ids)
+    return QuizResultResponse(**_grade_and_record(current_user, submission))
+
+@router.get("/quiz/results/{result_id}", response_model=QuizResultResponse)
+async def get_quiz_result(
+    result_id: str,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Get one of the current user's submitted results with answers revealed"""
+    result = results_collection.find_one(
+        {'id': result_id, 'user_id': current_user.id},
+        {'_id': 0}
+    )
+    if not result:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Result not found"
+        )
+    
+    result['reveal'] = _hide_in_progress(
+        current_user,
+        grading_service.reveal(result['question_ids'], questions_collection)
+    )
+    return QuizResultResponse(**result)
+
+@router.post("/quiz/submit_batch", response_model=BatchSubmitResponse, status_code=status.HTTP_201_CREATED)
+async def submit_quiz_batch(
+    batch: BatchSubmitRequest,
+    current_user: CurrentUser = Depends(get_current_admin_user)
+):
+    """Grade many submissions at once (e.g. a whole class) and store all results"""
+    grading_service.ensure_loaded(questions_collection, version_service.question_bank())
+    try:
+        graded = grading_service.grade_batch(
+            [{'question_ids': s.question_ids, 'answers': s.answers} for s in batch.submissions],
+            collection=questions_collection
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    results = [
+        _build_result_doc(sub.user_id, sub, g)
+        for sub, g in zip(batch.submissions, graded)
+    ]
+    if results:
+        results_collection.insert_many(results, ordered=False)
+        progress_service.apply_results(results)
+        usernames = {
+            u['id']: u['username']
+            for u in users_collection.find(
+                {'id': {'$in': list({r['user_id'] for r in results})}},
+                {'_id': 0, 'id': 1, 'username': 1}
+            )
+        }
+        leaderboard_service.record_results(results, usernames)
+        adaptive_service.record(
+            [qid for r in results for qid in r['question_ids']],
+            [ok for r in results for ok in r['correct']]
+        )
+        review_service.enroll_missed(results)
+    
+    return BatchSubmitResponse(
+        graded=len(results),
+        results=[QuizResultResponse(**r) for r in results]
+    )
+
+def _accuracy(correct: int, answered: int) -> int:
+    return round(correct * 100 / answered) if answered else 0
+
+@router.get("/progress", response_model=ProgressResponse)
+async def get_progress(
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Get the current user's progress rollup (a single point read)"""
+    rollup = progress_service.get(current_user.id) or {'user_id': current_user.id}
+    
+    topics = {}
+    for field in ('by_category', 'by_difficulty'):
+        topics[field] = [
+            {**bucket, 'accuracy': _accuracy(bucket.get('correct', 0), bucket.get('answered', 0))}
+            for bucket in rollup.get(field, {}).values()
+        ]
+    
+    return ProgressResponse(**{
+        **rollup,
+        **topics,
+        'accuracy': _accuracy(rollup.get('correct_answers', 0), rollup.get('questions_answered', 0))
+    })
+
+@router.get("/leaderboard", response_model=LeaderboardResponse)
+async def get_leaderboard(
+    scope: str = 'global',
+    category: str = None,
+    limit: int = 10,
+    offset: int = 0,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Get a page of the global, per-category or weekly leaderboard plus the current user's rank"""
+    if scope == 'global':
+        board = GLOBAL_BOARD
+    elif scope == 'weekly':
+        board = weekly_board()
+    elif scope == 'category':
+        if not category:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="category is required for the category leaderboard"
+            )
+        board = category_board(category)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="scope must be one of: global, category, weekly"
+        )
+    
+    limit = max(1, min(limit, 100))
+    offset = max(0, offset)
+    
+    return LeaderboardResponse(
+        board=board,
+        total_players=leaderboard_service.size(board),
+        entries=leaderboard_service.top(board, limit, offset),
+        me=leaderboard_service.rank(board, current_user.id)
+    )
+
+@router.get("/review/due", response_model=ReviewBatchResponse)
+async def get_due_reviews(
+    limit: int = 20,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Get the bookmarked and missed questions that are due for review now"""
+    cards = review_service.due(current_user.id, max(1, min(limit, 100)))
+    
+    questions = {
+        q['id']: q
+        for q in questions_collection.find(
+            {'id': {'$in': [card['question_id'] for card in cards]}},
+            PUBLIC_QUESTION_PROJECTION
+        )
+    }
+    
+    items = [
+        {**card, 'question': questions[card['question_id']]}
+        for card in cards
+        if card['question_id'] in questions
+    ]
+    
+    return ReviewBatchResponse(
+        due_count=review_service.count_due(current_user.id),
+        items=items
+    )
+
+@router.post("/review/answer", response_model=ReviewAnswerResponse)
+async def answer_review(
+    review: ReviewAnswerRequest,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Grade a review answer and reschedule the card"""
+    _refuse_in_progress(current_user, [review.question_id])
+    grading_service.ensure_loaded(questions_collection, version_service.question_bank())
+    graded = grading_service.grade([review.question_id], [review.answer], collection=questions_collection)
+    correct = graded['correct'][0]
+    
+    card = review_service.record_answer(current_user.id, review.question_id, correct)
+    if card is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Question is not in your review queue"
+        )
+    
+    adaptive_service.record([review.question_id], [correct])
+    reveal = grading_service.reveal([review.question_id], questions_collection)[0]
+    
+    return ReviewAnswerResponse(
+        question_id=review.question_id,
+        correct=correct,
+        answer=reveal['answer'],
+        explanation=reveal['explanation'],
+        interval_days=card['interval_days'],
+        due_at=card['due_at']
+    )
+
+@router.post("/quiz/start", response_model=QuizSessionResponse, status_code=status.HTTP_201_CREATED)
+async def start_quiz(
+    request: QuizStartRequest,
+    background_tasks: BackgroundTasks,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Start a persisted quiz session with a frozen question set"""
+    limit = max(1, min(request.limit, MAX_QUIZ_QUESTIONS))
+    
+    if request.mode == 'adaptive':
+        questions = _adaptive_questions(current_user, request.category, limit)
+    elif request.mode == 'random':
+        # Popular templates are served from the pre-generated pool; the pool is
+        # topped up after the response is sent
+        version = version_service.question_bank()
+        questions = quiz_session_service.claim(template_key(request.category, request.difficulty, limit), version)
+        if questions is None:
+            questions = quiz_session_service.sample(request.category, request.difficulty, limit)
+        background_tasks.add_task(quiz_session_service.refill, request.category, request.difficulty, limit, version)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="mode must be one of: random, adaptive"
+        )
+    
+    if not questions:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No questions available for this selection"
+        )
+    
+    return quiz_session_service.create(
+        current_user.id,
+        questions,
+        request.category,
+        request.difficulty,
+        request.mode,
+        limit
+    )
+
+@router.get("/quiz/active", response_model=QuizSessionResponse)
+async def get_active_quiz(
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Get the current user's unfinished quiz session, if any"""
+    session = quiz_session_service.active(current_user.id)
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No quiz in progress"
+        )
+    return session
+
+@router.get("/quiz/session/{session_id}", response_model=QuizSessionResponse)
+async def get_quiz_session(
+    session_id: str,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Resume a quiz session (a single point read)"""
+    session = quiz_session_service.get(session_id, current_user.id)
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Quiz session not found"
+        )
+    return session
+
+@router.put("/quiz/session/{session_id}/progress", response_model=QuizSessionResponse)
+async def save_quiz_progress(
+    session_id: str,
+    progress: QuizProgressUpdate,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Save answers given so far and the current position"""
+    session = quiz_session_service.save_progress(
+        session_id,
+        current_user.id,
+        progress.answers,
+        progress.current_index
+    )
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Quiz session not found or already submitted"
+        )
+    return session
+
+@router.post("/quiz/session/{session_id}/submit", response_model=QuizResultResponse, status_code=status.HTTP_201_CREATED)
+async def submit_quiz_session(
+    session_id: str,
+    final: QuizSessionSubmit,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Grade a quiz session against its frozen question set"""
+    session = quiz_session_service.get(session_id, current_user.id)
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Quiz session not found"
+        )
+    
+    answers = final.answers if final.answers is not None else session['answers']
+    if len(answers) != len(session['question_ids']):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="answers must have one entry per question"
+        )
+    
+    # Flip the session to submitted first so a double submit cannot grade twice
+    result_id = str(uuid.uuid4())
+    if not quiz_session_service.complete(session_id, current_user.id, answers, result_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Quiz session was already submitted"
+        )
+    
+    submission = QuizSubmission(
+        question_ids=session['question_ids'],
+        answers=answers,
+        category=session.get('category'),
+        difficulty=session.get('difficulty'),
+        time_spent=final.time_spent
+    )
+    return QuizResultResponse(**_grade_and_record(current_user, submission, result_id, ranked=True))
\ No newline at end of file
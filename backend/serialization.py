@@ -0,0 +1,60 @@
+"""
+Fast response path for large list endpoints
+
+Handlers project Mongo documents into the exact response shape and hand them
+to orjson directly, instead of building a pydantic model per row and letting
+FastAPI validate and encode every row again against response_model.
+The response_model on the route is kept for the OpenAPI schema only.
+
+Read endpoints also carry weak ETags built from version counters, so a
+repeated request can be answered with 304 before any list query runs.
+"""
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+
+from metrics import record_cache
+
+# $project stage producing QuestionResponse-shaped documents
+QUESTION_RESPONSE_PROJECTION = {
+    '_id': 0,
+    'id': 1,
+    'question': 1,
+    'options': 1,
+    'answer': 1,
+    'category': 1,
+    'difficulty': {'$ifNull': ['$difficulty', 'medium']},
+    'explanation': {'$ifNull': ['$explanation', None]},
+    'created_by': 1,
+    'created_at': 1
+}
+
+
+# Clients may keep the body but must revalidate it before reuse
+CACHE_CONTROL = 'private, no-cache'
+
+
+def etag(*parts: Any) -> str:
+    """Weak ETag from version parts (weak, since the body may be compressed)"""
+    return 'W/"' + '-'.join(str(part) for part in parts) + '"'
+
+
+def not_modified(request: Request, tag: str) -> Optional[Response]:
+    """304 response if the request's If-None-Match already matches tag"""
+    header = request.headers.get('if-none-match')
+    if header:
+        opaque = tag.removeprefix('W/')
+        for candidate in header.split(','):
+            candidate = candidate.strip()
+            if candidate == '*' or candidate.removeprefix('W/') == opaque:
+                record_cache('etag', 1)
+                return Response(status_code=304, headers={'ETag': tag, 'Cache-Control': CACHE_CONTROL})
+    record_cache('etag', 0, 1)
+    return None
+
+
+def fast_json(content: Any, status_code: int = 200, tag: Optional[str] = None) -> ORJSONResponse:
+    """Serialize already-shaped documents (dicts, lists, datetimes) with orjson"""
+    headers = {'ETag': tag, 'Cache-Control': CACHE_CONTROL} if tag else None
+    return ORJSONResponse(content=content, status_code=status_code, headers=headers)
\ No newline at end of file
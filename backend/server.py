@@ -1,15 +1,54 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from brotli_asgi import BrotliMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST
 import os
 
-from routes import auth_routes, admin_routes, user_routes, ai_routes
+from routes import auth_routes, admin_routes, user_routes, ai_routes, profiling_routes
+import database
+from auth import get_metrics_reader
+from config import settings
+from services.grading_service import grading_service
+from services.adaptive_service import adaptive_service
+from services.leaderboard_service import leaderboard_service, GLOBAL_BOARD
+from services.version_service import version_service
+from services.token_epoch_service import token_epoch_service
+from indexes import ensure_indexes_in_background
+import metrics
+from metrics import MetricsMiddleware
+from profiling import ProfilingMiddleware
+from rate_limit import RateLimitMiddleware
+
+def warm_caches():
+    """Load the in-memory caches before this worker takes traffic"""
+    grading_service.ensure_loaded(database.questions_collection, version_service.question_bank())
+    adaptive_service.ensure_loaded(version_service.question_bank())
+    leaderboard_service.size(GLOBAL_BOARD)
+    token_epoch_service.ensure_loaded()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    database.connect()
+    # Builds run on a thread; requests are served while indexes are created
+    ensure_indexes_in_background(database.db)
+    if settings.warm_caches:
+        warm_caches()
+    yield
+    database.close()
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Java Quiz App API",
     description="Backend API for Java Quiz Application with Question Management and AI Features",
     version="2.0.0"
 )
 
+# Innermost, so 429 responses still get CORS headers
+if settings.rate_limit_enabled:
+    app.add_middleware(RateLimitMiddleware)
+
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
@@ -17,13 +56,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Retry-After"],
+)
+
+# Brotli for clients that accept it, gzip otherwise; small bodies are sent as-is
+# Columnar exports are already zstd-compressed
+app.add_middleware(
+    BrotliMiddleware,
+    minimum_size=1024,
+    gzip_fallback=True,
+    excluded_handlers=[r'^/api/admin/questions/export$']
 )
 
+# Stacks are sampled only for requests picked by the profiler
+app.add_middleware(ProfilingMiddleware)
+
+# Outermost, so latencies include compression
+app.add_middleware(MetricsMiddleware)
+
 # Include routers with /api prefix
 app.include_router(auth_routes.router, prefix="/api")
 app.include_router(admin_routes.router, prefix="/api")
 app.include_router(user_routes.router, prefix="/api")
 app.include_router(ai_routes.router, prefix="/api")
+app.include_router(profiling_routes.router, prefix="/api")
 
 @app.get("/")
 async def root():
@@ -37,6 +93,11 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/api/metrics", include_in_schema=False, dependencies=[Depends(get_metrics_reader)])
+async def metrics_endpoint():
+    """Prometheus text exposition of request, Mongo, LLM and cache metrics"""
+    return Response(metrics.render(), media_type=CONTENT_TYPE_LATEST)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
@@ -1,4 +1,26 @@
 """Services package for Quiz Application"""
-from .ai_service import ai_service
+from .ai_service import get_ai_service
+from .grading_service import grading_service
+from .progress_service import progress_service
+from .leaderboard_service import leaderboard_service
+from .adaptive_service import adaptive_service
+from .review_service import review_service
+from .quiz_session_service import quiz_session_service
+from .version_service import version_service
+from .token_epoch_service import token_epoch_service
+from .refresh_token_service import refresh_token_service
+from .search_service import search_service
 
-__all__ = ['ai_service']
+__all__ = [
+    'get_ai_service',
+    'grading_service',
+    'progress_service',
+    'leaderboard_service',
+    'adaptive_service',
+    'review_service',
+    'quiz_session_service',
+    'version_service',
+    'token_epoch_service',
+    'refresh_token_service',
+    'search_service'
+]
\ No newline at end of file
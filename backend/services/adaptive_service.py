@@ -0,0 +1,200 @@
+"""
+Adaptive Selection Service for Quiz Application
+Picks questions whose difficulty matches the user's estimated ability:
+- Per-question difficulty parameters from answer statistics (Rasch-style logits)
+- Per-user, per-category ability from the progress rollup
+- Compact in-memory index (sorted numpy arrays per category), no per-request
+  scan of historical results
+- Rebuilt on a background thread when the question bank version moves, so
+  deleted questions stop being selected without a scan inside a request
+"""
+import logging
+import math
+import random
+import threading
+import time
+from typing import List, Dict, Optional, Any, Iterable
+
+import numpy as np
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from database import questions_collection
+
+logger = logging.getLogger(__name__)
+
+# Expected share of correct answers for each labelled difficulty, used as a
+# prior until a question has collected enough answers of its own
+DIFFICULTY_PRIORS = {'easy': 0.8, 'medium': 0.6, 'hard': 0.4}
+DEFAULT_PRIOR = 0.6
+
+# How many pseudo-answers the prior is worth
+PRIOR_WEIGHT = 5
+
+ALL_CATEGORIES = ''
+
+
+def _logit(p: float) -> float:
+    p = min(max(p, 0.02), 0.98)
+    return math.log(p / (1 - p))
+
+
+def item_difficulty(label: Optional[str], attempts: int = 0, correct: int = 0) -> float:
+    """Difficulty logit of a question (higher is harder)"""
+    prior = DIFFICULTY_PRIORS.get(label, DEFAULT_PRIOR)
+    p_correct = (correct + prior * PRIOR_WEIGHT) / (attempts + PRIOR_WEIGHT)
+    return -_logit(p_correct)
+
+
+class _CategoryItems:
+    """Question IDs of one category sorted by difficulty"""
+
+    __slots__ = ('ids', 'difficulty', 'mean_difficulty')
+
+    def __init__(self, ids: List[str], difficulty: List[float]):
+        order = np.argsort(np.asarray(difficulty, dtype=np.float32), kind='stable')
+        self.ids = [ids[i] for i in order]
+        self.difficulty = np.asarray(difficulty, dtype=np.float32)[order]
+        self.mean_difficulty = float(self.difficulty.mean()) if len(ids) else 0.0
+
+
+class AdaptiveService:
+    """Service that selects quiz questions matched to the user's ability"""
+
+    # Seconds before the index is rebuilt from the stats on the question documents
+    REFRESH_INTERVAL = 300
+
+    # Chance of answering correctly we aim for with each selected question
+    TARGET_SUCCESS = 0.7
+
+    # Candidates considered around the target difficulty, as a multiple of the quiz size
+    WINDOW_FACTOR = 3
+
+    def __init__(self):
+        self._index: Dict[str, _CategoryItems] = {}
+        self._loaded_at: Optional[float] = None
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        self._reloader: Optional[threading.Thread] = None
+
+    def build(self, questions: Iterable[Dict[str, Any]], version: Optional[int] = None):
+        """Rebuild the index from question documents (id, category, difficulty, stats)"""
+        grouped: Dict[str, tuple] = {ALL_CATEGORIES: ([], [])}
+        for q in questions:
+            stats = q.get('stats') or {}
+            value = item_difficulty(q.get('difficulty'), stats.get('attempts', 0), stats.get('correct', 0))
+            keys = (ALL_CATEGORIES, q['category']) if q.get('category') else (ALL_CATEGORIES,)
+            for key in keys:
+                ids, values = grouped.setdefault(key, ([], []))
+                ids.append(q['id'])
+                values.append(value)
+
+        index = {key: _CategoryItems(ids, values) for key, (ids, values) in grouped.items()}
+        with self._lock:
+            self._index = index
+            self._loaded_at = time.monotonic()
+            self._version = version
+
+    def refresh(self, version: Optional[int] = None):
+        self.build(questions_collection.find(
+            {},
+            {'_id': 0, 'id': 1, 'category': 1, 'difficulty': 1, 'stats': 1}
+        ), version)
+
+    def ensure_loaded(self, version: Optional[int] = None):
+        """
+        Build the index on first use; after that, rebuild it on a background
+        thread whenever it has gone stale or the question bank version differs
+        from the one it was built at, and keep selecting from the current
+        index until the new one is in place
+        """
+        if self._loaded_at is None:
+            self.refresh(version)
+            return
+        changed = version is not None and version != self._version
+        if changed or time.monotonic() - self._loaded_at > self.REFRESH_INTERVAL:
+            with self._lock:
+                if self._reloader is not None and self._reloader.is_alive():
+                    return
+                self._reloader = threading.Thread(target=self._reload, args=(version,), name='adaptive-reload', daemon=True)
+                self._reloader.start()
+
+    def _reload(self, version: Optional[int]):
+        try:
+            self.refresh(version)
+        except PyMongoError as e:
+            # The current index keeps serving; the next request tries again
+            logger.warning("Could not rebuild the adaptive index: %s", e)
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def ability(self, rollup: Optional[Dict[str, Any]], category: Optional[str] = None) -> float:
+        """
+        Ability logit of a user in a category, estimated from their progress rollup
+
+        Accuracy is shrunk towards DEFAULT_PRIOR for users with few answers and
+        placed on the same scale as item difficulty via the category's mean.
+        """
+        answered = correct = 0
+        if rollup:
+            if category:
+                for bucket in (rollup.get('by_category') or {}).values():
+                    if bucket.get('name') == category:
+                        answered, correct = bucket.get('answered', 0), bucket.get('correct', 0)
+                        break
+            else:
+                answered, correct = rollup.get('questions_answered', 0), rollup.get('correct_answers', 0)
+
+        p_correct = (correct + DEFAULT_PRIOR * PRIOR_WEIGHT) / (answered + PRIOR_WEIGHT)
+        items = self._index.get(category or ALL_CATEGORIES)
+        mean_difficulty = items.mean_difficulty if items else 0.0
+        return _logit(p_correct) - _logit(DEFAULT_PRIOR) + mean_difficulty
+
+    def select(
+        self,
+        ability: float,
+        category: Optional[str] = None,
+        limit: int = 10,
+        rng: Optional[random.Random] = None
+    ) -> List[str]:
+        """
+        Pick question IDs whose difficulty is closest to the target for this ability
+
+        A binary search finds the target difficulty; the quiz is drawn at random
+        from a small window around it so repeated quizzes still vary.
+        """
+        items = self._index.get(category or ALL_CATEGORIES)
+        if not items or limit <= 0:
+            return []
+
+        total = len(items.ids)
+        if limit >= total:
+            picks = list(range(total))
+        else:
+            target = ability - _logit(self.TARGET_SUCCESS)
+            position = int(np.searchsorted(items.difficulty, target))
+            window = min(total, max(limit, limit * self.WINDOW_FACTOR))
+            start = min(max(0, position - window // 2), total - window)
+            picks = (rng or random).sample(range(start, start + window), limit)
+
+        return [items.ids[i] for i in picks]
+
+    def record(self, question_ids: List[str], correct: List[bool]):
+        """Add answers to the per-question statistics the index is built from"""
+        totals: Dict[str, List[int]] = {}
+        for qid, ok in zip(question_ids, correct):
+            counts = totals.setdefault(qid, [0, 0])
+            counts[0] += 1
+            counts[1] += ok
+
+        operations = [
+            UpdateOne({'id': qid}, {'$inc': {'stats.attempts': attempts, 'stats.correct': right}})
+            for qid, (attempts, right) in totals.items()
+        ]
+        if operations:
+            questions_collection.bulk_write(operations, ordered=False)
+
+
+# Singleton instance
+adaptive_service = AdaptiveService()
@@ -8,33 +8,58 @@ Uses Emergent LLM Key to power AI features:
 import os
 import json
 import re
-from typing import List, Dict, Optional, Any
+import time
+from typing import List, Dict, Optional, Any, TYPE_CHECKING
 from dotenv import load_dotenv
-from emergentintegrations.llm.chat import LlmChat, UserMessage
+
+import metrics
+
+if TYPE_CHECKING:
+    from emergentintegrations.llm.chat import LlmChat
 
 load_dotenv()
 
+
+def _llm():
+    """emergentintegrations loads litellm and every provider SDK, so import it on first use"""
+    from emergentintegrations.llm import chat
+    return chat
+
+
 class AIService:
     """Service for AI-powered quiz features using Emergent LLM"""
     
     def __init__(self):
         self.api_key = os.environ.get('EMERGENT_LLM_KEY')
         if not self.api_key:
-            raise ValueError("EMERGENT_LLM_KEY not found in environment variables")
+            raise RuntimeError("EMERGENT_LLM_KEY not found in environment variables")
         
         # Default model: GPT-4o-mini for cost efficiency
         self.provider = "openai"
         self.model = "gpt-4o-mini"
     
-    def _create_chat(self, system_message: str, session_id: str = "quiz-ai") -> LlmChat:
+    def _create_chat(self, system_message: str, session_id: str = "quiz-ai") -> "LlmChat":
         """Create a new chat instance with specified system message"""
-        chat = LlmChat(
+        chat = _llm().LlmChat(
             api_key=self.api_key,
             session_id=session_id,
             system_message=system_message
         ).with_model(self.provider, self.model)
         return chat
     
+    async def _send(self, chat: "LlmChat", system_message: str, prompt: str, operation: str) -> str:
+        """Send one prompt and record its latency and (estimated) token counts"""
+        start = time.perf_counter()
+        try:
+            response = await chat.send_message(_llm().UserMessage(text=prompt))
+        finally:
+            metrics.llm_call_duration.labels(operation, self.model).observe(time.perf_counter() - start)
+        metrics.llm_tokens.labels(operation, self.model, 'prompt').inc(
+            metrics.estimate_tokens(system_message) + metrics.estimate_tokens(prompt)
+        )
+        metrics.llm_tokens.labels(operation, self.model, 'completion').inc(metrics.estimate_tokens(response))
+        return response
+    
     async def generate_questions(
         self,
         topic: str,
@@ -94,8 +119,7 @@ Generate exactly {count} questions. Return ONLY the JSON array, no other text.""
         
         try:
             chat = self._create_chat(system_message, f"gen-{topic[:20]}")
-            user_message = UserMessage(text=prompt)
-            response = await chat.send_message(user_message)
+            response = await self._send(chat, system_message, prompt, 'generate_questions')
             
             # Parse response - extract JSON from potential markdown
             response_text = response.strip()
@@ -166,8 +190,7 @@ Return ONLY the JSON object, no other text."""
         
         try:
             chat = self._create_chat(system_message, "difficulty-analysis")
-            user_message = UserMessage(text=prompt)
-            response = await chat.send_message(user_message)
+            response = await self._send(chat, system_message, prompt, 'analyze_difficulty')
             
             # Clean response
             response_text = response.strip()
@@ -226,8 +249,7 @@ Return ONLY the JSON array, no other text."""
         
         try:
             chat = self._create_chat(system_message, "doc-parser")
-            user_message = UserMessage(text=prompt)
-            response = await chat.send_message(user_message)
+            response = await self._send(chat, system_message, prompt, 'parse_document')
             
             # Clean and parse
             response_text = response.strip()
@@ -276,13 +298,19 @@ Provide a clear, educational explanation suitable for learners."""
         
         try:
             chat = self._create_chat(system_message, "explanation")
-            user_message = UserMessage(text=prompt)
-            response = await chat.send_message(user_message)
+            response = await self._send(chat, system_message, prompt, 'generate_explanation')
             return response.strip()
             
         except Exception as e:
             raise RuntimeError(f"Explanation generation failed: {str(e)}")
 
 
-# Singleton instance
-ai_service = AIService()
+# Singleton instance, created on first use
+_ai_service: Optional[AIService] = None
+
+
+def get_ai_service() -> AIService:
+    global _ai_service
+    if _ai_service is None:
+        _ai_service = AIService()
+    return _ai_service
@@ -0,0 +1,316 @@
+"""
+Grading Service for Quiz Application
+Grades quiz submissions server-side against an in-memory answer map:
+- Single submission grading in one pass
+- Batch grading for many submissions at once (e.g. a whole class)
+- Answer/explanation reveal after submission from a cached lookup
+- Per-category/difficulty breakdown of graded answers
+- Writes made through this worker are applied to the map in place; writes
+  seen only as a question bank version bump are picked up by a reload on a
+  background thread while grading continues from the current map
+"""
+import logging
+import sys
+import threading
+import time
+from itertools import chain, repeat
+from operator import eq
+from typing import List, Dict, Optional, Any, Tuple
+
+import numpy as np
+from cachetools import LRUCache
+from pymongo.errors import PyMongoError
+
+from metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+# Stands in for the answer of an unknown question so it never compares equal
+_MISSING = object()
+
+_UNKNOWN_TOPIC = ('Uncategorized', 'medium')
+
+# Fields read from the questions collection to grade and break down answers
+_GRADING_PROJECTION = {'_id': 0, 'id': 1, 'answer': 1, 'category': 1, 'difficulty': 1}
+
+
+class GradingService:
+    """Service that keeps question_id -> answer in memory and grades submissions"""
+
+    # Seconds before the answer map is reloaded, so edits made by other
+    # workers are picked up without a restart
+    REFRESH_INTERVAL = 300
+
+    # Explanations are only needed after submission, so keep the hot ones
+    # instead of the whole bank
+    REVEAL_CACHE_SIZE = 10000
+
+    def __init__(self):
+        self._answers: Dict[str, str] = {}
+        self._topics: Dict[str, Tuple[str, str]] = {}
+        self._explanations: LRUCache = LRUCache(maxsize=self.REVEAL_CACHE_SIZE)
+        self._loaded_at: Optional[float] = None
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        self._reloader: Optional[threading.Thread] = None
+
+    @property
+    def size(self) -> int:
+        return len(self._answers)
+
+    def load(
+        self,
+        answers: Dict[str, str],
+        topics: Optional[Dict[str, Tuple[str, str]]] = None,
+        version: Optional[int] = None
+    ):
+        """Replace the answer map with a prebuilt question_id -> answer mapping"""
+        with self._lock:
+            if version != self._version:
+                # Cached explanations may be just as outdated as the answers
+                self._explanations.clear()
+            self._answers = dict(answers)
+            self._topics = dict(topics or {})
+            self._loaded_at = time.monotonic()
+            self._version = version
+
+    @staticmethod
+    def _topic_of(question: Dict[str, Any]) -> Tuple[str, str]:
+        # Interned so a large bank shares one string per category/difficulty
+        return (
+            sys.intern(question.get('category') or _UNKNOWN_TOPIC[0]),
+            sys.intern(question.get('difficulty') or _UNKNOWN_TOPIC[1])
+        )
+
+    def refresh(self, collection, version: Optional[int] = None):
+        """Reload the answer map from the questions collection"""
+        answers = {}
+        topics = {}
+        for q in collection.find({}, _GRADING_PROJECTION):
+            answers[q['id']] = q['answer']
+            topics[q['id']] = self._topic_of(q)
+        self.load(answers, topics, version)
+
+    def ensure_loaded(self, collection, version: Optional[int] = None):
+        """
+        Load the answer map on first use; after that, reload it on a background
+        thread whenever it has gone stale or the question bank version differs
+        from the one it was loaded at. Until the reload finishes, grading keeps
+        using the current map, so a full scan never runs inside a request.
+        """
+        if self._loaded_at is None:
+            self.refresh(collection, version)
+            return
+        changed = version is not None and version != self._version
+        if changed or time.monotonic() - self._loaded_at > self.REFRESH_INTERVAL:
+            self._reload_in_background(collection, version)
+
+    def _reload_in_background(self, collection, version: Optional[int]):
+        with self._lock:
+            if self._reloader is not None and self._reloader.is_alive():
+                return
+            self._reloader = threading.Thread(
+                target=self._reload,
+                args=(collection, version),
+                name='grading-reload',
+                daemon=True
+            )
+            self._reloader.start()
+
+    def _reload(self, collection, version: Optional[int]):
+        try:
+            self.refresh(collection, version)
+        except PyMongoError as e:
+            # The current map keeps serving; the next request tries again
+            logger.warning("Could not reload the answer map: %s", e)
+
+    def advance(self, version: int):
+        """
+        Record a question bank version bumped by this worker's own write
+        The write was already applied through sync_question/remove, so the map
+        is current at the new version unless it had missed an earlier one.
+        """
+        with self._lock:
+            if self._version is not None and version == self._version + 1:
+                self._version = version
+
+    def sync_question(self, question: Dict[str, Any]):
+        """Record a new or edited question and drop its cached explanation"""
+        self._answers[question['id']] = question['answer']
+        self._topics[question['id']] = self._topic_of(question)
+        self._explanations.pop(question['id'], None)
+
+    def remove(self, question_id: str):
+        """Forget a deleted question"""
+        self._answers.pop(question_id, None)
+        self._topics.pop(question_id, None)
+        self._explanations.pop(question_id, None)
+
+    def invalidate(self):
+        """Force a full reload on the next grading call"""
+        self._loaded_at = None
+        self._explanations.clear()
+
+    def _fetch_missing(self, question_ids: List[str], collection):
+        """Pull answers for IDs the map does not know yet in a single query"""
+        if collection is None or all(map(self._answers.__contains__, question_ids)):
+            record_cache('grading_answers', len(question_ids))
+            return
+        missing = list(set(question_ids).difference(self._answers))
+        record_cache('grading_answers', len(question_ids) - len(missing), len(missing))
+        if missing:
+            for q in collection.find({'id': {'$in': missing}}, _GRADING_PROJECTION):
+                self._answers[q['id']] = q['answer']
+                self._topics[q['id']] = self._topic_of(q)
+
+    def _compare(self, question_ids: List[str], answers: List[Optional[str]]) -> List[bool]:
+        """Element-wise answer check, run entirely through C-level map()/eq"""
+        expected = map(self._answers.get, question_ids, repeat(_MISSING))
+        return list(map(eq, expected, answers))
+
+    def grade(
+        self,
+        question_ids: List[str],
+        answers: List[Optional[str]],
+        collection=None
+    ) -> Dict[str, Any]:
+        """
+        Grade a single submission
+
+        Args:
+            question_ids: IDs of the questions that were asked, in order
+            answers: Selected options aligned with question_ids ('' or None if skipped)
+            collection: Optional questions collection used to resolve unknown IDs
+
+        Returns:
+            {
+                "correct": List[bool],
+                "score": int,
+                "total": int,
+                "percentage": int
+            }
+        """
+        if len(question_ids) != len(answers):
+            raise ValueError("question_ids and answers must have the same length")
+
+        self._fetch_missing(question_ids, collection)
+        correct = self._compare(question_ids, answers)
+        score = sum(correct)
+        total = len(correct)
+
+        return {
+            'correct': correct,
+            'score': score,
+            'total': total,
+            'percentage': round(score * 100 / total) if total else 0
+        }
+
+    def breakdown(self, question_ids: List[str], correct: List[bool]) -> List[Dict[str, Any]]:
+        """
+        Group graded answers by (category, difficulty) of each question
+
+        Returns:
+            [{"category": str, "difficulty": str, "answered": int, "correct": int}, ...]
+        """
+        groups: Dict[Tuple[str, str], List[int]] = {}
+        lookup = self._topics.get
+        for qid, ok in zip(question_ids, correct):
+            counts = groups.setdefault(lookup(qid, _UNKNOWN_TOPIC), [0, 0])
+            counts[0] += 1
+            counts[1] += ok
+        return [
+            {'category': category, 'difficulty': difficulty, 'answered': answered, 'correct': right}
+            for (category, difficulty), (answered, right) in groups.items()
+        ]
+
+    def reveal(self, question_ids: List[str], collection) -> List[Dict[str, Optional[str]]]:
+        """
+        Correct answers and explanations for already-submitted questions
+
+        Cache misses are resolved with one $in query that reads only
+        answer and explanation.
+
+        Returns:
+            One {"question_id", "answer", "explanation"} entry per ID, in order
+        """
+        unique = set(question_ids)
+        missing = [qid for qid in unique if qid not in self._explanations]
+        record_cache('grading_explanations', len(unique) - len(missing), len(missing))
+        if missing:
+            cursor = collection.find(
+                {'id': {'$in': missing}},
+                {'_id': 0, 'id': 1, 'answer': 1, 'explanation': 1}
+            )
+            for q in cursor:
+                self._answers[q['id']] = q['answer']
+                self._explanations[q['id']] = q.get('explanation')
+
+        return [
+            {
+                'question_id': qid,
+                'answer': self._answers.get(qid),
+                'explanation': self._explanations.get(qid)
+            }
+            for qid in question_ids
+        ]
+
+    def grade_batch(
+        self,
+        submissions: List[Dict[str, List[Optional[str]]]],
+        collection=None
+    ) -> List[Dict[str, Any]]:
+        """
+        Grade many submissions at once
+
+        All answers are flattened into one array and compared in a single pass;
+        per-submission scores are then reduced with numpy instead of looping
+        over every submission in Python.
+
+        Args:
+            submissions: List of {"question_ids": [...], "answers": [...]}
+            collection: Optional questions collection used to resolve unknown IDs
+
+        Returns:
+            One grading result per submission, in the same shape as grade()
+        """
+        if not submissions:
+            return []
+
+        for idx, sub in enumerate(submissions):
+            if len(sub['question_ids']) != len(sub['answers']):
+                raise ValueError(f"Submission {idx + 1}: question_ids and answers must have the same length")
+
+        lengths = [len(sub['question_ids']) for sub in submissions]
+        flat_ids = list(chain.from_iterable(sub['question_ids'] for sub in submissions))
+        flat_answers = list(chain.from_iterable(sub['answers'] for sub in submissions))
+
+        self._fetch_missing(flat_ids, collection)
+        flat_correct = self._compare(flat_ids, flat_answers)
+
+        totals = np.asarray(lengths, dtype=np.int64)
+        offsets = np.concatenate(([0], np.cumsum(totals)[:-1]))
+        # reduceat misbehaves on empty segments, so only reduce the non-empty ones
+        non_empty = totals > 0
+        scores = np.zeros(len(totals), dtype=np.int64)
+        if non_empty.any():
+            scores[non_empty] = np.add.reduceat(np.array(flat_correct, dtype=np.int64), offsets[non_empty])
+        percentages = np.divide(scores * 100, totals, out=np.zeros(len(totals)), where=non_empty)
+
+        return [
+            {
+                'correct': flat_correct[start:start + total],
+                'score': score,
+                'total': total,
+                'percentage': percentage
+            }
+            for start, total, score, percentage in zip(
+                offsets.tolist(),
+                lengths,
+                scores.tolist(),
+                np.rint(percentages).astype(np.int64).tolist()
+            )
+        ]
+
+
+# Singleton instance
+grading_service = GradingService()
@@ -0,0 +1,177 @@
+"""
+Leaderboard Service for Quiz Application
+Keeps global, per-category and weekly leaderboards:
+- In-process sorted boards for O(log n) top-N and "my rank" reads
+- Mirrored to the leaderboard collection (indexed by board + score)
+Points are the number of correctly answered questions in quiz sessions
+(/quiz/start then submit, each graded once) and admin class batches.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Any, Tuple
+
+from pymongo import UpdateOne
+from sortedcontainers import SortedList
+
+from database import leaderboard_collection
+
+GLOBAL_BOARD = 'global'
+
+
+def category_board(category: str) -> str:
+    return f"category:{category}"
+
+
+def weekly_board(moment: Optional[datetime] = None) -> str:
+    year, week, _ = (moment or datetime.utcnow()).isocalendar()
+    return f"weekly:{year}-W{week:02d}"
+
+
+class RankedBoard:
+    """Sorted (score desc, user_id) board with O(log n) updates and rank lookups"""
+
+    def __init__(self, scores: Optional[Dict[str, int]] = None):
+        self._scores: Dict[str, int] = dict(scores or {})
+        self._ranked = SortedList((-score, user_id) for user_id, score in self._scores.items())
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def set(self, user_id: str, score: int):
+        old = self._scores.get(user_id)
+        if old is not None:
+            self._ranked.remove((-old, user_id))
+        self._scores[user_id] = score
+        self._ranked.add((-score, user_id))
+
+    def add(self, user_id: str, delta: int) -> int:
+        score = self._scores.get(user_id, 0) + delta
+        self.set(user_id, score)
+        return score
+
+    def _rank_of_score(self, score: int) -> int:
+        # Competition ranking: 1 + number of users with a strictly higher score
+        return self._ranked.bisect_left((-score,)) + 1
+
+    def top(self, limit: int = 10, offset: int = 0) -> List[Tuple[int, str, int]]:
+        """[(rank, user_id, score), ...] for the requested page"""
+        return [
+            (self._rank_of_score(-neg_score), user_id, -neg_score)
+            for neg_score, user_id in self._ranked.islice(offset, offset + limit)
+        ]
+
+    def rank(self, user_id: str) -> Optional[Tuple[int, int]]:
+        """(rank, score) of a user, or None if they are not on the board"""
+        score = self._scores.get(user_id)
+        if score is None:
+            return None
+        return self._rank_of_score(score), score
+
+
+class LeaderboardService:
+    """Service that serves leaderboards from memory and mirrors them to Mongo"""
+
+    # Seconds before a board is reloaded from Mongo, so points recorded by
+    # other workers show up without a restart
+    REFRESH_INTERVAL = 300
+
+    # Weekly boards are kept in Mongo for a few weeks after they close
+    WEEKLY_RETENTION = timedelta(weeks=5)
+
+    # Weekly boards held in memory (current week plus recent ones)
+    WEEKLY_IN_MEMORY = 2
+
+    def __init__(self):
+        self._boards: Dict[str, RankedBoard] = {}
+        self._loaded_at: Dict[str, float] = {}
+        self._usernames: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _board(self, name: str) -> RankedBoard:
+        loaded_at = self._loaded_at.get(name)
+        if loaded_at is None or time.monotonic() - loaded_at > self.REFRESH_INTERVAL:
+            self._load(name)
+        return self._boards[name]
+
+    def _load(self, name: str):
+        scores = {}
+        for entry in leaderboard_collection.find({'board': name}, {'_id': 0, 'user_id': 1, 'username': 1, 'score': 1}):
+            scores[entry['user_id']] = entry['score']
+            if entry.get('username'):
+                self._usernames[entry['user_id']] = entry['username']
+        board = RankedBoard(scores)
+        with self._lock:
+            self._boards[name] = board
+            self._loaded_at[name] = time.monotonic()
+            if name.startswith('weekly:'):
+                # Week names sort chronologically; evict the oldest ones
+                weekly = sorted(b for b in self._boards if b.startswith('weekly:'))
+                for old in weekly[:-self.WEEKLY_IN_MEMORY]:
+                    self._boards.pop(old, None)
+                    self._loaded_at.pop(old, None)
+
+    def _points(self, result: Dict[str, Any]) -> Dict[str, int]:
+        """Points a result adds to each board it counts towards"""
+        points = {
+            GLOBAL_BOARD: result['score'],
+            weekly_board(result['submitted_at']): result['score']
+        }
+        for group in result.get('breakdown', []):
+            board = category_board(group['category'])
+            points[board] = points.get(board, 0) + group['correct']
+        return points
+
+    def record_results(self, results: List[Dict[str, Any]], usernames: Dict[str, str]):
+        """
+        Add the points of stored results to every board they count towards
+
+        Args:
+            results: Result documents as written to the results collection
+            usernames: user_id -> username for display
+        """
+        operations = []
+        for result in results:
+            user_id = result['user_id']
+            username = usernames.get(user_id) or self._usernames.get(user_id)
+            if username:
+                self._usernames[user_id] = username
+            expires_at = result['submitted_at'] + self.WEEKLY_RETENTION
+
+            for board, points in self._points(result).items():
+                update = {'$inc': {'score': points}, '$set': {'updated_at': result['submitted_at']}}
+                if username:
+                    update['$set']['username'] = username
+                if board.startswith('weekly:'):
+                    update['$set']['expires_at'] = expires_at
+                operations.append(UpdateOne({'board': board, 'user_id': user_id}, update, upsert=True))
+
+                # Only boards already in memory are patched; others load on first read
+                if board in self._boards:
+                    self._boards[board].add(user_id, points)
+
+        if operations:
+            leaderboard_collection.bulk_write(operations, ordered=False)
+
+    def record_result(self, result: Dict[str, Any], username: Optional[str] = None):
+        self.record_results([result], {result['user_id']: username} if username else {})
+
+    def top(self, board: str, limit: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
+        return [
+            {'rank': rank, 'user_id': user_id, 'username': self._usernames.get(user_id), 'score': score}
+            for rank, user_id, score in self._board(board).top(limit, offset)
+        ]
+
+    def rank(self, board: str, user_id: str) -> Optional[Dict[str, Any]]:
+        found = self._board(board).rank(user_id)
+        if found is None:
+            return None
+        rank, score = found
+        return {'rank': rank, 'user_id': user_id, 'username': self._usernames.get(user_id), 'score': score}
+
+    def size(self, board: str) -> int:
+        return len(self._board(board))
+
+
+# Singleton instance
+leaderboard_service = LeaderboardService()
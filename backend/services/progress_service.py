@@ -0,0 +1,214 @@
+"""
+Progress Service for Quiz Application
+Maintains one materialized rollup document per user:
+- Totals, accuracy per category and difficulty
+- Daily streaks
+- Most recent attempts
+Rollups are updated with $inc when a result is stored, so dashboards need a
+single point read regardless of how many quizzes a user has taken.
+"""
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Any
+
+from pymongo import ReturnDocument, UpdateOne
+
+from database import progress_collection, results_collection
+
+
+def _field_key(name: str) -> str:
+    """Make a category/difficulty name safe to use as a Mongo field name"""
+    return name.replace('.', '_').replace('$', '_') or '_'
+
+
+def _day(moment: datetime) -> str:
+    return moment.strftime('%Y-%m-%d')
+
+
+class ProgressService:
+    """Service that keeps per-user progress rollups in sync with stored results"""
+
+    RECENT_ATTEMPTS = 10
+
+    def _rollup_update(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """$inc/$push/$set update that folds one result into a rollup"""
+        inc = {
+            'quizzes_taken': 1,
+            'questions_answered': result['total'],
+            'correct_answers': result['score'],
+            'time_spent': result.get('time_spent', 0)
+        }
+        names = {}
+        quiz_categories = set()
+        for group in result.get('breakdown', []):
+            cat_key = f"by_category.{_field_key(group['category'])}"
+            diff_key = f"by_difficulty.{_field_key(group['difficulty'])}"
+            for key in (cat_key, diff_key):
+                inc[f'{key}.answered'] = inc.get(f'{key}.answered', 0) + group['answered']
+                inc[f'{key}.correct'] = inc.get(f'{key}.correct', 0) + group['correct']
+            names[f'{cat_key}.name'] = group['category']
+            names[f'{diff_key}.name'] = group['difficulty']
+            quiz_categories.add(cat_key)
+        for cat_key in quiz_categories:
+            inc[f'{cat_key}.quizzes'] = 1
+
+        attempt = {
+            'result_id': result['id'],
+            'score': result['score'],
+            'total': result['total'],
+            'percentage': result['percentage'],
+            'category': result.get('category'),
+            'difficulty': result.get('difficulty'),
+            'submitted_at': result['submitted_at']
+        }
+
+        return {
+            '$inc': inc,
+            '$set': {**names, 'last_quiz_at': result['submitted_at']},
+            '$setOnInsert': {'current_streak': 0, 'best_streak': 0},
+            '$push': {
+                'recent': {
+                    '$each': [attempt],
+                    '$position': 0,
+                    '$slice': self.RECENT_ATTEMPTS
+                }
+            }
+        }
+
+    def apply_result(self, result: Dict[str, Any]):
+        """Fold a freshly stored result into the user's rollup"""
+        before = progress_collection.find_one_and_update(
+            {'user_id': result['user_id']},
+            self._rollup_update(result),
+            upsert=True,
+            projection={'_id': 0, 'last_active_day': 1, 'current_streak': 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        self._advance_streak(result['user_id'], result['submitted_at'], before)
+
+    def apply_results(self, results: List[Dict[str, Any]]):
+        """Fold many results (e.g. a class batch) into their users' rollups"""
+        for result in results:
+            self.apply_result(result)
+
+    def _advance_streak(self, user_id: str, submitted_at: datetime, before: Optional[Dict[str, Any]]):
+        """Count consecutive active days; one conditional update, no history scan"""
+        today = _day(submitted_at)
+        last_day = (before or {}).get('last_active_day')
+        if last_day == today:
+            return
+
+        yesterday = _day(submitted_at - timedelta(days=1))
+        streak = (before or {}).get('current_streak', 0) + 1 if last_day == yesterday else 1
+
+        # Guard on the day we read so a concurrent submit cannot double count
+        progress_collection.update_one(
+            {'user_id': user_id, 'last_active_day': last_day},
+            {
+                '$set': {'last_active_day': today, 'current_streak': streak},
+                '$max': {'best_streak': streak}
+            }
+        )
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Point read of a user's rollup"""
+        return progress_collection.find_one({'user_id': user_id}, {'_id': 0})
+
+    def rebuild(self, user_id: Optional[str] = None) -> int:
+        """
+        Recompute rollups from raw results with a single aggregation
+
+        Args:
+            user_id: Only rebuild this user's rollup (all users if omitted)
+
+        Returns:
+            Number of rollup documents written
+        """
+        match = {'user_id': user_id} if user_id else {}
+        pipeline = [
+            {'$match': match},
+            {'$sort': {'submitted_at': -1}},
+            {'$group': {
+                '_id': '$user_id',
+                'quizzes_taken': {'$sum': 1},
+                'questions_answered': {'$sum': '$total'},
+                'correct_answers': {'$sum': '$score'},
+                'time_spent': {'$sum': {'$ifNull': ['$time_spent', 0]}},
+                'last_quiz_at': {'$first': '$submitted_at'},
+                'breakdowns': {'$push': {'$ifNull': ['$breakdown', []]}},
+                'days': {'$addToSet': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$submitted_at'}}},
+                'recent': {'$firstN': {
+                    'n': self.RECENT_ATTEMPTS,
+                    'input': {
+                        'result_id': '$id',
+                        'score': '$score',
+                        'total': '$total',
+                        'percentage': '$percentage',
+                        'category': '$category',
+                        'difficulty': '$difficulty',
+                        'submitted_at': '$submitted_at'
+                    }
+                }}
+            }}
+        ]
+
+        operations = []
+        for row in results_collection.aggregate(pipeline, allowDiskUse=True):
+            operations.append(UpdateOne(
+                {'user_id': row['_id']},
+                {'$set': self._rollup_from_aggregate(row)},
+                upsert=True
+            ))
+
+        if operations:
+            progress_collection.bulk_write(operations, ordered=False)
+        return len(operations)
+
+    def _rollup_from_aggregate(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        by_category: Dict[str, Dict[str, Any]] = {}
+        by_difficulty: Dict[str, Dict[str, Any]] = {}
+        for breakdown in row['breakdowns']:
+            seen = set()
+            for group in breakdown:
+                cat_key = _field_key(group['category'])
+                diff_key = _field_key(group['difficulty'])
+                cat = by_category.setdefault(cat_key, {'name': group['category'], 'answered': 0, 'correct': 0, 'quizzes': 0})
+                diff = by_difficulty.setdefault(diff_key, {'name': group['difficulty'], 'answered': 0, 'correct': 0})
+                for bucket in (cat, diff):
+                    bucket['answered'] += group['answered']
+                    bucket['correct'] += group['correct']
+                if cat_key not in seen:
+                    cat['quizzes'] += 1
+                    seen.add(cat_key)
+
+        days = sorted(row['days'])
+        current_streak, best_streak = self._streaks(days)
+
+        return {
+            'quizzes_taken': row['quizzes_taken'],
+            'questions_answered': row['questions_answered'],
+            'correct_answers': row['correct_answers'],
+            'time_spent': row['time_spent'],
+            'by_category': by_category,
+            'by_difficulty': by_difficulty,
+            'current_streak': current_streak,
+            'best_streak': best_streak,
+            'last_active_day': days[-1] if days else None,
+            'last_quiz_at': row['last_quiz_at'],
+            'recent': row['recent']
+        }
+
+    @staticmethod
+    def _streaks(days: List[str]):
+        """(streak ending on the last active day, longest streak) for sorted YYYY-MM-DD days"""
+        best = current = 0
+        previous = None
+        for day in days:
+            moment = datetime.strptime(day, '%Y-%m-%d')
+            current = current + 1 if previous and moment - previous == timedelta(days=1) else 1
+            best = max(best, current)
+            previous = moment
+        return current, best
+
+
+# Singleton instance
+progress_service = ProgressService()
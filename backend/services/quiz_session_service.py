@@ -0,0 +1,244 @@
+"""
+Quiz Session Service for Quiz Application
+Persists started quizzes so they survive a page reload:
+- Frozen question set (public fields only) and progress in one session document
+- Resume is a single point read
+- Pool of pre-generated question sets for popular quiz templates, so a quiz
+  can start without running a sampling query. Sets are tagged with the
+  question bank version they were sampled from and only claimed while it
+  is current, so edited or deleted questions stop being served as soon as
+  an admin write bumps the version.
+"""
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Any, Set
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from database import (
+    questions_collection,
+    quizzes_collection,
+    quiz_pool_collection,
+    PUBLIC_QUESTION_PROJECTION
+)
+from metrics import record_cache
+
+
+def template_key(category: Optional[str], difficulty: Optional[str], limit: int) -> str:
+    """Pool key for a quiz shape, e.g. 'OOP Concepts|medium|10'"""
+    return f"{category or '*'}|{difficulty or '*'}|{limit}"
+
+
+# Query filters below are also explained by check_indexes.py
+
+def pool_filter(template: str, version: int) -> Dict[str, Any]:
+    """Pool sets of a template sampled from one question bank version"""
+    return {'template': template, 'version': version}
+
+
+def in_progress_filter(user_id: str, question_ids: List[str]) -> Dict[str, Any]:
+    """The user's unfinished sessions that contain any of question_ids"""
+    return {'user_id': user_id, 'status': 'in_progress', 'question_ids': {'$in': question_ids}}
+
+
+class QuizSessionService:
+    """Service that creates, resumes and completes persisted quiz sessions"""
+
+    # In-progress sessions are dropped by a TTL index after this long
+    SESSION_TTL = timedelta(hours=24)
+
+    # Pre-generated sets kept per template, and how long a set stays valid
+    POOL_TARGET = 20
+    POOL_TTL = timedelta(hours=6)
+
+    # Longest a refill holds its template's marker if it never releases it
+    REFILL_LOCK = timedelta(seconds=60)
+
+    def sample(self, category: Optional[str], difficulty: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        """Random public questions, sampled and projected inside Mongo"""
+        if limit <= 0:
+            return []
+        query = {}
+        if category:
+            query['category'] = category
+        if difficulty:
+            query['difficulty'] = difficulty
+        return list(questions_collection.aggregate([
+            {'$match': query},
+            {'$sample': {'size': limit}},
+            {'$project': PUBLIC_QUESTION_PROJECTION}
+        ]))
+
+    def claim(self, template: str, version: int) -> Optional[List[Dict[str, Any]]]:
+        """Take one question set sampled from the current bank version, if the pool has any"""
+        entry = quiz_pool_collection.find_one_and_delete(
+            pool_filter(template, version),
+            projection={'_id': 0, 'questions': 1}
+        )
+        record_cache('quiz_pool', 1 if entry else 0, 0 if entry else 1)
+        return entry['questions'] if entry else None
+
+    def refill(self, category: Optional[str], difficulty: Optional[str], limit: int, version: int) -> int:
+        """
+        Top the pool for a template back up to POOL_TARGET sets of the current version
+        Returns 0 without sampling while another refill of the template is running.
+        """
+        template = template_key(category, difficulty, limit)
+        if not self._lock_refill(template):
+            return 0
+        try:
+            # Sets from older versions can never be claimed; drop them now
+            # rather than when their TTL runs out
+            quiz_pool_collection.delete_many({'template': template, 'version': {'$ne': version}})
+            missing = self.POOL_TARGET - quiz_pool_collection.count_documents(pool_filter(template, version))
+            if missing <= 0:
+                return 0
+
+            now = datetime.utcnow()
+            entries = []
+            for _ in range(missing):
+                questions = self.sample(category, difficulty, limit)
+                if not questions:
+                    break
+                entries.append({
+                    'template': template,
+                    'version': version,
+                    'questions': questions,
+                    'created_at': now,
+                    'expires_at': now + self.POOL_TTL
+                })
+            if entries:
+                quiz_pool_collection.insert_many(entries, ordered=False)
+            return len(entries)
+        finally:
+            quiz_pool_collection.delete_one({'_id': f"refill|{template}"})
+
+    def _lock_refill(self, template: str) -> bool:
+        """
+        Take the template's refill marker, a pool document keyed by _id
+        The upsert only matches a lapsed marker; while one is held it tries to
+        insert a second document with the same _id, which fails atomically.
+        """
+        now = datetime.utcnow()
+        try:
+            quiz_pool_collection.update_one(
+                {'_id': f"refill|{template}", 'expires_at': {'$lte': now}},
+                {'$set': {'expires_at': now + self.REFILL_LOCK}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            return False
+        return True
+
+    def popular_templates(self, top: int = 10, since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Most started random-mode templates, newest sessions only"""
+        since = since or datetime.utcnow() - timedelta(days=7)
+        return list(quizzes_collection.aggregate([
+            {'$match': {'started_at': {'$gte': since}, 'mode': 'random'}},
+            {'$group': {
+                '_id': '$template',
+                'category': {'$first': '$category'},
+                'difficulty': {'$first': '$difficulty'},
+                'limit': {'$first': {'$size': '$question_ids'}},
+                'starts': {'$sum': 1}
+            }},
+            {'$sort': {'starts': -1}},
+            {'$limit': top}
+        ]))
+
+    def create(
+        self,
+        user_id: str,
+        questions: List[Dict[str, Any]],
+        category: Optional[str],
+        difficulty: Optional[str],
+        mode: str,
+        limit: int
+    ) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        session = {
+            'id': str(uuid.uuid4()),
+            'user_id': user_id,
+            'template': template_key(category, difficulty, limit),
+            'category': category,
+            'difficulty': difficulty,
+            'mode': mode,
+            'questions': questions,
+            'question_ids': [q['id'] for q in questions],
+            'answers': [None] * len(questions),
+            'current_index': 0,
+            'status': 'in_progress',
+            'started_at': now,
+            'updated_at': now,
+            'expires_at': now + self.SESSION_TTL
+        }
+        quizzes_collection.insert_one(session)
+        session.pop('_id', None)
+        return session
+
+    def get(self, session_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """Point read of one of the user's sessions"""
+        return quizzes_collection.find_one({'id': session_id, 'user_id': user_id}, {'_id': 0})
+
+    def active(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """The user's most recent unfinished session"""
+        return quizzes_collection.find_one(
+            {'user_id': user_id, 'status': 'in_progress'},
+            {'_id': 0},
+            sort=[('started_at', -1)]
+        )
+
+    def in_progress_ids(self, user_id: str, question_ids: List[str]) -> Set[str]:
+        """
+        The question_ids that belong to one of the user's unfinished sessions
+        Their answers must stay hidden until that session is submitted.
+        """
+        wanted = set(question_ids)
+        if not wanted:
+            return set()
+        held = set()
+        for session in quizzes_collection.find(in_progress_filter(user_id, list(wanted)), {'_id': 0, 'question_ids': 1}):
+            held.update(wanted.intersection(session['question_ids']))
+        return held
+
+    def save_progress(
+        self,
+        session_id: str,
+        user_id: str,
+        answers: List[Optional[str]],
+        current_index: int
+    ) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+        return quizzes_collection.find_one_and_update(
+            {'id': session_id, 'user_id': user_id, 'status': 'in_progress'},
+            {'$set': {
+                'answers': answers,
+                'current_index': current_index,
+                'updated_at': now,
+                'expires_at': now + self.SESSION_TTL
+            }},
+            projection={'_id': 0},
+            return_document=ReturnDocument.AFTER
+        )
+
+    def complete(self, session_id: str, user_id: str, answers: List[Optional[str]], result_id: str) -> bool:
+        """Mark a session submitted; False if it was already submitted or expired"""
+        update = quizzes_collection.update_one(
+            {'id': session_id, 'user_id': user_id, 'status': 'in_progress'},
+            {
+                '$set': {
+                    'answers': answers,
+                    'status': 'submitted',
+                    'result_id': result_id,
+                    'updated_at': datetime.utcnow()
+                },
+                # Submitted sessions are kept; only abandoned ones expire
+                '$unset': {'expires_at': ''}
+            }
+        )
+        return update.modified_count == 1
+
+
+# Singleton instance
+quiz_session_service = QuizSessionService()
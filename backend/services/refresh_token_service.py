@@ -0,0 +1,74 @@
+"""
+Refresh Token Service for Quiz Application
+Long-lived opaque tokens that renew access tokens without a password check:
+- Only the SHA-256 of a token is stored, as the document _id
+- Every refresh rotates the token: the old one is marked used and a new
+  one in the same family is issued
+- Presenting a used token again means it leaked, so the whole family is revoked
+- A TTL index removes expired tokens
+The tokens are 256 random bits, so a fast hash is enough; bcrypt is kept
+for passwords only.
+"""
+import hashlib
+import secrets
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from config import settings
+from database import refresh_tokens_collection
+
+
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class RefreshTokenService:
+    """Service that issues, rotates and revokes refresh tokens"""
+
+    def issue(self, user_id: str, family: Optional[str] = None) -> str:
+        token = secrets.token_urlsafe(32)
+        now = datetime.utcnow()
+        refresh_tokens_collection.insert_one({
+            '_id': _hash(token),
+            'user_id': user_id,
+            'family': family or str(uuid.uuid4()),
+            'created_at': now,
+            'expires_at': now + timedelta(days=settings.refresh_token_expire_days)
+        })
+        return token
+
+    def rotate(self, token: str) -> Optional[Tuple[str, str]]:
+        """
+        Spend a refresh token and issue its successor
+        Returns (user_id, new token), or None if the token is unknown,
+        expired, already used or revoked.
+        """
+        now = datetime.utcnow()
+        doc = refresh_tokens_collection.find_one_and_update(
+            {'_id': _hash(token), 'used_at': None, 'expires_at': {'$gt': now}},
+            {'$set': {'used_at': now}}
+        )
+        if doc is None:
+            reused = refresh_tokens_collection.find_one({'_id': _hash(token), 'used_at': {'$ne': None}}, {'family': 1})
+            if reused:
+                self.revoke_family(reused['family'])
+            return None
+        return doc['user_id'], self.issue(doc['user_id'], doc['family'])
+
+    def revoke(self, token: str):
+        """Log out one session: drop the token and every rotation of it"""
+        doc = refresh_tokens_collection.find_one({'_id': _hash(token)}, {'family': 1})
+        if doc:
+            self.revoke_family(doc['family'])
+
+    def revoke_family(self, family: str):
+        refresh_tokens_collection.delete_many({'family': family})
+
+    def revoke_user(self, user_id: str):
+        """Log out every session of a user"""
+        refresh_tokens_collection.delete_many({'user_id': user_id})
+
+
+# Singleton instance
+refresh_token_service = RefreshTokenService()
@@ -0,0 +1,138 @@
+"""
+Review Service for Quiz Application
+Spaced-repetition review queue over bookmarked and missed questions:
+- One card per (user, question) with ease, interval and due date (SM-2)
+- Each card lists why it is queued ('bookmark', 'missed'); un-bookmarking
+  only removes the card once no other reason is left
+- "Due now" batches served by one range query on the (user_id, due_at) index
+"""
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Any
+
+from pymongo import UpdateOne
+
+from database import reviews_collection
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+
+# SM-2 answer quality (0-5) used for server-graded answers
+QUALITY_CORRECT = 4
+QUALITY_WRONG = 1
+
+
+def schedule(card: Dict[str, Any], quality: int, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Next state of a card after an answer of the given quality (SM-2)
+
+    Returns:
+        {"ease", "interval_days", "repetitions", "lapses", "due_at", "last_reviewed_at"}
+    """
+    now = now or datetime.utcnow()
+    ease = card.get('ease', DEFAULT_EASE)
+    interval = card.get('interval_days', 0)
+    repetitions = card.get('repetitions', 0)
+    lapses = card.get('lapses', 0)
+
+    if quality >= 3:
+        if repetitions == 0:
+            interval = 1
+        elif repetitions == 1:
+            interval = 6
+        else:
+            interval = max(1, round(interval * ease))
+        repetitions += 1
+    else:
+        repetitions = 0
+        interval = 1
+        lapses += 1
+
+    ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+
+    return {
+        'ease': round(ease, 3),
+        'interval_days': interval,
+        'repetitions': repetitions,
+        'lapses': lapses,
+        'due_at': now + timedelta(days=interval),
+        'last_reviewed_at': now
+    }
+
+
+class ReviewService:
+    """Service that maintains spaced-repetition cards per user"""
+
+    def enroll(self, user_id: str, question_ids: List[str], source: str, due_at: Optional[datetime] = None):
+        """
+        Put questions in a user's review queue, due now
+
+        New cards start with default scheduling; existing cards keep their
+        history but are pulled forward so they are due again.
+        """
+        due_at = due_at or datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {'user_id': user_id, 'question_id': qid},
+                {
+                    '$setOnInsert': {
+                        'ease': DEFAULT_EASE,
+                        'interval_days': 0,
+                        'repetitions': 0,
+                        'lapses': 0,
+                        'created_at': due_at
+                    },
+                    '$addToSet': {'sources': source},
+                    '$min': {'due_at': due_at}
+                },
+                upsert=True
+            )
+            for qid in dict.fromkeys(question_ids)
+        ]
+        if operations:
+            reviews_collection.bulk_write(operations, ordered=False)
+
+    def enroll_missed(self, results: List[Dict[str, Any]]):
+        """Queue every question answered wrongly in the given results"""
+        for result in results:
+            missed = [qid for qid, ok in zip(result['question_ids'], result['correct']) if not ok]
+            if missed:
+                self.enroll(result['user_id'], missed, 'missed', result['submitted_at'])
+
+    def drop_bookmark_card(self, user_id: str, question_id: str):
+        """Take the bookmark off a card, and remove the card if that was its only source"""
+        card = {'user_id': user_id, 'question_id': question_id}
+        reviews_collection.update_one(card, {'$pull': {'sources': 'bookmark'}})
+        # A quiz that misses the question in between adds a source back, so
+        # the card is kept
+        reviews_collection.delete_one({**card, 'sources': {'$size': 0}})
+
+    def due(self, user_id: str, limit: int = 20, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Cards due now, oldest first (one range query on the (user_id, due_at) index)"""
+        return list(
+            reviews_collection.find(
+                {'user_id': user_id, 'due_at': {'$lte': now or datetime.utcnow()}},
+                {'_id': 0}
+            ).sort('due_at', 1).limit(limit)
+        )
+
+    def count_due(self, user_id: str, now: Optional[datetime] = None) -> int:
+        return reviews_collection.count_documents(
+            {'user_id': user_id, 'due_at': {'$lte': now or datetime.utcnow()}}
+        )
+
+    def record_answer(self, user_id: str, question_id: str, correct: bool) -> Optional[Dict[str, Any]]:
+        """Reschedule a card after a review answer; None if the card does not exist"""
+        card = reviews_collection.find_one({'user_id': user_id, 'question_id': question_id}, {'_id': 0})
+        if not card:
+            return None
+
+        state = schedule(card, QUALITY_CORRECT if correct else QUALITY_WRONG)
+        reviews_collection.update_one(
+            {'user_id': user_id, 'question_id': question_id},
+            {'$set': state, '$inc': {'reviews': 1}}
+        )
+        return {**card, **state}
+
+
+# Singleton instance
+review_service = ReviewService()
@@ -0,0 +1,225 @@
+"""
+Search Service for Quiz Application
+Full-text question search for admins on the questions text index:
+- Ranked by Mongo's textScore (question text weighs most, then category,
+  options and explanation)
+- Highlights computed only for the page being returned
+- Pages fetched with one extra row to report has_more, since counting every
+  match of a common term would scan the whole match set
+- Only the first MAX_CANDIDATES matches are ranked, so a term found in most
+  of the bank does not sort the whole bank by score
+Faceted browsing: one aggregation whose $match uses the compound
+(filter field, created_at) indexes, then a $facet returning a page of
+questions and the counts of every facet value among the matches.
+"""
+import html
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from database import questions_collection
+from serialization import QUESTION_RESPONSE_PROJECTION
+
+MAX_PAGE_SIZE = 100
+# Sorting by score is blocking, so deep pages cost as much as all of them
+MAX_RESULTS = 1000
+# Matches ranked per search. For a very common term the ranking is over the
+# first matches in index order rather than the whole bank; narrow the query
+# (more terms, a category) to rank a more relevant set
+MAX_CANDIDATES = 5000
+
+SNIPPET_CHARS = 160
+
+DEFAULT_DIFFICULTY = 'medium'
+# Questions added by hand carry neither AI field
+MANUAL_SOURCE = 'manual'
+# Creators are unbounded, so only the most frequent are counted
+MAX_CREATOR_FACETS = 50
+
+_QUERY_TERM = re.compile(r'"([^"]+)"|(\S+)')
+# Mongo stems terms; trimming common suffixes lets "threads" match "threading"
+_SUFFIX = re.compile(r'(ing|ed|es|s)$')
+
+
+def search_terms(query: str) -> List[str]:
+    """Phrases and words of a $text query, without negated terms"""
+    terms = []
+    for phrase, word in _QUERY_TERM.findall(query):
+        if word.startswith('-'):
+            continue
+        term = phrase or word.strip('"')
+        if len(term) > 4 and ' ' not in term:
+            term = _SUFFIX.sub('', term)
+        if term:
+            terms.append(term)
+    return terms
+
+
+def highlight_pattern(terms: List[str]) -> Optional[re.Pattern]:
+    if not terms:
+        return None
+    alternatives = '|'.join(re.escape(term) for term in sorted(set(terms), key=len, reverse=True))
+    return re.compile(rf'\b(?:{alternatives})\w*', re.IGNORECASE)
+
+
+def highlight(text: str, pattern: re.Pattern) -> Tuple[str, bool]:
+    """HTML-escaped text with matches wrapped in <mark>, and whether anything matched"""
+    parts, last, found = [], 0, False
+    for match in pattern.finditer(text):
+        parts.append(html.escape(text[last:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group())}</mark>")
+        last, found = match.end(), True
+    parts.append(html.escape(text[last:]))
+    return ''.join(parts), found
+
+
+def snippet(text: str, pattern: re.Pattern, width: int = SNIPPET_CHARS) -> Optional[str]:
+    """Highlighted window of a long text around its first match"""
+    match = pattern.search(text)
+    if match is None:
+        return None
+    start = max(0, match.start() - width // 3)
+    end = min(len(text), start + width)
+    if end < len(text):
+        # Cut at a word boundary when there is one
+        space = text.rfind(' ', match.end(), end)
+        if space > 0:
+            end = space
+    marked, _ = highlight(text[start:end], pattern)
+    return ('…' if start else '') + marked + ('…' if end < len(text) else '')
+
+
+def _count_by(expression) -> List[Dict[str, Any]]:
+    # $sortByCount, with ties in value order so pages of counts are stable
+    return [
+        {'$group': {'_id': expression, 'count': {'$sum': 1}}},
+        {'$sort': {'count': -1, '_id': 1}}
+    ]
+
+
+class SearchService:
+    """Service that runs ranked text searches over the question bank"""
+
+    def search(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 20
+    ) -> Dict[str, Any]:
+        match: Dict[str, Any] = {'$text': {'$search': query}}
+        if category:
+            match['category'] = category
+        if difficulty:
+            match['difficulty'] = difficulty
+
+        skip = (page - 1) * page_size
+        docs = list(questions_collection.aggregate([
+            {'$match': match},
+            {'$limit': MAX_CANDIDATES},
+            {'$sort': {'score': {'$meta': 'textScore'}}},
+            {'$skip': skip},
+            {'$limit': page_size + 1},
+            {'$project': {**QUESTION_RESPONSE_PROJECTION, 'score': {'$meta': 'textScore'}}}
+        ]))
+        has_more = len(docs) > page_size and skip + page_size < MAX_RESULTS
+
+        pattern = highlight_pattern(search_terms(query))
+        results = [self._with_highlights(doc, pattern) for doc in docs[:page_size]]
+        return {
+            'query': query,
+            'page': page,
+            'page_size': page_size,
+            'has_more': has_more,
+            'results': results
+        }
+
+    def facets(
+        self,
+        categories: Optional[List[str]] = None,
+        difficulties: Optional[List[str]] = None,
+        generated_by_ai: Optional[bool] = None,
+        source_types: Optional[List[str]] = None,
+        creators: Optional[List[str]] = None,
+        page: int = 1,
+        page_size: int = 20
+    ) -> Dict[str, Any]:
+        """
+        A page of questions (newest first) and facet counts, in one round trip
+        Counts are over the questions matching every filter, so they show how
+        many results each further choice would leave.
+        """
+        match = self.facet_filter(categories, difficulties, generated_by_ai, source_types, creators)
+        [doc] = questions_collection.aggregate([
+            {'$match': match},
+            {'$sort': {'created_at': -1}},
+            {'$facet': {
+                'results': [
+                    {'$skip': (page - 1) * page_size},
+                    {'$limit': page_size},
+                    {'$project': QUESTION_RESPONSE_PROJECTION}
+                ],
+                'total': [{'$count': 'count'}],
+                'category': _count_by('$category'),
+                'difficulty': _count_by({'$ifNull': ['$difficulty', DEFAULT_DIFFICULTY]}),
+                'generatedByAI': _count_by({'$ifNull': ['$generatedByAI', False]}),
+                'sourceType': _count_by({'$ifNull': ['$sourceType', MANUAL_SOURCE]}),
+                'created_by': _count_by('$created_by') + [{'$limit': MAX_CREATOR_FACETS}]
+            }}
+        ])
+        total = doc.pop('total')
+        results = doc.pop('results')
+        return {
+            'total': total[0]['count'] if total else 0,
+            'page': page,
+            'page_size': page_size,
+            'results': results,
+            'facets': {
+                name: [{'value': bucket['_id'], 'count': bucket['count']} for bucket in buckets]
+                for name, buckets in doc.items()
+            }
+        }
+
+    @staticmethod
+    def facet_filter(
+        categories: Optional[List[str]],
+        difficulties: Optional[List[str]],
+        generated_by_ai: Optional[bool],
+        source_types: Optional[List[str]],
+        creators: Optional[List[str]]
+    ) -> Dict[str, Any]:
+        match: Dict[str, Any] = {}
+        if categories:
+            match['category'] = {'$in': categories}
+        if difficulties:
+            # Questions saved without a difficulty are shown as medium
+            match['difficulty'] = {'$in': difficulties + [None] if DEFAULT_DIFFICULTY in difficulties else difficulties}
+        if generated_by_ai is not None:
+            match['generatedByAI'] = True if generated_by_ai else {'$ne': True}
+        if source_types:
+            # null also matches questions without the field
+            match['sourceType'] = {'$in': [None if t == MANUAL_SOURCE else t for t in source_types]}
+        if creators:
+            match['created_by'] = {'$in': creators}
+        return match
+
+    @staticmethod
+    def _with_highlights(doc: Dict[str, Any], pattern: Optional[re.Pattern]) -> Dict[str, Any]:
+        highlights = {}
+        if pattern is not None:
+            marked, found = highlight(doc['question'], pattern)
+            if found:
+                highlights['question'] = marked
+            options = [option for option in doc['options'] if pattern.search(option)]
+            if options:
+                highlights['options'] = ' | '.join(highlight(option, pattern)[0] for option in options)
+            if doc.get('explanation'):
+                explanation = snippet(doc['explanation'], pattern)
+                if explanation:
+                    highlights['explanation'] = explanation
+        doc['highlights'] = highlights
+        return doc
+
+
+# Singleton instance
+search_service = SearchService()
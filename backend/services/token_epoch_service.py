@@ -0,0 +1,67 @@
+"""
+Token Epoch Service for Quiz Application
+Revocation for stateless access tokens:
+- Every token carries the user's token epoch at the time it was issued
+- Bumping the epoch (logout everywhere, role change) revokes all older tokens
+- Only users that ever revoked have a row, so the whole table stays small
+Workers keep the table in memory and reload it periodically, so
+authorizing a request never reads Mongo.
+"""
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from pymongo import ReturnDocument
+
+from database import token_epochs_collection
+from metrics import record_cache
+
+
+class TokenEpochService:
+    """Service that tracks the oldest token epoch still accepted per user"""
+
+    # Seconds between reloads; a revocation made through another worker is
+    # honored after at most this long (access tokens live 30 minutes)
+    REFRESH_INTERVAL = 30
+
+    def __init__(self):
+        self._epochs: Dict[str, int] = {}
+        self._loaded_at: Optional[float] = None
+
+    def refresh(self):
+        self._epochs = {doc['_id']: doc['epoch'] for doc in token_epochs_collection.find({}, {'epoch': 1})}
+        self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.REFRESH_INTERVAL:
+            record_cache('token_epochs', 0, 1)
+            self.refresh()
+        else:
+            record_cache('token_epochs', 1)
+
+    def is_current(self, user_id: str, epoch: int) -> bool:
+        """Whether a token issued at this epoch is still accepted"""
+        self.ensure_loaded()
+        return epoch >= self._epochs.get(user_id, 0)
+
+    def current(self, user_id: str) -> int:
+        """Epoch to stamp on a new token, read from Mongo so it is never stale"""
+        doc = token_epochs_collection.find_one({'_id': user_id}, {'epoch': 1})
+        epoch = doc['epoch'] if doc else 0
+        self._epochs[user_id] = epoch
+        return epoch
+
+    def revoke(self, user_id: str) -> int:
+        """Invalidate every token issued to the user so far"""
+        doc = token_epochs_collection.find_one_and_update(
+            {'_id': user_id},
+            {'$inc': {'epoch': 1}, '$set': {'updated_at': datetime.utcnow()}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self._epochs[user_id] = doc['epoch']
+        return doc['epoch']
+
+
+# Singleton instance
+token_epoch_service = TokenEpochService()
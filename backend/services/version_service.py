@@ -0,0 +1,70 @@
+"""
+Version Service for Quiz Application
+Change counters behind the ETags of read endpoints:
+- One counter for the whole question bank, bumped on every question write
+- One counter per user for their bookmarks
+A conditional GET only needs the counters, never the underlying list query.
+"""
+import time
+from typing import Dict, Tuple
+
+from pymongo import ReturnDocument
+
+from database import versions_collection
+from metrics import record_cache
+
+QUESTION_BANK = 'questions'
+
+
+def bookmarks_key(user_id: str) -> str:
+    return f"bookmarks:{user_id}"
+
+
+class VersionService:
+    """Service that reads and bumps per-resource version counters"""
+
+    # Seconds the question bank version is trusted from memory; writes made
+    # through other workers show up in ETags after at most this long
+    SHARED_TTL = 2
+
+    def __init__(self):
+        self._cache: Dict[str, Tuple[int, float]] = {}
+
+    def get(self, key: str) -> int:
+        """Current version of a resource (point read by _id, 0 if never bumped)"""
+        doc = versions_collection.find_one({'_id': key}, {'version': 1})
+        return doc['version'] if doc else 0
+
+    def bump(self, key: str) -> int:
+        doc = versions_collection.find_one_and_update(
+            {'_id': key},
+            {'$inc': {'version': 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self._cache[key] = (doc['version'], time.monotonic())
+        return doc['version']
+
+    def question_bank(self) -> int:
+        cached = self._cache.get(QUESTION_BANK)
+        if cached is None or time.monotonic() - cached[1] > self.SHARED_TTL:
+            record_cache('question_bank_version', 0, 1)
+            cached = (self.get(QUESTION_BANK), time.monotonic())
+            self._cache[QUESTION_BANK] = cached
+        else:
+            record_cache('question_bank_version', 1)
+        return cached[0]
+
+    def questions_changed(self) -> int:
+        return self.bump(QUESTION_BANK)
+
+    def bookmarks(self, user_id: str) -> int:
+        # Not cached: the user's next read may land on another worker
+        return self.get(bookmarks_key(user_id))
+
+    def bookmarks_changed(self, user_id: str) -> int:
+        return self.bump(bookmarks_key(user_id))
+
+
+# Singleton instance
+version_service = VersionService()
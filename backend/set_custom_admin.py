@@ -5,6 +5,8 @@ import uuid
 from datetime import datetime
 from database import users_collection
 from auth import get_password_hash
+from services.token_epoch_service import token_epoch_service
+from services.refresh_token_service import refresh_token_service
 
 def set_custom_admin():
     """Create or update custom admin user"""
@@ -26,6 +28,9 @@ def set_custom_admin():
                 "full_name": "Kartik Rathod"
             }}
         )
+        # Tokens issued under the old password or role stop working
+        token_epoch_service.revoke(existing_user['id'])
+        refresh_token_service.revoke_user(existing_user['id'])
         print(f"✅ User updated to admin successfully!")
     else:
         # Create new admin user
@@ -0,0 +1,89 @@
+"""
+Streaming import of question banks from Excel workbooks (.xlsx)
+
+The workbook is opened in openpyxl's read-only mode, which parses each sheet
+as rows are requested instead of building the whole workbook in memory, and
+rows are handed on in batches of IMPORT_BATCH_ROWS for validation and insert.
+
+Layout, one header row per sheet (headers are case-insensitive):
+- question, answer, difficulty, explanation: one column each
+- options: one cell with the choices separated by "|" or line breaks, or one
+  column per choice ("Option A", "Option B", ...), read left to right
+- category: optional; rows without one take the sheet's name, so a workbook
+  with one sheet per topic needs no category column
+
+Sheets without a question column (instructions, notes) are skipped.
+
+openpyxl is imported on first use; it is too heavy to load at startup.
+"""
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+IMPORT_BATCH_ROWS = 10_000
+
+_FIELDS = ('question', 'answer', 'category', 'difficulty', 'explanation')
+_OPTION_SEPARATOR = re.compile(r'\s*(?:\||\r?\n)\s*')
+
+
+def _text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        # Excel stores every number as a float; "8" should not become "8.0"
+        value = int(value)
+    text = str(value).strip()
+    return text or None
+
+
+def _columns(header: Tuple[Any, ...]) -> Tuple[Dict[str, int], List[int]]:
+    """Column index of each field, and of each option column in order"""
+    fields, options = {}, []
+    for i, name in enumerate(header):
+        name = (_text(name) or '').lower()
+        if name in _FIELDS or name == 'options':
+            fields.setdefault(name, i)
+        elif name.startswith('option'):
+            options.append(i)
+    return fields, options
+
+
+def _row(values: Tuple[Any, ...], fields: Dict[str, int], options: List[int], sheet: str) -> Dict[str, Any]:
+    cell = lambda i: _text(values[i]) if i < len(values) else None
+    row = {field: cell(i) for field, i in fields.items() if field != 'options'}
+    if 'options' in fields:
+        combined = cell(fields['options'])
+        choices = _OPTION_SEPARATOR.split(combined) if combined else []
+    else:
+        choices = [cell(i) for i in options]
+    row['options'] = [choice for choice in choices if choice]
+    row['category'] = row.get('category') or sheet
+    return {key: value for key, value in row.items() if value is not None}
+
+
+def read_batches(fileobj, batch_rows: int = IMPORT_BATCH_ROWS) -> Iterator[List[Tuple[str, Dict[str, Any]]]]:
+    """(location, row) pairs of every question sheet in a workbook, one batch at a time"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        batch = []
+        for sheet in workbook.worksheets:
+            # Some writers record a wrong sheet size; read every row regardless
+            sheet.reset_dimensions()
+            rows = sheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            fields, options = _columns(header or ())
+            if 'question' not in fields:
+                continue
+            for number, values in enumerate(rows, start=2):
+                if not any(value is not None for value in values):
+                    continue
+                batch.append((f"Sheet '{sheet.title}' row {number}", _row(values, fields, options, sheet.title)))
+                if len(batch) >= batch_rows:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+    finally:
+        # Read-only workbooks hold the file open until closed
+        workbook.close()
@@ -0,0 +1,21 @@
+"""
+Script to pre-generate question sets for the most popular quiz templates
+"""
+import sys
+from services.quiz_session_service import quiz_session_service
+from services.version_service import version_service
+
+def warm_quiz_pool(top=10):
+    """Fill the pool for the most started quiz templates of the last week"""
+    templates = quiz_session_service.popular_templates(top)
+    if not templates:
+        print("ℹ️  No quiz sessions started recently, nothing to warm")
+        return
+    
+    version = version_service.question_bank()
+    for template in templates:
+        added = quiz_session_service.refill(template['category'], template['difficulty'], template['limit'], version)
+        print(f"✅ {template['_id']}: {template['starts']} starts, {added} set(s) added")
+
+if __name__ == "__main__":
+    warm_quiz_pool(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
\ No newline at end of file
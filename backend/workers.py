@@ -0,0 +1,10 @@
+"""
+Gunicorn worker class for production
+Runs the app on uvloop with the httptools HTTP parser; the lifespan
+(connection, index build, cache warm-up) runs once per worker process.
+"""
+from uvicorn_worker import UvicornWorker
+
+
+class ProductionWorker(UvicornWorker):
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools", "lifespan": "on"}
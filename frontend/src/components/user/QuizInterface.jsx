@@ -4,13 +4,14 @@ import { Clock, AlertCircle, CheckCircle2, Bookmark, BookmarkCheck } from 'lucid
 import { userAPI } from '../../services/api';
 import LoadingSpinner from '../shared/LoadingSpinner';
 import { showToast } from '../shared/Toast';
-import { formatTime, calculateScore } from '../../utils/helpers';
+import { formatTime } from '../../utils/helpers';
 import { useTutorial } from '../../context/TutorialContext';
 import { TUTORIAL_IDS } from '../../utils/tutorialSteps';
 
 const QuizInterface = () => {
   const navigate = useNavigate();
-  const [searchParams] = useSearchParams();
+  const [searchParams, setSearchParams] = useSearchParams();
+  const [sessionId, setSessionId] = useState(null);
   const [questions, setQuestions] = useState([]);
   const [currentQuestionIndex, setCurrentQuestionIndex] = useState(0);
   const [answers, setAnswers] = useState({});
@@ -47,26 +48,47 @@ const QuizInterface = () => {
       setLoading(true);
       const category = searchParams.get('category');
       const difficulty = searchParams.get('difficulty');
+      const mode = searchParams.get('mode');
       const limit = parseInt(searchParams.get('limit')) || 10;
 
       const params = { limit };
       if (category) params.category = category;
       if (difficulty) params.difficulty = difficulty;
+      if (mode) params.mode = mode;
 
-      const response = await userAPI.getQuestions(params);
+      // Resume the session in the URL after a reload, otherwise start a new one
+      const existingSession = searchParams.get('session');
+      const response = existingSession
+        ? await userAPI.getQuizSession(existingSession)
+        : await userAPI.startQuiz(params);
+      const session = response.data;
       
-      if (response.data.length === 0) {
-        showToast('No questions available for this selection', 'warning');
+      if (session.status !== 'in_progress') {
+        showToast('This quiz has already been submitted', 'warning');
         navigate('/user/quiz');
         return;
       }
+      
+      if (!existingSession) {
+        setSearchParams({ ...Object.fromEntries(searchParams), session: session.id }, { replace: true });
+      }
 
-      setQuestions(response.data);
-      setTimeRemaining(response.data.length * 60); // 1 minute per question
+      const restored = {};
+      session.answers.forEach((answer, idx) => {
+        if (answer) restored[idx] = answer;
+      });
+      const elapsed = Math.floor((Date.now() - new Date(`${session.started_at}Z`).getTime()) / 1000);
+
+      setSessionId(session.id);
+      setQuestions(session.questions);
+      setAnswers(restored);
+      setCurrentQuestionIndex(session.current_index);
+      // 1 minute per question, counted from when the session started
+      setTimeRemaining(Math.max(1, session.questions.length * 60 - elapsed));
       setQuizStarted(true);
       
       // Check bookmark status for all questions
-      checkAllBookmarks(response.data);
+      checkAllBookmarks(session.questions);
       
       // Auto-start tutorial on first quiz
       const hasSeenQuizInterface = localStorage.getItem('hasSeenQuizInterface');
@@ -129,7 +151,16 @@ const QuizInterface = () => {
   };
 
   const handleAnswerSelect = (answer) => {
-    setAnswers({ ...answers, [currentQuestionIndex]: answer });
+    const updated = { ...answers, [currentQuestionIndex]: answer };
+    setAnswers(updated);
+    
+    // Persist progress so a reload resumes where the user left off
+    userAPI
+      .saveQuizProgress(sessionId, {
+        answers: questions.map((_, idx) => updated[idx] || null),
+        current_index: currentQuestionIndex,
+      })
+      .catch((error) => console.error('Error saving quiz progress:', error));
   };
 
   const handleNext = () => {
@@ -144,7 +175,7 @@ const QuizInterface = () => {
     }
   };
 
-  const handleSubmitQuiz = () => {
+  const handleSubmitQuiz = async () => {
     if (Object.keys(answers).length < questions.length) {
       if (!window.confirm('You have unanswered questions. Are you sure you want to submit?')) {
         return;
@@ -153,19 +184,36 @@ const QuizInterface = () => {
 
     setQuizCompleted(true);
     
-    // Calculate score
     const answerArray = questions.map((_, idx) => answers[idx] || '');
-    const score = calculateScore(answerArray, questions);
+    const timeSpent = (questions.length * 60) - timeRemaining;
     
-    // Navigate to results page
-    navigate('/user/quiz/results', {
-      state: {
-        questions,
+    try {
+      // Grade on the server
+      const response = await userAPI.submitQuizSession(sessionId, {
         answers: answerArray,
-        score,
-        timeSpent: (questions.length * 60) - timeRemaining,
-      },
-    });
+        time_spent: timeSpent,
+      });
+      const result = response.data;
+      
+      // Navigate to results page
+      navigate('/user/quiz/results', {
+        state: {
+          questions,
+          answers: answerArray,
+          score: {
+            correct: result.score,
+            total: result.total,
+            percentage: result.percentage,
+          },
+          timeSpent,
+          result,
+        },
+      });
+    } catch (error) {
+      console.error('Error submitting quiz:', error);
+      showToast(error.response?.data?.detail || 'Failed to submit quiz', 'error');
+      setQuizCompleted(false);
+    }
   };
 
   if (loading) {
@@ -8,7 +8,7 @@ import { showToast } from '../shared/Toast';
 const QuizResults = () => {
   const location = useLocation();
   const navigate = useNavigate();
-  const { questions, answers, score, timeSpent } = location.state || {};
+  const { questions, answers, score, timeSpent, result } = location.state || {};
   const [bookmarkedQuestions, setBookmarkedQuestions] = useState(new Set());
   const [bookmarkLoading, setBookmarkLoading] = useState({});
 
@@ -128,7 +128,9 @@ const QuizResults = () => {
           <div className="space-y-4">
             {questions.map((question, idx) => {
               const userAnswer = answers[idx];
-              const isCorrect = userAnswer === question.answer;
+              // Correct answers are only sent by the server after submission
+              const revealed = result?.reveal?.[idx] || {};
+              const isCorrect = result ? result.correct[idx] : false;
 
               return (
                 <div
@@ -162,13 +164,13 @@ const QuizResults = () => {
                         {!isCorrect && (
                           <p>
                             <span className="font-medium">Correct Answer:</span>{' '}
-                            <span className="text-green-700">{question.answer}</span>
+                            <span className="text-green-700">{revealed.answer}</span>
                           </p>
                         )}
-                        {question.explanation && (
+                        {revealed.explanation && (
                           <p className="mt-2 text-gray-600 dark:text-gray-400">
                             <span className="font-medium">Explanation:</span>{' '}
-                            {question.explanation}
+                            {revealed.explanation}
                           </p>
                         )}
                       </div>
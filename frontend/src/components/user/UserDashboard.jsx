@@ -19,7 +19,7 @@ import TutorialButton from '../shared/Tutorial/TutorialButton';
 const UserDashboard = () => {
   const [categories, setCategories] = useState([]);
   const [loading, setLoading] = useState(true);
-  const [stats] = useState({
+  const [stats, setStats] = useState({
     quizzesTaken: 0,
     totalScore: 0,
     avgScore: 0,
@@ -43,8 +43,19 @@ const UserDashboard = () => {
   const fetchCategories = async () => {
     try {
       setLoading(true);
-      const response = await userAPI.getCategories();
+      const [response, progressRes] = await Promise.all([
+        userAPI.getCategories(),
+        userAPI.getProgress(),
+      ]);
       setCategories(response.data);
+      
+      const progress = progressRes.data;
+      setStats((prev) => ({
+        ...prev,
+        quizzesTaken: progress.quizzes_taken,
+        totalScore: progress.correct_answers,
+        avgScore: progress.accuracy,
+      }));
     } catch (error) {
       console.error('Error fetching categories:', error);
       showToast('Failed to load categories', 'error');
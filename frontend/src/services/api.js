@@ -82,6 +82,16 @@ export const userAPI = {
   removeBookmark: (questionId) => api.delete(`/user/bookmarks/remove/${questionId}`),
   getBookmarks: () => api.get('/user/bookmarks'),
   checkBookmarkStatus: (questionId) => api.get(`/user/bookmarks/check/${questionId}`),
+  submitQuiz: (data) => api.post('/user/quiz/submit', data),
+  startQuiz: (data) => api.post('/user/quiz/start', data),
+  getActiveQuiz: () => api.get('/user/quiz/active'),
+  getQuizSession: (sessionId) => api.get(`/user/quiz/session/${sessionId}`),
+  saveQuizProgress: (sessionId, data) => api.put(`/user/quiz/session/${sessionId}/progress`, data),
+  submitQuizSession: (sessionId, data) => api.post(`/user/quiz/session/${sessionId}/submit`, data),
+  getProgress: () => api.get('/user/progress'),
+  getLeaderboard: (params) => api.get('/user/leaderboard', { params }),
+  getDueReviews: (limit) => api.get('/user/review/due', { params: { limit } }),
+  answerReview: (questionId, answer) => api.post('/user/review/answer', { question_id: questionId, answer }),
 };
 
 // Stats API (we can calculate from questions)
@@ -0,0 +1,79 @@
+"""
+Shared fixtures for the backend behavior tests
+
+The tests run without a MongoDB server: pymongo's client is swapped for
+mongomock's before the backend is imported, and every test starts from an
+empty database and empty in-process caches.
+"""
+import os
+import sys
+import uuid
+from datetime import datetime
+
+import mongomock
+import pymongo
+import pytest
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault('DATABASE_NAME', 'java_quiz_test')
+os.environ['RATE_LIMIT_ENABLED'] = 'false'
+os.environ['WARM_CACHES'] = 'false'
+pymongo.MongoClient = mongomock.MongoClient
+
+import database  # noqa: E402
+from auth import create_user_token  # noqa: E402
+from services.grading_service import grading_service  # noqa: E402
+from services.leaderboard_service import leaderboard_service  # noqa: E402
+from services.version_service import version_service  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    yield
+    if grading_service._reloader is not None:
+        grading_service._reloader.join()
+    database.client.drop_database(database.db.name)
+    grading_service.load({})
+    grading_service.invalidate()
+    leaderboard_service._boards.clear()
+    leaderboard_service._loaded_at.clear()
+    version_service._cache.clear()
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    from server import app
+    # Without the context manager the lifespan (connect, index builds, cache
+    # warm-up) is skipped
+    return TestClient(app)
+
+
+def make_user(role: str = 'user') -> dict:
+    name = f"{role}-{uuid.uuid4().hex[:8]}"
+    user = {
+        'id': str(uuid.uuid4()),
+        'email': f"{name}@example.com",
+        'username': name,
+        'hashed_password': '',
+        'role': role,
+        'created_at': datetime.utcnow()
+    }
+    database.users_collection.insert_one(user)
+    return user
+
+
+def auth_headers(user: dict) -> dict:
+    return {'Authorization': f"Bearer {create_user_token(user)}"}
+
+
+@pytest.fixture
+def admin():
+    return auth_headers(make_user('admin'))
+
+
+@pytest.fixture
+def user():
+    return auth_headers(make_user('user'))
@@ -0,0 +1,24 @@
+from database import questions_collection
+from services.adaptive_service import AdaptiveService
+
+
+def seed(count: int):
+    questions_collection.insert_many([
+        {'id': f"q{i}", 'category': 'OOP', 'difficulty': 'medium'}
+        for i in range(count)
+    ])
+
+
+def test_deleted_questions_stop_being_selected_once_the_version_moves():
+    seed(5)
+    adaptive = AdaptiveService()
+    adaptive.ensure_loaded(version=1)
+    assert sorted(adaptive.select(0.0, 'OOP', limit=10)) == [f"q{i}" for i in range(5)]
+
+    questions_collection.delete_one({'id': 'q0'})
+    adaptive.ensure_loaded(version=1)
+    assert adaptive._reloader is None
+
+    adaptive.ensure_loaded(version=2)
+    adaptive._reloader.join()
+    assert sorted(adaptive.select(0.0, 'OOP', limit=10)) == [f"q{i}" for i in range(1, 5)]
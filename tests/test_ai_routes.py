@@ -0,0 +1,50 @@
+import sys
+
+import pytest
+
+from database import questions_collection
+from services.grading_service import grading_service
+from services.version_service import version_service
+
+GENERATED = {
+    'question': 'Which keyword declares a constant in Java?',
+    'options': ['final', 'const', 'static', 'let'],
+    'answer': 'final',
+    'explanation': 'final variables cannot be reassigned',
+    'category': 'Basics',
+    'difficulty': 'easy',
+    'aiProvider': 'test',
+    'aiModel': 'test-model'
+}
+
+
+class FakeAIService:
+    async def generate_questions(self, **kwargs):
+        return [dict(GENERATED)]
+
+    async def parse_document(self, **kwargs):
+        return [dict(GENERATED)]
+
+
+@pytest.fixture(autouse=True)
+def fake_ai(client, monkeypatch):
+    monkeypatch.setattr(sys.modules['routes.ai_routes'], 'get_ai_service', FakeAIService)
+
+
+@pytest.mark.parametrize('path, body', [
+    ('/api/ai/generate-and-save', {'topic': 'Java basics', 'count': 1}),
+    ('/api/ai/parse-and-save', {'document_text': 'Java constants are declared with the final keyword. ' * 2}),
+])
+def test_saved_ai_questions_reach_grading_and_the_bank_version(client, admin, path, body):
+    before = version_service.question_bank()
+    response = client.post(path, json=body, headers=admin)
+    assert response.status_code == 200
+    assert response.json()['saved_count'] == 1
+
+    saved = questions_collection.find_one({'generatedByAI': True})
+    assert saved['created_by'].startswith('admin-')
+    assert saved['id'] in grading_service._answers
+    assert version_service.question_bank() == before + 1
+    # Listed like any other question
+    listed = client.get('/api/admin/questions/get_all', headers=admin)
+    assert [q['id'] for q in listed.json()] == [saved['id']]
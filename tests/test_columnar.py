@@ -0,0 +1,63 @@
+import io
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from database import questions_collection
+
+QUESTION_FIELDS = ('id', 'question', 'options', 'answer', 'category', 'difficulty', 'explanation', 'created_by', 'created_at')
+
+
+def seed(count: int):
+    created_at = datetime(2026, 1, 1, 12, 30)
+    questions_collection.create_index('id', unique=True)
+    questions_collection.insert_many([
+        {
+            'id': f"q{i}",
+            'question': f"Question {i}?",
+            'options': ['A', 'B', 'C'],
+            'answer': 'A',
+            'category': 'OOP' if i % 2 else 'Collections',
+            'difficulty': 'easy',
+            'explanation': None if i % 3 else f"Because {i}",
+            'created_by': 'teacher',
+            'created_at': created_at
+        }
+        for i in range(count)
+    ])
+
+
+def stored():
+    return sorted(questions_collection.find({}, {'_id': 0, **{field: 1 for field in QUESTION_FIELDS}}), key=lambda q: q['id'])
+
+
+@pytest.mark.parametrize('fmt', ['parquet', 'arrow'])
+def test_columnar_export_import_round_trip(client, admin, fmt):
+    seed(25)
+    before = stored()
+
+    exported = client.get('/api/admin/questions/export', params={'format': fmt}, headers=admin)
+    assert exported.status_code == 200
+    questions_collection.delete_many({})
+
+    imported = client.post('/api/admin/questions/import', files={'file': (f"bank.{fmt}", exported.content)}, headers=admin)
+    assert imported.json() == {'success': 25, 'failed': 0, 'total': 25, 'errors': []}
+    assert stored() == before
+
+    again = client.post('/api/admin/questions/import', files={'file': (f"bank.{fmt}", exported.content)}, headers=admin).json()
+    assert (again['success'], again['failed']) == (0, 25)
+    assert again['errors'][0].endswith('already exists')
+
+
+def test_columnar_import_reports_invalid_rows(client, admin):
+    buffer = io.BytesIO()
+    pq.write_table(pa.table({'question': ['No answer?'], 'options': [['A', 'B']], 'category': ['OOP']}), buffer)
+    response = client.post('/api/admin/questions/import', files={'file': ('bad.parquet', buffer.getvalue())}, headers=admin)
+    assert response.json()['errors'] == ['Row 1: answer: Field required']
+
+
+def test_columnar_import_rejects_other_files(client, admin):
+    response = client.post('/api/admin/questions/import', files={'file': ('bank.csv', b'question\n')}, headers=admin)
+    assert response.status_code == 400
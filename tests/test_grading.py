@@ -0,0 +1,106 @@
+import mongomock
+import pytest
+
+from services.grading_service import GradingService
+
+
+@pytest.fixture
+def questions():
+    collection = mongomock.MongoClient().db.questions
+    collection.insert_many([
+        {'id': 'q1', 'answer': 'A', 'category': 'OOP', 'difficulty': 'easy', 'explanation': 'because A'},
+        {'id': 'q2', 'answer': 'B', 'category': 'OOP', 'difficulty': 'hard'},
+        {'id': 'q3', 'answer': 'C', 'category': 'Collections', 'difficulty': 'easy'},
+    ])
+    return collection
+
+
+@pytest.fixture
+def grading(questions):
+    service = GradingService()
+    service.refresh(questions)
+    return service
+
+
+def test_grade_scores_answers_in_order(grading):
+    graded = grading.grade(['q1', 'q2', 'q3'], ['A', 'X', 'C'])
+    assert graded == {'correct': [True, False, True], 'score': 2, 'total': 3, 'percentage': 67}
+
+
+def test_grade_treats_skipped_and_unknown_questions_as_wrong(grading):
+    graded = grading.grade(['q1', 'missing'], [None, None])
+    assert graded['correct'] == [False, False]
+    assert graded['percentage'] == 0
+
+
+def test_grade_rejects_misaligned_answers(grading):
+    with pytest.raises(ValueError):
+        grading.grade(['q1', 'q2'], ['A'])
+
+
+def test_grade_fetches_questions_added_after_load(grading, questions):
+    questions.insert_one({'id': 'q4', 'answer': 'D', 'category': 'Generics', 'difficulty': 'medium'})
+    assert grading.grade(['q4'], ['D'], collection=questions)['score'] == 1
+
+
+def test_grade_batch_matches_grade(grading):
+    submissions = [
+        {'question_ids': ['q1', 'q2'], 'answers': ['A', 'B']},
+        {'question_ids': [], 'answers': []},
+        {'question_ids': ['q3', 'q1', 'q2'], 'answers': ['X', 'A', None]},
+    ]
+    assert grading.grade_batch(submissions) == [grading.grade(s['question_ids'], s['answers']) for s in submissions]
+
+
+def test_breakdown_groups_by_category_and_difficulty(grading):
+    graded = grading.grade(['q1', 'q2', 'q3'], ['A', 'X', 'X'])
+    assert sorted(grading.breakdown(['q1', 'q2', 'q3'], graded['correct']), key=lambda g: g['category'] + g['difficulty']) == [
+        {'category': 'Collections', 'difficulty': 'easy', 'answered': 1, 'correct': 0},
+        {'category': 'OOP', 'difficulty': 'easy', 'answered': 1, 'correct': 1},
+        {'category': 'OOP', 'difficulty': 'hard', 'answered': 1, 'correct': 0},
+    ]
+
+
+def test_reveal_returns_answers_and_explanations(grading, questions):
+    assert grading.reveal(['q2', 'q1'], questions) == [
+        {'question_id': 'q2', 'answer': 'B', 'explanation': None},
+        {'question_id': 'q1', 'answer': 'A', 'explanation': 'because A'},
+    ]
+
+
+def test_sync_question_regrades_edited_answer(grading):
+    grading.sync_question({'id': 'q1', 'answer': 'Z', 'category': 'OOP', 'difficulty': 'easy'})
+    assert grading.grade(['q1'], ['Z'])['score'] == 1
+
+
+def test_ensure_loaded_reloads_in_the_background_when_the_bank_version_moves(questions):
+    grading = GradingService()
+    grading.ensure_loaded(questions, version=1)
+    assert grading.reveal(['q1'], questions)[0]['explanation'] == 'because A'
+    # Another worker edits the question and bumps the version
+    questions.update_one({'id': 'q1'}, {'$set': {'answer': 'Z', 'explanation': 'because Z'}})
+
+    grading.ensure_loaded(questions, version=1)
+    assert grading._reloader is None
+    assert grading.grade(['q1'], ['Z'])['score'] == 0
+
+    grading.ensure_loaded(questions, version=2)
+    grading._reloader.join()
+    assert grading.grade(['q1'], ['Z'])['score'] == 1
+    assert grading.reveal(['q1'], questions)[0]['explanation'] == 'because Z'
+
+
+def test_own_writes_advance_the_version_without_a_reload(questions):
+    grading = GradingService()
+    grading.ensure_loaded(questions, version=1)
+    grading.sync_question({'id': 'q1', 'answer': 'Z', 'category': 'OOP', 'difficulty': 'easy'})
+    grading.advance(2)
+    grading.ensure_loaded(questions, version=2)
+    assert grading._reloader is None
+    assert grading.grade(['q1'], ['Z'])['score'] == 1
+
+    # A version this worker did not see being written still needs a reload
+    grading.advance(4)
+    grading.ensure_loaded(questions, version=4)
+    grading._reloader.join()
+    assert grading.grade(['q1'], ['A'])['score'] == 1
@@ -0,0 +1,56 @@
+"""
+Import-time budget for the backend
+server.py is imported in a fresh interpreter, so modules already loaded by
+the other tests cannot hide a slow cold start. No database is needed.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+
+# Seconds allowed for `import server`, best of a few runs
+IMPORT_BUDGET = float(os.environ.get('IMPORT_BUDGET_SECONDS', '1.5'))
+RUNS = 3
+
+# Only loaded on first use (spreadsheet and columnar import, PDF export, AI routes)
+LAZY_MODULES = ['openpyxl', 'pandas', 'pyarrow', 'reportlab', 'emergentintegrations', 'litellm']
+
+PROBE = f"""
+import sys, time
+start = time.perf_counter()
+import server
+elapsed = time.perf_counter() - start
+loaded = [m for m in {LAZY_MODULES!r} if m in sys.modules]
+print(elapsed)
+print(','.join(loaded))
+"""
+
+
+def measure_import():
+    """(seconds, eagerly loaded heavy modules) for one cold import of server.py"""
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout.splitlines()
+    loaded = output[1].split(',') if len(output) > 1 and output[1] else []
+    return float(output[0]), loaded
+
+
+@pytest.fixture(scope='module')
+def cold_imports():
+    return [measure_import() for _ in range(RUNS)]
+
+
+def test_server_imports_within_budget(cold_imports):
+    best = min(seconds for seconds, _ in cold_imports)
+    assert best <= IMPORT_BUDGET, f"import server took {best:.3f}s at best of {RUNS} (budget {IMPORT_BUDGET:.2f}s)"
+
+
+def test_heavy_dependencies_load_on_first_use(cold_imports):
+    assert cold_imports[0][1] == []
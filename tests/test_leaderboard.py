@@ -0,0 +1,116 @@
+from datetime import datetime
+
+from services.leaderboard_service import (
+    RankedBoard,
+    leaderboard_service,
+    GLOBAL_BOARD,
+    category_board,
+    weekly_board
+)
+
+
+def test_ranks_by_score_then_user():
+    board = RankedBoard({'u1': 5, 'u2': 9, 'u3': 7})
+    assert board.top() == [(1, 'u2', 9), (2, 'u3', 7), (3, 'u1', 5)]
+
+
+def test_ties_share_a_rank_and_skip_the_next():
+    board = RankedBoard({'a': 10, 'b': 10, 'c': 8})
+    assert board.top() == [(1, 'a', 10), (1, 'b', 10), (3, 'c', 8)]
+    assert board.rank('c') == (3, 8)
+
+
+def test_updates_move_users():
+    board = RankedBoard({'u1': 5, 'u2': 9})
+    assert board.add('u1', 10) == 15
+    board.set('u3', 1)
+    assert board.rank('u1') == (1, 15)
+    assert board.rank('u2') == (2, 9)
+    assert board.rank('u3') == (3, 1)
+    assert board.rank('nobody') is None
+    assert len(board) == 3
+
+
+def test_top_pages_keep_global_ranks():
+    board = RankedBoard({f"u{i}": i for i in range(10)})
+    assert board.top(limit=2, offset=3) == [(4, 'u6', 6), (5, 'u5', 5)]
+
+
+def test_record_result_counts_towards_every_board():
+    submitted_at = datetime(2026, 1, 7)
+    leaderboard_service.record_result({
+        'user_id': 'u1',
+        'score': 3,
+        'submitted_at': submitted_at,
+        'breakdown': [
+            {'category': 'OOP', 'difficulty': 'easy', 'answered': 2, 'correct': 2},
+            {'category': 'Collections', 'difficulty': 'easy', 'answered': 2, 'correct': 1},
+        ]
+    }, 'alice')
+    assert leaderboard_service.rank(GLOBAL_BOARD, 'u1')['score'] == 3
+    assert leaderboard_service.rank(weekly_board(submitted_at), 'u1')['score'] == 3
+    assert leaderboard_service.rank(category_board('OOP'), 'u1')['score'] == 2
+    assert leaderboard_service.top(category_board('Collections')) == [
+        {'rank': 1, 'user_id': 'u1', 'username': 'alice', 'score': 1}
+    ]
+
+
+def my_score(client, headers):
+    me = client.get('/api/user/leaderboard', params={'scope': 'global'}, headers=headers).json()['me']
+    return me['score'] if me else 0
+
+
+def seed_questions(count: int = 3):
+    from database import questions_collection
+    questions_collection.insert_many([
+        {'id': f"q{i}", 'question': f"Question {i}?", 'options': ['A', 'B'], 'answer': 'A',
+         'category': 'OOP', 'difficulty': 'easy', 'created_by': 'admin', 'created_at': datetime(2026, 1, 1)}
+        for i in range(count)
+    ])
+
+
+def test_free_form_and_duplicated_submissions_earn_no_points(client, user):
+    seed_questions()
+    practice = client.post('/api/user/quiz/submit', json={'question_ids': ['q0'], 'answers': ['A']}, headers=user)
+    assert practice.status_code == 201
+    assert practice.json()['score'] == 1
+
+    duplicated = {'question_ids': ['q0'] * 1000, 'answers': ['A'] * 1000}
+    assert client.post('/api/user/quiz/submit', json=duplicated, headers=user).status_code == 422
+    repeated = {'question_ids': ['q0', 'q0'], 'answers': ['A', 'A']}
+    assert client.post('/api/user/quiz/submit', json=repeated, headers=user).status_code == 422
+    assert my_score(client, user) == 0
+
+
+def test_session_submit_scores_once(client, user):
+    seed_questions()
+    session = client.post('/api/user/quiz/start', json={'limit': 3}, headers=user).json()
+    answers = ['A'] * len(session['questions'])
+    submit = f"/api/user/quiz/session/{session['id']}/submit"
+
+    assert client.post(submit, json={'answers': answers}, headers=user).status_code == 201
+    assert my_score(client, user) == 3
+    assert client.post(submit, json={'answers': answers}, headers=user).status_code == 409
+    assert my_score(client, user) == 3
+
+
+def test_answers_of_a_quiz_in_progress_stay_hidden(client, user):
+    seed_questions()
+    session = client.post('/api/user/quiz/start', json={'limit': 2}, headers=user).json()
+    ids = [q['id'] for q in session['questions']]
+
+    peek = client.post('/api/user/quiz/submit', json={'question_ids': ids, 'answers': ['B', 'B']}, headers=user)
+    assert peek.status_code == 409
+    client.post('/api/user/bookmarks/add', json={'question_id': ids[0]}, headers=user)
+    assert client.post('/api/user/review/answer', json={'question_id': ids[0], 'answer': 'B'}, headers=user).status_code == 409
+    bookmarked = client.get('/api/user/bookmarks', headers=user)
+    assert bookmarked.json()[0]['question']['answer'] is None
+    assert 'etag' not in bookmarked.headers
+
+    # Questions outside the session are answered as before
+    other = next(f"q{i}" for i in range(3) if f"q{i}" not in ids)
+    practice = client.post('/api/user/quiz/submit', json={'question_ids': [other], 'answers': ['B']}, headers=user)
+    assert practice.json()['reveal'][0]['answer'] == 'A'
+
+    client.post(f"/api/user/quiz/session/{session['id']}/submit", json={'answers': ['A', 'A']}, headers=user)
+    assert client.get('/api/user/bookmarks', headers=user).json()[0]['question']['answer'] == 'A'
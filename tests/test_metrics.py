@@ -0,0 +1,14 @@
+from config import settings
+
+
+def test_metrics_need_an_admin_or_the_scrape_token(client, admin, user, monkeypatch):
+    assert client.get('/api/metrics').status_code == 401
+    assert client.get('/api/metrics', headers=user).status_code == 403
+    assert client.get('/api/metrics', headers={'Authorization': 'Bearer guess'}).status_code == 401
+
+    response = client.get('/api/metrics', headers=admin)
+    assert response.status_code == 200
+    assert 'http_request' in response.text
+
+    monkeypatch.setattr(settings, 'metrics_token', 'scrape-secret')
+    assert client.get('/api/metrics', headers={'Authorization': 'Bearer scrape-secret'}).status_code == 200
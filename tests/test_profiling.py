@@ -0,0 +1,21 @@
+from pymongo.errors import ServerSelectionTimeoutError
+
+import profiling
+
+
+class UnreachableCollection:
+    def find_one(self, *args, **kwargs):
+        raise ServerSelectionTimeoutError('no servers available')
+
+
+def test_sample_rate_survives_an_unreachable_mongo(client, monkeypatch):
+    profiling.profiler.set_sample_rate(0.25)
+    profiling.profiler._loaded_at = None
+    monkeypatch.setattr(profiling, 'runtime_config_collection', UnreachableCollection())
+
+    assert profiling.profiler.sample_rate() == 0.25
+    profiling.profiler._loaded_at = None
+    assert client.get('/api/health').status_code == 200
+
+    monkeypatch.undo()
+    profiling.profiler.set_sample_rate(0)
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+from database import questions_collection, quiz_pool_collection
+from services.quiz_session_service import quiz_session_service, template_key
+
+TEMPLATE = template_key('OOP', None, 2)
+
+
+def seed_questions(count: int = 4):
+    questions_collection.insert_many([
+        {'id': f"q{i}", 'question': f"Question {i}?", 'options': ['A', 'B'], 'answer': 'A',
+         'category': 'OOP', 'difficulty': 'easy', 'created_by': 'admin', 'created_at': datetime(2026, 1, 1)}
+        for i in range(count)
+    ])
+
+
+def test_only_sets_from_the_current_version_are_claimed():
+    seed_questions()
+    assert quiz_session_service.refill('OOP', None, 2, version=1) == quiz_session_service.POOL_TARGET
+    assert quiz_session_service.claim(TEMPLATE, version=2) is None
+    assert len(quiz_session_service.claim(TEMPLATE, version=1)) == 2
+
+
+def test_refill_replaces_sets_from_older_versions():
+    seed_questions()
+    quiz_session_service.refill('OOP', None, 2, version=1)
+    assert quiz_session_service.refill('OOP', None, 2, version=2) == quiz_session_service.POOL_TARGET
+    assert quiz_pool_collection.count_documents({'template': TEMPLATE}) == quiz_session_service.POOL_TARGET
+    assert quiz_pool_collection.count_documents({'template': TEMPLATE, 'version': 1}) == 0
+
+
+def test_concurrent_refills_of_a_template_do_not_overfill():
+    seed_questions()
+    assert quiz_session_service._lock_refill(TEMPLATE)
+    assert not quiz_session_service._lock_refill(TEMPLATE)
+    assert quiz_session_service.refill('OOP', None, 2, version=1) == 0
+    assert quiz_pool_collection.count_documents({'template': TEMPLATE}) == 0
+
+    quiz_pool_collection.delete_one({'_id': f"refill|{TEMPLATE}"})
+    assert quiz_session_service.refill('OOP', None, 2, version=1) == quiz_session_service.POOL_TARGET
+    # The marker is released once the refill is done
+    assert quiz_session_service.refill('OOP', None, 2, version=1) == 0
+    assert quiz_pool_collection.count_documents({'template': TEMPLATE}) == quiz_session_service.POOL_TARGET
+
+
+def test_deleted_questions_are_not_served_from_the_pool(client, admin, user):
+    seed_questions(2)
+    start = {'category': 'OOP', 'limit': 2}
+    assert client.post('/api/user/quiz/start', json=start, headers=user).status_code == 201
+    assert quiz_pool_collection.count_documents({'template': TEMPLATE}) > 0
+
+    assert client.delete('/api/admin/questions/delete/q0', headers=admin).status_code == 204
+    session = client.post('/api/user/quiz/start', json=start, headers=user).json()
+    assert [q['id'] for q in session['questions']] == ['q1']
@@ -0,0 +1,144 @@
+import pytest
+from fastapi import FastAPI
+from pymongo.errors import PyMongoError
+from fastapi.testclient import TestClient
+
+import rate_limit
+from rate_limit import Budget, LocalBackend, MongoBackend, RateLimiter, RateLimitBackend, RateLimitMiddleware, parse_budgets
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, 'monotonic', clock)
+    return clock
+
+
+def test_backend_must_implement_take():
+    with pytest.raises(TypeError):
+        RateLimitBackend()
+
+
+def test_full_bucket_allows_a_burst_of_capacity(clock):
+    backend, budget = LocalBackend(), Budget(5, 60)
+    assert [backend.take('k', budget) for _ in range(5)] == [0.0] * 5
+    # Empty: the next token arrives after seconds / capacity
+    assert backend.take('k', budget) == pytest.approx(12.0)
+
+
+def test_bucket_refills_at_the_budget_rate(clock):
+    backend, budget = LocalBackend(), Budget(5, 60)
+    for _ in range(5):
+        backend.take('k', budget)
+
+    clock.now += 6
+    assert backend.take('k', budget) == pytest.approx(6.0)
+    clock.now += 6
+    assert backend.take('k', budget) == 0.0
+    assert backend.take('k', budget) == pytest.approx(12.0)
+
+
+def test_idle_bucket_refills_only_up_to_capacity(clock):
+    backend, budget = LocalBackend(), Budget(3, 30)
+    backend.take('k', budget)
+    clock.now += 3600
+    assert [backend.take('k', budget) for _ in range(4)] == [0.0, 0.0, 0.0, pytest.approx(10.0)]
+
+
+def test_callers_have_separate_buckets(clock):
+    backend, budget = LocalBackend(), Budget(1, 60)
+    assert backend.take('a', budget) == 0.0
+    assert backend.take('a', budget) > 0
+    assert backend.take('b', budget) == 0.0
+
+
+def test_refilled_buckets_are_pruned_past_max_keys(clock, monkeypatch):
+    monkeypatch.setattr(LocalBackend, 'MAX_KEYS', 3)
+    backend, budget = LocalBackend(), Budget(2, 10)
+    for key in 'abc':
+        backend.take(key, budget)
+    clock.now += 6
+    backend.take('c', budget)
+    backend.take('d', budget)
+    # a and b were full again, so only c (refilling) and d remain
+    assert sorted(backend._buckets) == ['c', 'd']
+
+
+@pytest.fixture
+def shared(monkeypatch):
+    """Stands in for the rate_limits collection: one shared balance per key"""
+    shared = {'tokens': {}, 'flushed': []}
+
+    def spend_shared(key, count, budget):
+        shared['flushed'].append((key, count))
+        shared['tokens'][key] = shared['tokens'].get(key, budget.capacity) - count
+        return shared['tokens'][key]
+
+    monkeypatch.setattr(MongoBackend, '_spend_shared', staticmethod(spend_shared))
+    monkeypatch.setattr(MongoBackend, 'FLUSH_INTERVAL', 3600)
+    return shared
+
+
+def test_mongo_backend_spends_locally_and_adopts_the_shared_balance(clock, shared):
+    budget = Budget(10, 60)
+    backend = MongoBackend()
+    assert [backend.take('k', budget) for _ in range(3)] == [0.0] * 3
+    assert shared['flushed'] == []
+
+    # Another worker spent 6 tokens meanwhile
+    shared['tokens']['k'] = 4
+    backend.flush()
+    assert shared['flushed'] == [('k', 3)]
+    assert backend.take('k', budget) == 0.0
+    assert backend.take('k', budget) == pytest.approx(6.0)
+
+    backend.flush()
+    assert shared['flushed'][-1] == ('k', 1)
+    assert shared['tokens']['k'] == 0
+
+
+def test_mongo_backend_keeps_limiting_locally_when_mongo_fails(clock, monkeypatch):
+    def unavailable(key, count, budget):
+        raise PyMongoError("no servers")
+
+    monkeypatch.setattr(MongoBackend, '_spend_shared', staticmethod(unavailable))
+    monkeypatch.setattr(MongoBackend, 'FLUSH_INTERVAL', 3600)
+    budget = Budget(2, 60)
+    backend = MongoBackend()
+    backend.take('k', budget)
+    backend.flush()
+    assert backend.take('k', budget) == 0.0
+    assert backend.take('k', budget) == pytest.approx(30.0)
+
+
+def test_parse_budgets_and_matching():
+    budgets = parse_budgets(" /api/auth/login=5/60 ; /api/ai/=50/3600;")
+    assert budgets == {'/api/auth/login': Budget(5, 60.0), '/api/ai/': Budget(50, 3600.0)}
+    limiter = RateLimiter(budgets, LocalBackend())
+    assert limiter.budget_for('/api/auth/login') == ('/api/auth/login', Budget(5, 60.0))
+    assert limiter.budget_for('/api/ai/generate') == ('/api/ai/', Budget(50, 3600.0))
+    assert limiter.budget_for('/api/auth/login/extra') is None
+    assert limiter.budget_for('/api/health') is None
+
+
+def test_middleware_answers_429_with_retry_after(clock):
+    app = FastAPI()
+
+    @app.post('/api/auth/login')
+    async def login():
+        return {'ok': True}
+
+    limited = RateLimitMiddleware(app, RateLimiter({'/api/auth/login': Budget(2, 60)}, LocalBackend()))
+    client = TestClient(limited)
+    assert [client.post('/api/auth/login').status_code for _ in range(2)] == [200, 200]
+    response = client.post('/api/auth/login')
+    assert response.status_code == 429
+    assert response.headers['retry-after'] == '30'
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+from database import refresh_tokens_collection
+from services.refresh_token_service import refresh_token_service, _hash
+
+
+def test_rotate_issues_a_successor_once():
+    token = refresh_token_service.issue('u1')
+    user_id, successor = refresh_token_service.rotate(token)
+    assert user_id == 'u1'
+    assert successor != token
+    assert refresh_token_service.rotate(successor)[0] == 'u1'
+
+
+def test_reusing_a_spent_token_revokes_the_family():
+    token = refresh_token_service.issue('u1')
+    _, successor = refresh_token_service.rotate(token)
+    other_session = refresh_token_service.issue('u1')
+
+    assert refresh_token_service.rotate(token) is None
+    # The legitimate successor is revoked too, since the leak could be either side
+    assert refresh_token_service.rotate(successor) is None
+    assert refresh_token_service.rotate(other_session)[0] == 'u1'
+
+
+def test_expired_and_unknown_tokens_are_rejected():
+    token = refresh_token_service.issue('u1')
+    refresh_tokens_collection.update_one(
+        {'_id': _hash(token)},
+        {'$set': {'expires_at': datetime.utcnow() - timedelta(seconds=1)}}
+    )
+    assert refresh_token_service.rotate(token) is None
+    assert refresh_token_service.rotate('not-a-token') is None
+
+
+def test_revoke_ends_one_session_and_revoke_user_ends_all():
+    first = refresh_token_service.issue('u1')
+    second = refresh_token_service.issue('u1')
+    refresh_token_service.revoke(first)
+    assert refresh_token_service.rotate(first) is None
+    _, second = refresh_token_service.rotate(second)
+
+    refresh_token_service.revoke_user('u1')
+    assert refresh_token_service.rotate(second) is None
+
+
+def test_refresh_route_rotates_and_rejects_replay(client):
+    from conftest import make_user
+    user = make_user()
+    token = refresh_token_service.issue(user['id'])
+
+    response = client.post('/api/auth/refresh', json={'refresh_token': token})
+    assert response.status_code == 200
+    assert response.json()['username'] == user['username']
+    assert client.post('/api/auth/refresh', json={'refresh_token': token}).status_code == 401
+    assert client.post('/api/auth/refresh', json={'refresh_token': response.json()['refresh_token']}).status_code == 401
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+from database import reviews_collection
+from services.review_service import review_service, schedule, DEFAULT_EASE, MIN_EASE, QUALITY_CORRECT, QUALITY_WRONG
+
+NOW = datetime(2026, 3, 1)
+
+
+def test_schedule_follows_sm2_intervals():
+    card = {}
+    intervals = []
+    for _ in range(4):
+        card = schedule(card, QUALITY_CORRECT, NOW)
+        intervals.append(card['interval_days'])
+    assert intervals == [1, 6, 15, 38]
+    assert card['ease'] == DEFAULT_EASE
+    assert card['due_at'] == NOW + timedelta(days=38)
+
+
+def test_schedule_resets_on_a_lapse_and_floors_ease():
+    card = {'ease': 1.4, 'interval_days': 30, 'repetitions': 5, 'lapses': 0}
+    card = schedule(card, QUALITY_WRONG, NOW)
+    assert (card['interval_days'], card['repetitions'], card['lapses']) == (1, 0, 1)
+    assert card['ease'] == MIN_EASE
+
+
+def sources(user_id: str, question_id: str):
+    card = reviews_collection.find_one({'user_id': user_id, 'question_id': question_id})
+    return card and sorted(card['sources'])
+
+
+def test_unbookmarking_keeps_cards_that_were_also_missed():
+    review_service.enroll('u1', ['q1'], 'bookmark')
+    review_service.enroll_missed([{'user_id': 'u1', 'question_ids': ['q1', 'q2'], 'correct': [False, True], 'submitted_at': NOW}])
+    assert sources('u1', 'q1') == ['bookmark', 'missed']
+
+    review_service.drop_bookmark_card('u1', 'q1')
+    assert sources('u1', 'q1') == ['missed']
+    assert sources('u1', 'q2') is None
+
+
+def test_unbookmarking_removes_bookmark_only_cards():
+    review_service.enroll('u1', ['q1'], 'bookmark')
+    review_service.enroll('u1', ['q1'], 'bookmark')
+    assert sources('u1', 'q1') == ['bookmark']
+    review_service.drop_bookmark_card('u1', 'q1')
+    assert sources('u1', 'q1') is None
+
+
+def test_reenrolling_keeps_history_but_makes_the_card_due():
+    review_service.enroll('u1', ['q1'], 'missed', NOW)
+    review_service.record_answer('u1', 'q1', True)
+    review_service.enroll('u1', ['q1'], 'bookmark', NOW)
+    card = reviews_collection.find_one({'user_id': 'u1', 'question_id': 'q1'})
+    assert card['repetitions'] == 1
+    assert card['due_at'] == NOW
+    assert [c['question_id'] for c in review_service.due('u1', now=NOW)] == ['q1']
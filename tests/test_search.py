@@ -0,0 +1,34 @@
+from services.search_service import search_terms, highlight_pattern, highlight, snippet, SearchService
+
+
+def test_search_terms_keep_phrases_and_drop_negations():
+    assert search_terms('"hash map" threads -legacy') == ['hash map', 'thread']
+
+
+def test_highlight_escapes_html_and_marks_stemmed_matches():
+    pattern = highlight_pattern(search_terms('threads'))
+    assert highlight('Threading <b>in</b> Java', pattern) == ('<mark>Threading</mark> &lt;b&gt;in&lt;/b&gt; Java', True)
+    assert highlight('No match', pattern) == ('No match', False)
+
+
+def test_snippet_windows_long_text_at_word_boundaries():
+    pattern = highlight_pattern(['needle'])
+    text = ' '.join(['word'] * 100 + ['needle'] + ['word'] * 100)
+    window = snippet(text, pattern, width=60)
+    assert window.startswith('…') and window.endswith('…')
+    assert '<mark>needle</mark>' in window
+    assert snippet('nothing here', pattern) is None
+
+
+def test_facet_filter_maps_defaults_to_missing_fields():
+    assert SearchService.facet_filter(['OOP'], ['medium'], False, ['manual'], None) == {
+        'category': {'$in': ['OOP']},
+        'difficulty': {'$in': ['medium', None]},
+        'generatedByAI': {'$ne': True},
+        'sourceType': {'$in': [None]},
+    }
+    assert SearchService.facet_filter(None, ['hard'], True, None, ['ann']) == {
+        'difficulty': {'$in': ['hard']},
+        'generatedByAI': True,
+        'created_by': {'$in': ['ann']},
+    }
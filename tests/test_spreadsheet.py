@@ -0,0 +1,60 @@
+import io
+
+from openpyxl import Workbook
+
+import spreadsheet
+from database import questions_collection
+
+
+def workbook(*sheets) -> bytes:
+    book = Workbook(write_only=True)
+    for title, rows in sheets:
+        sheet = book.create_sheet(title)
+        for row in rows:
+            sheet.append(row)
+    buffer = io.BytesIO()
+    book.save(buffer)
+    return buffer.getvalue()
+
+
+def test_spreadsheet_reads_both_option_layouts_and_sheet_categories():
+    data = workbook(
+        ('Instructions', [['One question per row']]),
+        ('OOP', [
+            ['Question', 'Option A', 'Option B', 'Option C', 'Answer', 'Difficulty'],
+            ['Bits in an int?', 32, 64, None, 32, 'easy'],
+            [None, None],
+        ]),
+        ('Generics', [
+            ['question', 'options', 'answer', 'category', 'explanation'],
+            ['Type parameter?', 'T | U\nV', 'T', None, 'because'],
+            ['Wildcard?', '?|*', '?', 'Advanced Generics', None],
+        ]),
+    )
+    rows = [row for batch in spreadsheet.read_batches(io.BytesIO(data), batch_rows=2) for row in batch]
+    assert rows == [
+        ("Sheet 'OOP' row 2", {'question': 'Bits in an int?', 'answer': '32', 'difficulty': 'easy', 'options': ['32', '64'], 'category': 'OOP'}),
+        ("Sheet 'Generics' row 2", {'question': 'Type parameter?', 'answer': 'T', 'explanation': 'because', 'options': ['T', 'U', 'V'], 'category': 'Generics'}),
+        ("Sheet 'Generics' row 3", {'question': 'Wildcard?', 'answer': '?', 'category': 'Advanced Generics', 'options': ['?', '*']}),
+    ]
+
+
+def test_bulk_upload_imports_xlsx(client, admin):
+    data = workbook(('Collections', [
+        ['Question', 'Option A', 'Option B', 'Answer'],
+        *[[f"Question {i}?", 'A', 'B', 'A'] for i in range(5)],
+        ['Missing answer?', 'A', 'B', None],
+    ]))
+    response = client.post('/api/admin/questions/bulk_upload', files={'file': ('bank.xlsx', data)}, headers=admin)
+    assert response.json() == {
+        'success': 5,
+        'failed': 1,
+        'total': 6,
+        'errors': ["Sheet 'Collections' row 7: answer: Field required"]
+    }
+    assert questions_collection.count_documents({'category': 'Collections', 'created_by': {'$regex': '^admin-'}}) == 5
+
+
+def test_bulk_upload_rejects_corrupt_workbooks(client, admin):
+    response = client.post('/api/admin/questions/bulk_upload', files={'file': ('bank.xlsx', b'not a zip')}, headers=admin)
+    assert response.status_code == 400